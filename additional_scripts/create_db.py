@@ -1,40 +1,23 @@
-import sqlite3
-import re
+import os
+import sys
 
-def get_table_names_from_sql(file_path='sq_db.sql'):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            sql_content = f.read()
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BOT_DIR = os.path.join(ROOT_DIR, 'bot')
+sys.path.insert(0, BOT_DIR)
 
-        table_matches = re.findall(
-            r'CREATE TABLE (?:IF NOT EXISTS )?(\w+)', 
-            sql_content, 
-            re.IGNORECASE
-        )
-        
-        return table_matches
-    except Exception as e:
-        print(f"❌ Ошибка чтения SQL-файла: {e}")
-        return []
+from migrations import ensure_schema, SCHEMA_VERSION
 
-def create_database():
-    conn = sqlite3.connect('translations.db')
-    cursor = conn.cursor()
-    
-    with open('sq_db.sql', 'r', encoding='utf-8') as f:
-        sql_script = f.read()
-    
-    cursor.executescript(sql_script)
-    conn.commit()
-    conn.close()
-    
-    table_names = get_table_names_from_sql()
-    
-    print("✅ База данных создана успешно!")
-    if table_names:
-        print(f"✅ Таблицы: {', '.join(table_names)}")
+DEFAULT_DB = os.path.join(BOT_DIR, 'translations.db')
+
+def create_database(db_path: str = DEFAULT_DB):
+    """Создание или обновление базы данных через миграции бота"""
+    version = ensure_schema(db_path)
+
+    if version == SCHEMA_VERSION:
+        print(f"✅ База данных готова: {db_path}")
+        print(f"✅ Версия схемы: {version}")
     else:
-        print("❌ Не удалось определить названия таблиц")
+        print(f"❌ Версия схемы {version}, ожидалась {SCHEMA_VERSION}")
 
 if __name__ == "__main__":
-    create_database()
+    create_database(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB)
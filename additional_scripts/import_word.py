@@ -0,0 +1,133 @@
+import argparse
+import glob
+import os
+import sqlite3
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BOT_DIR = os.path.join(ROOT_DIR, 'bot')
+sys.path.insert(0, BOT_DIR)
+
+from database import connect_db
+from migrations import DICTIONARY_SCHEMA, ensure_schema
+from utils.text import normalize_text, dictionary_letter
+from utils.dictionary_json import iter_json_stream
+
+DEFAULT_DB = os.path.join(BOT_DIR, 'translations.db')
+DEFAULT_WORDS = os.path.join(ROOT_DIR, 'words', '*.json')
+BATCH_SIZE = 5000
+
+# Обновляем только изменившиеся слова, неизменные строки не переписываются
+UPSERT_SQL = '''
+    INSERT INTO dictionary (informal_text, formal_text, explanation, normalized_informal, first_letter)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(normalized_informal) DO UPDATE SET
+        informal_text = excluded.informal_text,
+        formal_text = excluded.formal_text,
+        explanation = excluded.explanation,
+        first_letter = excluded.first_letter
+    WHERE dictionary.informal_text IS NOT excluded.informal_text
+       OR dictionary.formal_text IS NOT excluded.formal_text
+       OR dictionary.explanation IS NOT excluded.explanation
+'''
+
+# Индекс по буквам и триггеры счётчиков снимаются на время импорта
+# и пересоздаются один раз в конце
+DEFERRED_OBJECTS = [
+    'DROP INDEX IF EXISTS idx_dictionary_letter',
+    'DROP TRIGGER IF EXISTS dictionary_count_insert',
+    'DROP TRIGGER IF EXISTS dictionary_count_delete',
+    'DROP TRIGGER IF EXISTS dictionary_count_update',
+]
+
+REBUILD_LETTER_COUNTS = [
+    'DELETE FROM dictionary_letter_counts',
+    '''INSERT INTO dictionary_letter_counts (letter, count)
+       SELECT first_letter, COUNT(*) FROM dictionary GROUP BY first_letter''',
+]
+
+def iter_rows(path: str):
+    """Строки для вставки из JSON-файла"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for informal, formal, explanation in iter_json_stream(f):
+            key = normalize_text(informal)
+            if key:
+                yield informal, formal, explanation, key, dictionary_letter(informal)
+
+def import_file(cursor: sqlite3.Cursor, path: str, batch_size: int) -> int:
+    rows_read = 0
+    # Дубликаты внутри пакета схлопываются заранее (остаётся последний): иначе
+    # строка переписывалась бы при каждом повторном импорте того же файла
+    batch = {}
+    for row in iter_rows(path):
+        rows_read += 1
+        batch[row[3]] = row
+        if len(batch) >= batch_size:
+            cursor.executemany(UPSERT_SQL, batch.values())
+            batch.clear()
+    if batch:
+        cursor.executemany(UPSERT_SQL, batch.values())
+    return rows_read
+
+def import_words(files, db_path: str = DEFAULT_DB, batch_size: int = BATCH_SIZE):
+    ensure_schema(db_path)
+    conn = connect_db(db_path)
+    conn.isolation_level = None
+    cursor = conn.cursor()
+    cursor.execute('PRAGMA cache_size = -65536')
+
+    words_before = cursor.execute('SELECT COUNT(*) FROM dictionary').fetchone()[0]
+    changes_before = conn.total_changes
+    started = time.perf_counter()
+    rows_read = 0
+
+    try:
+        cursor.execute('BEGIN IMMEDIATE')
+        for statement in DEFERRED_OBJECTS:
+            cursor.execute(statement)
+
+        for path in files:
+            file_started = time.perf_counter()
+            file_rows = import_file(cursor, path, batch_size)
+            elapsed = time.perf_counter() - file_started
+            rows_read += file_rows
+            print(f"📄 {os.path.basename(path)}: {file_rows} строк за {elapsed:.2f} с "
+                  f"({file_rows / elapsed if elapsed else 0:.0f} строк/с)")
+
+        changed = conn.total_changes - changes_before
+        for statement in DICTIONARY_SCHEMA + REBUILD_LETTER_COUNTS:
+            cursor.execute(statement)
+        cursor.execute('COMMIT')
+    except Exception:
+        cursor.execute('ROLLBACK')
+        conn.close()
+        raise
+
+    elapsed = time.perf_counter() - started
+    words_after = cursor.execute('SELECT COUNT(*) FROM dictionary').fetchone()[0]
+    conn.close()
+
+    inserted = words_after - words_before
+    print("✅ Импорт завершён!")
+    print(f"✅ Прочитано строк: {rows_read}")
+    print(f"✅ Новых слов: {inserted}, обновлено: {changed - inserted}, "
+          f"без изменений: {rows_read - changed}")
+    print(f"⚡ Время: {elapsed:.2f} с ({rows_read / elapsed if elapsed else 0:.0f} строк/с)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Импорт JSON-словарей сленга в базу данных")
+    parser.add_argument('files', nargs='*', help="JSON-файлы (по умолчанию words/*.json)")
+    parser.add_argument('--db', default=DEFAULT_DB, help="путь к базе данных")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="размер пакета вставки")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(DEFAULT_WORDS))
+    if not files:
+        print("❌ JSON-файлы словарей не найдены")
+        return
+
+    import_words(files, args.db, args.batch_size)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BOT_DIR = os.path.join(ROOT_DIR, 'bot')
+sys.path.insert(0, BOT_DIR)
+
+from aiogram.fsm.storage.base import StorageKey
+from storage import RespClient, RespStorage, SQLiteStorage
+from storage.resp_client import encode_command, read_reply
+
+class RespStub:
+    """Локальная заглушка сервера Redis: GET/SET [EX]/DEL/PING/SELECT/AUTH/FLUSHDB.
+
+    Данные в памяти процесса; нужна для проверки RespStorage без Redis.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    def _get(self, key):
+        value = self.data.get(key)
+        if value is None:
+            return None
+        payload, expires_at = value
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return payload
+
+    def _reply(self, value) -> bytes:
+        if value is None:
+            return b'$-1\r\n'
+        if isinstance(value, int):
+            return b':%d\r\n' % value
+        if isinstance(value, bytes):
+            return b'$%d\r\n%s\r\n' % (len(value), value)
+        return b'+%s\r\n' % value.encode('utf-8')
+
+    def handle(self, args) -> bytes:
+        command = args[0].decode('utf-8').upper()
+        if command == 'PING':
+            return self._reply('PONG')
+        if command in ('SELECT', 'AUTH'):
+            return self._reply('OK')
+        if command == 'FLUSHDB':
+            self.data.clear()
+            return self._reply('OK')
+        if command == 'GET':
+            return self._reply(self._get(args[1]))
+        if command == 'SET':
+            expires_at = None
+            if len(args) >= 5 and args[3].upper() == b'EX':
+                expires_at = time.monotonic() + int(args[4])
+            self.data[args[1]] = (args[2], expires_at)
+            return self._reply('OK')
+        if command == 'DEL':
+            return self._reply(sum(1 for key in args[1:] if self.data.pop(key, None) is not None))
+        return f"-ERR unknown command '{command}'\r\n".encode('utf-8')
+
+    async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                args = await read_reply(reader)
+                writer.write(self.handle(args))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+async def check_storage(storage, name: str):
+    """Проверка контракта хранилища FSM: запись, чтение, очистка"""
+    key = StorageKey(bot_id=1, chat_id=42, user_id=42)
+    await storage.set_state(key, 'TranslationStates:waiting_for_text')
+    await storage.set_data(key, {'search_type': 'история', 'offset': 10})
+    assert await storage.get_state(key) == 'TranslationStates:waiting_for_text'
+    assert await storage.get_data(key) == {'search_type': 'история', 'offset': 10}
+    await storage.set_state(key, None)
+    await storage.set_data(key, {})
+    assert await storage.get_state(key) is None
+    assert await storage.get_data(key) == {}
+    print(f"✅ {name}: состояние и данные сохраняются и очищаются")
+
+async def self_check():
+    stub = RespStub()
+    server = await asyncio.start_server(stub.serve_client, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        client = RespClient('127.0.0.1', port)
+        assert await client.execute('PING') == 'PONG'
+        await check_storage(RespStorage(client), "RespStorage")
+        await client.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'fsm_state.db')
+        storage = SQLiteStorage(path)
+        await check_storage(storage, "SQLiteStorage")
+        key = StorageKey(bot_id=1, chat_id=7, user_id=7)
+        await storage.set_state(key, 'SearchStates:waiting_for_search')
+        await storage.close()
+        # После "перезапуска" состояние читается из базы
+        restarted = SQLiteStorage(path)
+        assert await restarted.get_state(key) == 'SearchStates:waiting_for_search'
+        await restarted.close()
+        print("✅ SQLiteStorage: состояние переживает перезапуск")
+
+async def serve(host: str, port: int):
+    server = await asyncio.start_server(RespStub().serve_client, host, port)
+    print(f"✅ Заглушка Redis слушает {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальная заглушка сервера Redis для хранилища FSM")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6379)
+    parser.add_argument('--check', action='store_true', help="проверить RespStorage и SQLiteStorage и выйти")
+    args = parser.parse_args()
+
+    if args.check:
+        asyncio.run(self_check())
+    else:
+        asyncio.run(serve(args.host, args.port))
+
+if __name__ == "__main__":
+    main()
@@ -1,72 +1,100 @@
-from flask import Flask, request, jsonify, g, send_file
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
 import sqlite3
 import json
-from datetime import datetime
+import hashlib
+import logging
+from datetime import datetime, timezone
 from services.gigachat_service import GigaChatService
-from database import FDataBase
+from services.translation_cache import TranslationCache
+from services.single_flight import SingleFlight
+from services.history_writer import HistoryWriter
+from services.translation_jobs import TranslationJobs, JobQueueFull, SyncWaitersBusy
+from database import FDataBase, parse_timestamp
+from db_pool import ConnectionPool
+from static_assets import StaticAssets
+from migrations import ensure_schema
+from utils.log import setup_logging, bind_context, reset_context, new_request_id, request_id_var, user_id_var
+from utils.metrics import REGISTRY, CONTENT_TYPE, HTTP_REQUEST_SECONDS, MultiprocessMetrics, track_services
+from config import TRANSLATE_BATCH_MAX_ITEMS, METRICS_MULTIPROC_DIR, TRANSLATE_SYNC_WAITERS, TRANSLATE_RETRY_AFTER
 import os
+import time
+import atexit
+import threading
+
+# Настройка логов до инициализации модулей, которые пишут в лог при импорте
+setup_logging()
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+
+@app.before_request
+def bind_log_context():
+    """Идентификатор запроса (из X-Request-ID или новый) и пользователя для логов"""
+    request_id = request.headers.get('X-Request-ID') or new_request_id()
+    user_id = (request.view_args or {}).get('user_id')
+    g.log_context = bind_context(request_id[:64], user_id)
+    g.request_started = time.perf_counter()
+
 @app.after_request
 def add_localtonet_header(response):
     """Добавляем заголовок для пропуска предупреждения Localtonet"""
     response.headers['localtonet-skip-warning'] = 'true'
+    request_id = request_id_var.get()
+    if request_id:
+        response.headers['X-Request-ID'] = request_id
+    # Метка - шаблон маршрута, а не путь, чтобы число рядов не росло с числом пользователей
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    HTTP_REQUEST_SECONDS.labels(endpoint, request.method, response.status_code).observe(
+        time.perf_counter() - g.get('request_started', time.perf_counter()))
     return response
+
+@app.teardown_request
+def reset_log_context(exception=None):
+    tokens = g.pop('log_context', None)
+    if tokens is not None:
+        reset_context(tokens)
 CORS(app)
 
 # Конфигурация БД
 DATABASE = 'translations.db'
+# Размер страницы истории по умолчанию и верхняя граница параметра limit
+HISTORY_PAGE_LIMIT = 100
+HISTORY_MAX_LIMIT = 500
+# Миграции выполняются один раз при запуске, а не в каждом запросе
+ensure_schema(DATABASE)
+# Настроенные соединения переиспользуются между запросами (свой пул в каждом воркере)
+db_pool = ConnectionPool(DATABASE, row_factory=sqlite3.Row)
 
 # ========== СТАТИЧЕСКИЕ ФАЙЛЫ (ДОБАВЛЕНО) ==========
 
+# Файлы сайта читаются и сжимаются один раз при запуске воркера
+static_assets = StaticAssets(os.path.join(app.root_path, 'site'))
+
 @app.route('/')
 def index():
     """Главная страница - загрузочный экран"""
-    return send_file('site/index.html')
-
-@app.route('/site.html')
-def site():
-    """Основное приложение"""
-    return send_file('site/site.html')
-
-@app.route('/style.css')
-def serve_css():
-    """Отдаем CSS файл"""
-    return send_file('site/style.css')
-
-@app.route('/script.js')
-def serve_js():
-    """Отдаем JavaScript файл"""
-    return send_file('site/script.js')
-@app.route('/fonts/Benzin-Semibold.ttf')
-def serve_benzin_semibold():
-    """Отдаем шрифт Benzin Semibold"""
-    try:
-        return send_file('site/fonts/Benzin-Semibold.ttf')
-    except FileNotFoundError:
-        return "Font not found", 404
+    return static_assets.response('index.html', request)
 
-@app.route('/fonts/Benzin-Regular.ttf')
-def serve_benzin_regular():
-    """Отдаем шрифт Benzin Regular"""
-    try:
-        return send_file('site/fonts/Benzin-Regular.ttf')
-    except FileNotFoundError:
-        return "Font not found", 404
+@app.route('/<path:filename>')
+def serve_static(filename):
+    """Страницы, CSS, JavaScript и шрифты (в том числе по адресам с хэшем)"""
+    response = static_assets.response(filename, request)
+    if response is None:
+        return "Not found", 404
+    return response
 
 
 # ========== API МАРШРУТЫ (ТВОЙ РАБОЧИЙ КОД) ==========
 
 def get_db():
-    """Создает новое подключение к БД для каждого запроса"""
+    """Берёт соединение из пула воркера на время запроса"""
     if not hasattr(g, 'sqlite_db'):
         try:
-            g.sqlite_db = sqlite3.connect(DATABASE)
-            g.sqlite_db.row_factory = sqlite3.Row
-            print(f"✅ Создано новое подключение к БД в потоке {os.getpid()}")
+            g.sqlite_db = db_pool.acquire()
+            logger.debug("Соединение с БД взято из пула в процессе %s", os.getpid())
         except Exception as e:
-            print(f"❌ Ошибка подключения к БД: {e}")
+            logger.error("Ошибка подключения к БД: %s", e)
             return None
     return g.sqlite_db
 
@@ -79,20 +107,151 @@ def get_db_instance():
 
 @app.teardown_appcontext
 def close_db(error):
-    """Закрывает подключение к БД после запроса"""
-    if hasattr(g, 'sqlite_db'):
-        g.sqlite_db.close()
-        print("🔒 Подключение к БД закрыто")
+    """Возвращает соединение в пул после запроса"""
+    connection = g.pop('sqlite_db', None)
+    if connection is not None:
+        db_pool.release(connection)
+        logger.debug("Соединение с БД возвращено в пул")
 
-# Инициализация GigaChat (можно использовать один экземпляр)
+# Проверка доступности GigaChat при запуске
 try:
     gigachat = GigaChatService()
     gigachat_available = True
-    print("✅ GigaChat инициализирован")
+    logger.info("GigaChat инициализирован")
 except Exception as e:
-    print(f"❌ Ошибка инициализации GigaChat: {e}")
+    logger.error("Ошибка инициализации GigaChat: %s", e)
     gigachat_available = False
 
+# Кэш переводов общий с ботом (таблица translation_cache в той же БД)
+translation_cache = TranslationCache(DATABASE)
+# Одновременные одинаковые запросы ждут один вызов GigaChat
+translation_flight = SingleFlight()
+# История пишется пакетами в фоновом потоке; при выходе дописываем остаток
+history_writer = HistoryWriter(DATABASE)
+track_services(translation_cache, history=history_writer)
+
+# Потокобезопасность клиента GigaChat не гарантируется: у каждого потока пула переводов свой
+_gigachat_local = threading.local()
+
+def _gigachat_client() -> GigaChatService:
+    client = getattr(_gigachat_local, 'client', None)
+    if client is None:
+        client = _gigachat_local.client = GigaChatService()
+    return client
+
+def translate_upstream(text: str, direction: str):
+    return _gigachat_client().translate_text(text, direction)
+
+def translate_batch_upstream(texts, direction: str):
+    return _gigachat_client().translate_batch(texts, direction)
+
+def translate_shared(text: str, direction: str):
+    """Перевод через кэш с объединением одинаковых запросов"""
+    return translation_flight.do(
+        TranslationCache.make_key(text, direction),
+        translation_cache.get_or_translate, text, direction, translate_upstream
+    )
+
+def save_history(text: str, translation: str, explanation: str, user_id, direction: str) -> bool:
+    """Перевод в историю (запись в базу - пакетом в фоне); False - не принят"""
+    if direction == 'to_formal':
+        # Для to_formal: исходный текст = неформальный, перевод = формальный
+        informal_text, formal_text = text, translation
+    else:
+        # Для to_informal: исходный текст = формальный, перевод = неформальный
+        informal_text, formal_text = translation, text
+
+    saved = history_writer.add(informal_text, formal_text, explanation, user_id, direction)
+    if not saved:
+        logger.warning("Предупреждение: перевод выполнен, но не сохранён в историю")
+    return saved
+
+def run_translation(text: str, direction: str, user_id) -> dict:
+    """Перевод с сохранением в историю; результат - тело ответа API"""
+    translation, explanation = translate_shared(text, direction)
+    saved = save_history(text, translation, explanation, user_id, direction)
+
+    return {
+        "success": True,
+        "original_text": text,
+        "translated_text": translation,
+        "explanation": explanation,
+        "direction": direction,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "saved_to_db": saved  # Сообщаем, принят ли перевод в историю
+    }
+
+def run_batch_translation(texts, direction: str, user_id) -> dict:
+    """Пакетный перевод: кэш по каждой фразе, промахи - общими запросами к GigaChat"""
+    translated = translation_cache.get_or_translate_batch(texts, direction, translate_batch_upstream)
+    items = []
+    for text, (translation, explanation) in zip(texts, translated):
+        items.append({
+            "original_text": text,
+            "translated_text": translation,
+            "explanation": explanation,
+            "saved_to_db": save_history(text, translation, explanation, user_id, direction)
+        })
+
+    return {
+        "success": True,
+        "direction": direction,
+        "items": items,
+        "total": len(items),
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+
+# Обращения к нейросети - в ограниченном пуле. Синхронно ждать результат может
+# не больше TRANSLATE_SYNC_WAITERS потоков сервера (общий лимит для обоих пулов),
+# остальные потоки всегда свободны для истории, статистики и /api/health
+sync_waiters = threading.BoundedSemaphore(TRANSLATE_SYNC_WAITERS)
+translation_jobs = TranslationJobs(DATABASE, run_translation, waiters=sync_waiters)
+# Пакеты - в своём пуле; задания хранятся в той же таблице, статус - тот же GET /api/translate/<job_id>
+batch_jobs = TranslationJobs(DATABASE, run_batch_translation, waiters=sync_waiters)
+# Под gunicorn у каждого воркера свои счётчики: /metrics складывает значения всех воркеров
+shared_metrics = MultiprocessMetrics(METRICS_MULTIPROC_DIR) if METRICS_MULTIPROC_DIR else None
+
+def startup():
+    """Подготовка воркера: соединения с БД открываются до первого запроса"""
+    db_pool.warm_up(db_pool.size)
+    if shared_metrics is not None:
+        shared_metrics.start()
+    logger.info("Воркер API готов", extra={'pid': os.getpid(), 'db_pool': db_pool.stats()})
+
+def shutdown():
+    """Дописывает историю и закрывает ресурсы воркера; повторный вызов безопасен"""
+    # Сначала переводы в работе: их результаты тоже попадают в историю
+    translation_jobs.close()
+    batch_jobs.close()
+    history_writer.close()
+    translation_cache.close()
+    db_pool.close()
+    # Последними - метрики: в них попадает всё, что воркер успел сделать
+    if shared_metrics is not None:
+        shared_metrics.close()
+
+atexit.register(shutdown)
+
+def start_job(jobs: TranslationJobs, wait: bool, *args):
+    """Перевод в пуле: результат (wait) или 202 с номером задания для GET /api/translate/<job_id>.
+    При перегрузке - 503 с Retry-After"""
+    try:
+        if wait:
+            return jsonify(jobs.run_now(*args))
+        job_id = jobs.submit(*args)
+    except (JobQueueFull, SyncWaitersBusy) as e:
+        logger.info("Перевод отклонён: %s", e)
+        return jsonify({
+            "error": "Слишком много переводов в работе",
+            "details": "Попробуйте позже"
+        }), 503, {"Retry-After": str(TRANSLATE_RETRY_AFTER)}
+    return jsonify({
+        "success": True,
+        "job_id": job_id,
+        "status": "pending",
+        "status_url": f"/api/translate/{job_id}"
+    }), 202
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Проверка работы API и БД"""
@@ -107,7 +266,7 @@ def health_check():
             db_status = "disconnected"
             message = "БД недоступна"
     except Exception as e:
-        print(f"❌ Ошибка проверки БД: {e}")
+        logger.error("Ошибка проверки БД: %s", e)
         db_status = "error"
         message = f"Ошибка БД: {str(e)}"
     
@@ -139,6 +298,7 @@ def translate_text():
         text = data['text'].strip()
         direction = data['direction']
         user_id = data['user_id']
+        user_id_var.set(str(user_id))
         
         if not text:
             return jsonify({"error": "Текст не может быть пустым"}), 400
@@ -146,44 +306,77 @@ def translate_text():
         if direction not in ['to_formal', 'to_informal']:
             return jsonify({"error": "Некорректное направление перевода"}), 400
         
-        # Выполняем перевод через GigaChat
-        if direction == 'to_formal':
-            translation, explanation = gigachat.translate_text(text, "to_formal")
-            # Для to_formal: исходный текст = неформальный, перевод = формальный
-            informal_text = text
-            formal_text = translation
-        else:
-            translation, explanation = gigachat.translate_text(text, "to_informal")
-            # Для to_informal: исходный текст = формальный, перевод = неформальный
-            informal_text = translation
-            formal_text = text
+        # Перевод из памяти отдаём сразу, не занимая пул
+        if translation_cache.peek(text, direction):
+            return jsonify(run_translation(text, direction, user_id))
         
-        # Сохраняем в базу данных (создаем новое подключение)
-        db = get_db_instance()
-        if db:
-            success = db.add_translation(informal_text, formal_text, explanation, user_id, direction)
-            if not success:
-                print("⚠️ Предупреждение: не удалось сохранить в БД, но перевод выполнен")
-        else:
-            print("⚠️ Предупреждение: БД недоступна, перевод не сохранен")
+        # Асинхронный режим: номер задания сразу
+        return start_job(translation_jobs, not data.get('async'), text, direction, user_id)
         
-        # Формируем ответ
-        response = {
-            "success": True,
-            "original_text": text,
-            "translated_text": translation,
-            "explanation": explanation,
-            "direction": direction,
-            "timestamp": datetime.now().isoformat(),
-            "saved_to_db": bool(db)  # Сообщаем сохранилось ли в БД
-        }
+    except Exception as e:
+        logger.error("Ошибка в API перевода: %s", e)
+        return jsonify({"error": f"Ошибка сервера: {str(e)}"}), 500
+
+@app.route('/api/translate/batch', methods=['POST'])
+def translate_batch():
+    """Перевод списка фраз: найденное в кэше - сразу, остальное - пакетами в GigaChat"""
+    try:
+        if not gigachat_available:
+            return jsonify({
+                "error": "Сервис переводов временно недоступен",
+                "details": "Попробуйте позже"
+            }), 503
         
-        return jsonify(response)
+        data = request.get_json()
+        
+        if not data or 'texts' not in data or 'direction' not in data or 'user_id' not in data:
+            return jsonify({"error": "Необходимы параметры: texts, direction, user_id"}), 400
+        
+        texts = data['texts']
+        direction = data['direction']
+        user_id = data['user_id']
+        user_id_var.set(str(user_id))
+        
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            return jsonify({"error": "texts должен быть списком строк"}), 400
+        
+        texts = [text.strip() for text in texts]
+        if not texts or not all(texts):
+            return jsonify({"error": "Тексты не могут быть пустыми"}), 400
+        
+        if len(texts) > TRANSLATE_BATCH_MAX_ITEMS:
+            return jsonify({"error": f"Не больше {TRANSLATE_BATCH_MAX_ITEMS} текстов за запрос"}), 400
+        
+        if direction not in ['to_formal', 'to_informal']:
+            return jsonify({"error": "Некорректное направление перевода"}), 400
+        
+        # Весь пакет уже в памяти - отвечаем сразу, не занимая пул
+        if all(translation_cache.peek(text, direction) for text in texts):
+            return jsonify(run_batch_translation(texts, direction, user_id))
+        
+        return start_job(batch_jobs, not data.get('async'), texts, direction, user_id)
         
     except Exception as e:
-        print(f"❌ Ошибка в API перевода: {e}")
+        logger.error("Ошибка в API пакетного перевода: %s", e)
         return jsonify({"error": f"Ошибка сервера: {str(e)}"}), 500
 
+@app.route('/api/translate/<job_id>', methods=['GET'])
+def get_translation_job(job_id):
+    """Состояние фонового перевода: pending, done (с результатом) или error"""
+    try:
+        job = translation_jobs.get(job_id)
+    except Exception as e:
+        return jsonify({"error": f"Ошибка получения задания: {str(e)}"}), 500
+    if job is None:
+        return jsonify({"error": "Задание не найдено"}), 404
+    
+    response = {"success": job['status'] != 'error', "job_id": job_id, "status": job['status']}
+    if 'result' in job:
+        response.update(job['result'])
+    if 'error' in job:
+        response['error'] = job['error']
+    return jsonify(response)
+
 @app.route('/api/history/<user_id>', methods=['GET'])
 def get_user_history(user_id):
     """Получение истории переводов пользователя"""
@@ -193,11 +386,12 @@ def get_user_history(user_id):
         if not db:
             return jsonify({"error": "База данных недоступна"}), 503
         
-        # Параметры пагинации
-        limit = request.args.get('limit', default=100, type=int)
+        # Пагинация по курсору: cursor - id последней записи предыдущей страницы
+        limit = min(max(request.args.get('limit', default=HISTORY_PAGE_LIMIT, type=int), 1), HISTORY_MAX_LIMIT)
+        cursor = request.args.get('cursor', type=int)
         
         # Получаем историю из БД
-        translations = db.get_user_translations(user_id, limit)
+        translations, has_more = db.get_user_translations_page(user_id, limit, older_than_id=cursor)
         
         # Форматируем ответ
         history = []
@@ -217,40 +411,62 @@ def get_user_history(user_id):
             "success": True,
             "user_id": user_id,
             "translations": history,
-            "total": len(history)
+            "total": len(history),
+            "total_count": db.get_user_translation_count(user_id),
+            "has_more": has_more,
+            "next_cursor": history[-1]["id"] if has_more else None
         })
         
     except Exception as e:
-        print(f"❌ Ошибка получения истории: {e}")
+        logger.error("Ошибка получения истории: %s", e)
         return jsonify({"error": f"Ошибка получения истории: {str(e)}"}), 500
 
 @app.route('/api/stats/<user_id>', methods=['GET'])
 def get_user_stats(user_id):
-    """Получение статистики пользователя"""
+    """Получение статистики пользователя (строка user_stats, ответ 304 без изменений)"""
     try:
         db = get_db_instance()
         if not db:
             return jsonify({"error": "База данных недоступна"}), 503
         
-        translations = db.get_user_translations(user_id, 1000)
+        stats = db.get_user_summary(user_id)
+        if not stats:
+            return jsonify({"error": "Не удалось получить статистику"}), 500
         
-        stats = {
-            "total_translations": len(translations),
-            "to_formal_count": len([t for t in translations if t.get('direction') == 'to_formal']),
-            "to_informal_count": len([t for t in translations if t.get('direction') == 'to_informal']),
-            "last_activity": translations[0]['created_at'] if translations else None
-        }
-        
-        return jsonify({
+        response = jsonify({
             "success": True,
             "user_id": user_id,
             "stats": stats
         })
+        # Счётчики меняются только с новыми переводами: версия - сами счётчики и время последнего
+        version = f"{user_id}:{stats['total_translations']}:{stats['to_formal_count']}:{stats['last_activity']}"
+        response.set_etag(hashlib.sha1(version.encode('utf-8')).hexdigest()[:16])
+        if stats['last_activity']:
+            response.last_modified = parse_timestamp(stats['last_activity'])
+        # Клиент может хранить ответ, но перед использованием должен его проверить
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
         
     except Exception as e:
-        print(f"❌ Ошибка получения статистики: {e}")
+        logger.error("Ошибка получения статистики: %s", e)
         return jsonify({"error": f"Ошибка получения статистики: {str(e)}"}), 500
 
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Счётчики попаданий в кэш переводов"""
+    return jsonify({
+        "success": True,
+        "cache": translation_cache.stats(),
+        "coalesced": translation_flight.shared
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Метрики в формате Prometheus: всех воркеров gunicorn или только этого процесса"""
+    body = shared_metrics.render() if shared_metrics is not None else REGISTRY.render()
+    return body, 200, {'Content-Type': CONTENT_TYPE}
+
 @app.route('/api/test-db', methods=['GET'])
 def test_db():
     """Тестовый эндпоинт для проверки БД"""
@@ -270,16 +486,9 @@ def test_db():
         return jsonify({"error": f"Ошибка теста БД: {str(e)}"}), 500
 
 if __name__ == '__main__':
-    print("🚀 Запуск единого приложения Slanglit (Сайт + API)")
-    print("📊 Доступные URL:")
-    print("   GET  /                    - главная страница сайта")
-    print("   POST /api/translate       - перевод текста")
-    print("   GET  /api/history/<user_id> - история пользователя") 
-    print("   GET  /api/stats/<user_id> - статистика")
-    print("   GET  /api/health          - проверка статуса")
-    print("   GET  /api/test-db         - тест БД")
-    print("🔧 Порт: 5000")
-    print("⚡ Режим: многопоточный с изоляцией БД")
+    logger.info("Запуск единого приложения Slanglit (Сайт + API)",
+                extra={'port': 5000, 'routes': sorted(rule.rule for rule in app.url_map.iter_rules())})
     
+    startup()
     # Запускаем в режиме без debug (чтобы не было многопоточных проблем)
     app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
\ No newline at end of file
@@ -0,0 +1,70 @@
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+from database import FDataBase, connect_db
+from config import DB_READER_CONNECTIONS
+
+# Методы FDataBase, которые меняют данные: выполняются единственным писателем
+WRITE_METHODS = frozenset({
+    'add_translation',
+    'add_translations',
+    'add_dictionary_word',
+    'delete_dictionary_word',
+    'addAdmin',
+    'removeAdminByID',
+})
+
+class AsyncFDataBase:
+    """Асинхронная обёртка над FDataBase для бота.
+
+    Те же методы, что у FDataBase, но возвращают корутины. Запись идёт через
+    один поток со своим соединением, чтение - через пул потоков, у каждого
+    из которых отдельное соединение (в режиме WAL читатели не ждут писателя).
+    Event loop не блокируется ни запросами, ни fsync при коммите.
+    """
+
+    def __init__(self, path: str = 'translations.db', readers: int = DB_READER_CONNECTIONS):
+        self.path = path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        # Соединение создаётся в том потоке, который им пользуется
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer",
+                                          initializer=self._open_connection)
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="db-reader",
+                                           initializer=self._open_connection)
+
+    def _open_connection(self):
+        # check_same_thread=False только ради close() из основного потока
+        connection = connect_db(self.path, check_same_thread=False)
+        with self._connections_lock:
+            self._connections.append(connection)
+        self._local.db = FDataBase(connection)
+
+    def _call(self, name: str, args, kwargs):
+        return getattr(self._local.db, name)(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Callable:
+        if name.startswith('_') or not callable(getattr(FDataBase, name, None)):
+            raise AttributeError(name)
+        executor = self._writer if name in WRITE_METHODS else self._readers
+
+        async def method(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, self._call, name, args, kwargs)
+
+        method.__name__ = name
+        # Обёртка создаётся один раз, дальше берётся из атрибутов экземпляра
+        setattr(self, name, method)
+        return method
+
+    def close(self):
+        """Дожидается начатых запросов и закрывает все соединения"""
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
@@ -1,4 +1,89 @@
+import os
 from secret import BOT_TOKEN, GIGACHAT_API_KEY
 from secret import GIGACHAT_API_KEY
 BOT_TOKEN = BOT_TOKEN
-GIGACHAT_API_KEY = GIGACHAT_API_KEY
\ No newline at end of file
+GIGACHAT_API_KEY = GIGACHAT_API_KEY
+
+# Максимальное число одновременных запросов к GigaChat из бота
+TRANSLATION_MAX_WORKERS = 8
+
+# Кэш переводов: число записей в памяти и время жизни (секунды)
+TRANSLATION_CACHE_SIZE = 10000
+TRANSLATION_CACHE_TTL = 7 * 24 * 60 * 60
+
+# Поиск: сколько id результатов хранить в сессии, время жизни и число сессий
+SEARCH_RESULTS_LIMIT = 200
+SEARCH_SESSION_TTL = 30 * 60
+SEARCH_MAX_SESSIONS = 1000
+
+# Хранилище состояний FSM: memory://, sqlite:///fsm_state.db или redis://host:port/db
+FSM_STORAGE_URL = 'sqlite:///fsm_state.db'
+# Состояния без активности дольше этого срока удаляются (секунды)
+FSM_STATE_TTL = 7 * 24 * 60 * 60
+# Пакетная запись в SQLite: не реже чем раз в FSM_FLUSH_INTERVAL секунд или по FSM_BATCH_SIZE изменений
+FSM_FLUSH_INTERVAL = 0.05
+FSM_BATCH_SIZE = 100
+
+# Как часто проверять, не изменил ли список админов другой процесс (секунды)
+ADMIN_REGISTRY_CHECK_INTERVAL = 5
+
+# Число соединений на чтение в асинхронном слое базы бота (запись - одно соединение)
+DB_READER_CONNECTIONS = 3
+
+# Отложенная запись истории: размер пакета, интервал сброса (мс),
+# длина очереди и сколько ждать места в заполненной очереди (секунды)
+HISTORY_BATCH_SIZE = 200
+HISTORY_FLUSH_INTERVAL_MS = 200
+HISTORY_QUEUE_SIZE = 10000
+HISTORY_PUT_TIMEOUT = 5
+
+# Логирование: уровень по умолчанию, JSON-вывод и уровни отдельных модулей.
+# Отладочные сообщения (ответы нейросети, подключения к БД) видны только при LOG_LEVEL=DEBUG
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+LOG_JSON = os.environ.get('LOG_JSON', '1') != '0'
+LOG_MODULE_LEVELS = {
+    'aiogram.event': 'WARNING',
+    'httpx': 'WARNING',
+    'gigachat': 'WARNING',
+    'werkzeug': 'WARNING',
+}
+
+# Метрики Prometheus: локальный HTTP-сервер бота (0 - не запускать)
+# и период проверки задержки event loop (секунды). API отдаёт метрики на /metrics
+METRICS_HOST = os.environ.get('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.environ.get('METRICS_PORT', '9108'))
+EVENT_LOOP_LAG_INTERVAL = 0.5
+
+# Каталог, через который воркеры gunicorn отдают общие метрики API
+# (задаётся в gunicorn.conf.py; пусто - только метрики своего процесса)
+# и как часто воркер сохраняет туда свои значения (секунды)
+METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR', '')
+METRICS_FLUSH_INTERVAL = 5
+
+# Как часто счётчики активности админ-панели дочитывают новые переводы
+# из базы, включая переводы API и сайта (секунды)
+ACTIVITY_SYNC_INTERVAL = 5
+
+# Пул соединений SQLite в каждом воркере API: число соединений
+# (не меньше числа потоков воркера) и сколько ждать свободного (секунды)
+API_DB_POOL_SIZE = int(os.environ.get('API_DB_POOL_SIZE', '8'))
+API_DB_POOL_TIMEOUT = 5
+
+# Фоновые переводы API (POST /api/translate с "async": true): число потоков,
+# сколько заданий может ждать и выполняться одновременно, сколько хранить
+# готовый результат и через сколько считать задание потерянным (секунды)
+TRANSLATE_JOB_WORKERS = 4
+TRANSLATE_JOB_QUEUE = 100
+TRANSLATE_JOB_TTL = 60 * 60
+TRANSLATE_JOB_TIMEOUT = 5 * 60
+# Сколько потоков воркера API могут одновременно ждать синхронный перевод;
+# должно быть меньше числа потоков (gunicorn.conf.py ставит половину), остальные
+# синхронные запросы получают 503, как при переполненной очереди
+TRANSLATE_SYNC_WAITERS = int(os.environ.get('TRANSLATE_SYNC_WAITERS', '4'))
+# Через сколько секунд повторить запрос после 503 из-за перегрузки (Retry-After)
+TRANSLATE_RETRY_AFTER = 5
+
+# Пакетный перевод (POST /api/translate/batch и многострочные сообщения бота):
+# сколько фраз принимается за раз и сколько отправляется в один запрос к GigaChat
+TRANSLATE_BATCH_MAX_ITEMS = 50
+TRANSLATE_BATCH_CHUNK = 10
@@ -1,26 +1,56 @@
+import logging
 import sqlite3
 from typing import List, Dict, Tuple, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from utils.text import normalize_text, dictionary_letter, fts_query
+from utils.metrics import instrument_methods
 
+logger = logging.getLogger(__name__)
+
+# Время в базе - UTC в формате CURRENT_TIMESTAMP
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+def format_timestamp(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+def parse_timestamp(value: str) -> datetime:
+    return datetime.strptime(value[:19], TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+
+def _user_tag(user_id) -> str:
+    """Значение колонки user_tag (см. HISTORY_SEARCH_SCHEMA): id бота - число, у сайта - строка"""
+    return f'u{user_id}'
+
+def _user_fts_match(user_id, query: str) -> str:
+    """Выражение MATCH по записям пользователя"""
+    # Тег - строка FTS5 в кавычках: id вида web_abc токенизатор разбивает на фразу "uweb abc".
+    # Слова ищутся только в текстовых колонках: иначе "u" совпадёт по префиксу с user_tag
+    tag = _user_tag(user_id).replace('"', '""')
+    return f'user_tag:"{tag}" AND {{informal_text formal_text explanation}}: ({query})'
+
+def configure_connection(db: sqlite3.Connection) -> sqlite3.Connection:
+    """Настройки SQLite для конкурентной работы бота и API"""
+    # WAL: читатели не блокируют писателя; NORMAL безопасен в режиме WAL
+    db.execute('PRAGMA journal_mode = WAL')
+    db.execute('PRAGMA synchronous = NORMAL')
+    db.execute('PRAGMA cache_size = -16000')  # ~16 МБ кэша страниц
+    db.execute('PRAGMA mmap_size = 268435456')  # 256 МБ
+    db.execute('PRAGMA temp_store = MEMORY')
+    db.execute('PRAGMA busy_timeout = 5000')
+    return db
+
+def connect_db(path: str = 'translations.db', **kwargs) -> sqlite3.Connection:
+    return configure_connection(sqlite3.connect(path, **kwargs))
+
+# Время каждого публичного метода попадает в метрику slanglit_db_query_seconds
+@instrument_methods
 class FDataBase:
     def __init__(self, db: sqlite3.Connection):
+        # Схема создаётся миграциями (migrations.py) один раз при запуске процесса
         self.__db = db
         self.__cur = self.__db.cursor()
-        self._init_tables()
-
-    def _init_tables(self):
-        try:
-            # Добавляем колонку explanation в таблицу translations если её нет
-            self.__cur.execute("PRAGMA table_info(translations)")
-            columns = [col[1] for col in self.__cur.fetchall()]
-            
-            if 'explanation' not in columns:
-                self.__cur.execute('ALTER TABLE translations ADD COLUMN explanation TEXT')
-                self.__db.commit()
-                print("✅ Добавлена колонка explanation в таблицу translations")
-                
-        except sqlite3.Error as e:
-            print(f"❌ Ошибка инициализации таблиц: {e}")
 
     def __del__(self):
         if hasattr(self, '__db'):
@@ -30,24 +60,32 @@ class FDataBase:
     def add_translation(self, informal: str, formal: str, explanation: str = None, 
                    user_id: int = None, direction: str = "to_formal") -> bool:
         try:
-            # Добавляем отладочную информацию
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            print(f"🕐 Добавление перевода в {current_time}")
-            
             self.__cur.execute(
                 'INSERT INTO translations (informal_text, formal_text, explanation, user_id, direction) VALUES (?, ?, ?, ?, ?)',
                 (informal, formal, explanation, user_id, direction)
             )
             self.__db.commit()
-            
-            # Проверяем добавленную запись
-            self.__cur.execute('SELECT created_at FROM translations WHERE id = last_insert_rowid()')
-            db_time = self.__cur.fetchone()[0]
-            print(f"🕐 Время в базе данных: {db_time}")
-            
             return True
         except sqlite3.Error as e:
-            print(f"❌ Ошибка при добавлении перевода: {e}")
+            logger.error("Ошибка при добавлении перевода: %s", e)
+            return False
+
+    def add_translations(self, rows: List[Tuple]) -> bool:
+        """Пакетная вставка одной транзакцией.
+
+        Строка: (informal, formal, explanation, user_id, direction, created_at)
+        """
+        try:
+            self.__cur.executemany(
+                'INSERT INTO translations (informal_text, formal_text, explanation, user_id, direction, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            self.__db.commit()
+            return True
+        except sqlite3.Error as e:
+            self.__db.rollback()
+            logger.error("Ошибка при пакетном добавлении переводов: %s", e)
             return False
     
     def get_user_translations(self, user_id: int, limit: int = 1000) -> List[Dict]:
@@ -62,24 +100,242 @@ class FDataBase:
             columns = [col[0] for col in self.__cur.description]
             return [dict(zip(columns, row)) for row in self.__cur.fetchall()]
         except sqlite3.Error as e:
-            print(f"❌ Ошибка при получении переводов пользователя: {e}")
+            logger.error("Ошибка при получении переводов пользователя: %s", e)
             return []
     
-    def search_user_translations(self, search_text: str, user_id: int) -> List[Dict]:
+    def get_user_translations_page(self, user_id: int, limit: int = 10, older_than_id: int = None,
+                                   newer_than_id: int = None) -> Tuple[List[Dict], bool]:
+        """Страница истории (новые сверху) с пагинацией по ключу (created_at, id).
+
+        Читается limit + 1 строка: лишняя только показывает, есть ли ещё записи
+        в направлении листания.
+        """
+        params = [user_id]
+        cursor_condition = ''
+        order = 'DESC'
+        if older_than_id is not None:
+            cursor_condition = 'AND (created_at, id) < (SELECT created_at, id FROM translations WHERE id = ?)'
+            params.append(older_than_id)
+        elif newer_than_id is not None:
+            cursor_condition = 'AND (created_at, id) > (SELECT created_at, id FROM translations WHERE id = ?)'
+            params.append(newer_than_id)
+            order = 'ASC'
+        try:
+            self.__cur.execute(f'''
+                SELECT * FROM translations
+                WHERE user_id = ? {cursor_condition}
+                ORDER BY created_at {order}, id {order}
+                LIMIT ?
+            ''', (*params, limit + 1))
+            rows = self._fetch_dicts()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            if order == 'ASC':
+                rows.reverse()
+            return rows, has_more
+        except sqlite3.Error as e:
+            logger.error("Ошибка при получении страницы истории: %s", e)
+            return [], False
+
+    def get_user_translation_count(self, user_id: int) -> int:
+        """Количество переводов пользователя из таблицы счётчиков"""
+        try:
+            self.__cur.execute('SELECT total FROM user_stats WHERE user_id = ?', (user_id,))
+            row = self.__cur.fetchone()
+            return row[0] if row else 0
+        except sqlite3.Error as e:
+            logger.error("Ошибка при получении количества переводов: %s", e)
+            return 0
+
+    def search_user_translations(self, search_text: str, user_id: int, limit: int = 20) -> List[Dict]:
+        """Полнотекстовый поиск по истории пользователя (FTS5, ранжирование bm25)"""
+        query = fts_query(search_text)
+        if not query:
+            return []
         try:
-            search_pattern = f'%{search_text}%'
-            
             self.__cur.execute('''
-                SELECT * FROM translations 
-                WHERE (informal_text LIKE ? OR formal_text LIKE ?) AND user_id = ?
-                ORDER BY created_at DESC
-                LIMIT 20
-            ''', (search_pattern, search_pattern, user_id))
+                SELECT t.* FROM translations_fts
+                JOIN translations t ON t.id = translations_fts.rowid
+                WHERE translations_fts MATCH ? AND translations_fts.user_tag = ?
+                ORDER BY bm25(translations_fts, 2.0, 2.0, 1.0, 0.0), t.created_at DESC
+                LIMIT ?
+            ''', (_user_fts_match(user_id, query), _user_tag(user_id), limit))
             
             columns = [col[0] for col in self.__cur.description]
             return [dict(zip(columns, row)) for row in self.__cur.fetchall()]
         except sqlite3.Error as e:
-            print(f"❌ Ошибка при поиске переводов пользователя: {e}")
+            logger.error("Ошибка при поиске переводов пользователя: %s", e)
+            return []
+
+    def search_user_translation_ids(self, search_text: str, user_id: int, limit: int = 200) -> List[int]:
+        """id найденных переводов пользователя в порядке релевантности (только индекс FTS5)"""
+        query = fts_query(search_text)
+        if not query:
+            return []
+        try:
+            self.__cur.execute('''
+                SELECT rowid FROM translations_fts
+                WHERE translations_fts MATCH ? AND user_tag = ?
+                ORDER BY bm25(translations_fts, 2.0, 2.0, 1.0, 0.0), rowid DESC
+                LIMIT ?
+            ''', (_user_fts_match(user_id, query), _user_tag(user_id), limit))
+            return [row[0] for row in self.__cur.fetchall()]
+        except sqlite3.Error as e:
+            logger.error("Ошибка при поиске переводов пользователя: %s", e)
+            return []
+
+    def _fetch_by_ids(self, table: str, ids: List[int]) -> List[Dict]:
+        """Строки таблицы по списку id в порядке этого списка"""
+        if not ids:
+            return []
+        placeholders = ', '.join('?' * len(ids))
+        self.__cur.execute(f'SELECT * FROM {table} WHERE id IN ({placeholders})', ids)
+        rows = {row['id']: row for row in self._fetch_dicts()}
+        return [rows[row_id] for row_id in ids if row_id in rows]
+
+    def get_translations_by_ids(self, ids: List[int]) -> List[Dict]:
+        try:
+            return self._fetch_by_ids('translations', ids)
+        except sqlite3.Error as e:
+            logger.error("Ошибка при получении переводов: %s", e)
+            return []
+
+    # Методы словаря
+    def _fetch_dicts(self) -> List[Dict]:
+        columns = [col[0] for col in self.__cur.description]
+        return [dict(zip(columns, row)) for row in self.__cur.fetchall()]
+
+    def add_dictionary_word(self, informal: str, formal: str, explanation: str = None) -> bool:
+        """Добавление слова в словарь; существующее слово обновляется"""
+        try:
+            self.__cur.execute('''
+                INSERT INTO dictionary (informal_text, formal_text, explanation, normalized_informal, first_letter)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(normalized_informal) DO UPDATE SET
+                    informal_text = excluded.informal_text,
+                    formal_text = excluded.formal_text,
+                    explanation = excluded.explanation,
+                    first_letter = excluded.first_letter
+            ''', (informal, formal, explanation, normalize_text(informal), dictionary_letter(informal)))
+            self.__db.commit()
+            return True
+        except sqlite3.Error as e:
+            logger.error("Ошибка при добавлении слова в словарь: %s", e)
+            return False
+
+    def get_dictionary_word(self, informal: str) -> Optional[Dict]:
+        try:
+            self.__cur.execute(
+                'SELECT * FROM dictionary WHERE normalized_informal = ?', (normalize_text(informal),)
+            )
+            rows = self._fetch_dicts()
+            return rows[0] if rows else None
+        except sqlite3.Error as e:
+            logger.error("Ошибка при поиске слова в словаре: %s", e)
+            return None
+
+    def delete_dictionary_word(self, informal: str) -> bool:
+        try:
+            self.__cur.execute(
+                'DELETE FROM dictionary WHERE normalized_informal = ?', (normalize_text(informal),)
+            )
+            self.__db.commit()
+            return self.__cur.rowcount > 0
+        except sqlite3.Error as e:
+            logger.error("Ошибка при удалении слова из словаря: %s", e)
+            return False
+
+    def get_dictionary_words(self, letter: str = None, limit: int = 10,
+                             after: Tuple[str, int] = None, before: Tuple[str, int] = None) -> List[Dict]:
+        """Страница словаря с пагинацией по ключу: after/before - (normalized_informal, id) крайнего слова.
+        Курсор не зависит от того, осталось ли это слово в словаре"""
+        conditions = []
+        params = []
+        if letter:
+            conditions.append('first_letter = ?')
+            params.append(letter)
+
+        order = 'ASC'
+        if after is not None:
+            conditions.append('(normalized_informal, id) > (?, ?)')
+            params.extend(after)
+        elif before is not None:
+            conditions.append('(normalized_informal, id) < (?, ?)')
+            params.extend(before)
+            order = 'DESC'
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        try:
+            self.__cur.execute(f'''
+                SELECT id, normalized_informal, informal_text, formal_text, explanation FROM dictionary
+                {where}
+                ORDER BY normalized_informal {order}, id {order}
+                LIMIT ?
+            ''', (*params, limit))
+            rows = self._fetch_dicts()
+            if order == 'DESC':
+                rows.reverse()
+            return rows
+        except sqlite3.Error as e:
+            logger.error("Ошибка при получении страницы словаря: %s", e)
+            return []
+
+    def search_dictionary_words(self, search_text: str, limit: int = 50) -> List[Dict]:
+        """Поиск слов словаря по началу слова (диапазон по уникальному индексу)"""
+        prefix = normalize_text(search_text)
+        if not prefix:
+            return []
+        try:
+            self.__cur.execute('''
+                SELECT * FROM dictionary
+                WHERE normalized_informal >= ? AND normalized_informal < ?
+                ORDER BY normalized_informal
+                LIMIT ?
+            ''', (prefix, prefix + '\uffff', limit))
+            return self._fetch_dicts()
+        except sqlite3.Error as e:
+            logger.error("Ошибка при поиске в словаре: %s", e)
+            return []
+
+    def search_dictionary_word_ids(self, search_text: str, limit: int = 200) -> List[int]:
+        """id слов словаря по началу слова; читается только уникальный индекс"""
+        prefix = normalize_text(search_text)
+        if not prefix:
+            return []
+        try:
+            self.__cur.execute('''
+                SELECT id FROM dictionary
+                WHERE normalized_informal >= ? AND normalized_informal < ?
+                ORDER BY normalized_informal
+                LIMIT ?
+            ''', (prefix, prefix + '\uffff', limit))
+            return [row[0] for row in self.__cur.fetchall()]
+        except sqlite3.Error as e:
+            logger.error("Ошибка при поиске в словаре: %s", e)
+            return []
+
+    def get_dictionary_words_by_ids(self, ids: List[int]) -> List[Dict]:
+        try:
+            return self._fetch_by_ids('dictionary', ids)
+        except sqlite3.Error as e:
+            logger.error("Ошибка при получении слов словаря: %s", e)
+            return []
+
+    def get_dictionary_letter_counts(self) -> Dict[str, int]:
+        try:
+            self.__cur.execute('SELECT letter, count FROM dictionary_letter_counts WHERE count > 0')
+            return dict(self.__cur.fetchall())
+        except sqlite3.Error as e:
+            logger.error("Ошибка при получении статистики словаря: %s", e)
+            return {}
+
+    def get_all_dictionary_words(self) -> List[Tuple[str, str, Optional[str]]]:
+        """Все слова словаря для построения индекса в памяти"""
+        try:
+            self.__cur.execute('SELECT informal_text, formal_text, explanation FROM dictionary')
+            return self.__cur.fetchall()
+        except sqlite3.Error as e:
+            logger.error("Ошибка при загрузке словаря: %s", e)
             return []
 
     # Методы админ-панели
@@ -88,7 +344,7 @@ class FDataBase:
             self.__cur.execute("INSERT INTO admins (login, role) VALUES (?, ?)", (login, role))
             self.__db.commit()
         except sqlite3.Error as e:
-            print("Failed to add admin:", str(e))
+            logger.error("Failed to add admin: %s", e)
 
     def getAdminByLogin(self, login: str) -> str | None:
         try:
@@ -97,7 +353,7 @@ class FDataBase:
             if res: 
                 return res[2]
         except sqlite3.Error as e:
-            print("Failed to get admin role by login:", str(e))
+            logger.error("Failed to get admin role by login: %s", e)
         return None
 
     def getAdmin(self):
@@ -107,168 +363,212 @@ class FDataBase:
             if res:
                 return res
         except sqlite3.Error as e:
-            print("Failed to get admins:", str(e))
+            logger.error("Failed to get admins: %s", e)
         return []
 
+    def get_admin_roles(self) -> Dict[str, str]:
+        """Роли всех админов по логину (при повторах - первая запись, как в getAdminByLogin)"""
+        try:
+            self.__cur.execute("SELECT login, role FROM admins ORDER BY id DESC")
+            return dict(self.__cur.fetchall())
+        except sqlite3.Error as e:
+            logger.error("Failed to get admin roles: %s", e)
+            return {}
+
+    def get_data_version(self, name: str) -> int:
+        """Номер версии данных из data_versions; меняется триггерами при записи"""
+        try:
+            self.__cur.execute("SELECT version FROM data_versions WHERE name=?", (name,))
+            res = self.__cur.fetchone()
+            if res:
+                return res[0]
+        except sqlite3.Error as e:
+            logger.error("Failed to get data version: %s", e)
+        return 0
+
     def removeAdminByID(self, AdminID: int):
         try:
             self.__cur.execute("DELETE FROM admins WHERE id=?", (AdminID,))
             self.__db.commit()
         except sqlite3.Error as e:
-            print("Failed to remove admin by id:", str(e))
+            logger.error("Failed to remove admin by id: %s", e)
 
     # Базовая статистика
+    def _get_counters(self) -> Dict[str, int]:
+        """Общие счётчики из stats_counters (ведут триггеры на translations)"""
+        self.__cur.execute('SELECT name, value FROM stats_counters')
+        return dict(self.__cur.fetchall())
+
     def get_stats(self) -> Dict:
         try:
-            self.__cur.execute('SELECT COUNT(*) FROM translations')
-            total_translations = self.__cur.fetchone()[0]
-            
-            self.__cur.execute('SELECT COUNT(DISTINCT user_id) FROM translations')
-            unique_users = self.__cur.fetchone()[0]
+            counters = self._get_counters()
             
             self.__cur.execute('SELECT COUNT(*) FROM admins')
             total_admins = self.__cur.fetchone()[0]
             
             return {
-                'total_translations': total_translations,
-                'unique_users': unique_users,
+                'total_translations': counters.get('total', 0),
+                'unique_users': counters.get('users', 0),
                 'total_admins': total_admins
             }
         except sqlite3.Error as e:
-            print(f"❌ Ошибка получения статистики: {e}")
+            logger.error("Ошибка получения статистики: %s", e)
             return {}
 
+    def get_top_users(self, limit: int = 10) -> List[Tuple]:
+        """Самые активные пользователи: (user_id, total, to_formal, to_informal, last_activity)"""
+        try:
+            self.__cur.execute('''
+                SELECT user_id, total, to_formal, to_informal, last_activity
+                FROM user_stats
+                WHERE total > 0
+                ORDER BY total DESC
+                LIMIT ?
+            ''', (limit,))
+            return self.__cur.fetchall()
+        except sqlite3.Error as e:
+            logger.error("Ошибка получения топа пользователей: %s", e)
+            return []
+
+    def get_daily_stats(self, days: int = 7) -> List[Tuple[str, int]]:
+        """Переводы по дням (UTC) за последние days дней, от новых к старым"""
+        try:
+            since = (utc_now() - timedelta(days=days)).strftime('%Y-%m-%d')
+            self.__cur.execute('''
+                SELECT day, SUM(count)
+                FROM daily_stats
+                WHERE day > ?
+                GROUP BY day
+                ORDER BY day DESC
+            ''', (since,))
+            return self.__cur.fetchall()
+        except sqlite3.Error as e:
+            logger.error("Ошибка получения статистики по дням: %s", e)
+            return []
+
     # Новые методы для расширенной статистики
     def get_detailed_stats(self) -> Dict:
-        """Расширенная статистика системы"""
+        """Расширенная статистика системы (из сводных таблиц, без сканирования истории)"""
         try:
-            # Базовая статистика
-            self.__cur.execute('SELECT COUNT(*) FROM translations')
-            total_translations = self.__cur.fetchone()[0]
-            
-            self.__cur.execute('SELECT COUNT(DISTINCT user_id) FROM translations')
-            unique_users = self.__cur.fetchone()[0]
+            # Базовая статистика и направления перевода
+            counters = self._get_counters()
             
             self.__cur.execute('SELECT COUNT(*) FROM admins')
             total_admins = self.__cur.fetchone()[0]
             
-            # Статистика по направлениям перевода
-            self.__cur.execute('SELECT COUNT(*) FROM translations WHERE direction = "to_formal"')
-            to_formal_count = self.__cur.fetchone()[0]
-            
-            self.__cur.execute('SELECT COUNT(*) FROM translations WHERE direction = "to_informal"')
-            to_informal_count = self.__cur.fetchone()[0]
-            
-            # Активность за последние 7 дней
-            week_ago = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d %H:%M:%S')
-            self.__cur.execute('SELECT COUNT(*) FROM translations WHERE created_at > ?', (week_ago,))
-            last_week_activity = self.__cur.fetchone()[0]
+            # Статистика по дням (последние 7 дней) и активность за неделю
+            daily_stats = self.get_daily_stats(7)
+            last_week_activity = sum(count for _, count in daily_stats)
             
             # Самые активные пользователи
-            self.__cur.execute('''
-                SELECT user_id, COUNT(*) as translation_count 
-                FROM translations 
-                GROUP BY user_id 
-                ORDER BY translation_count DESC 
-                LIMIT 10
-            ''')
-            top_users = self.__cur.fetchall()
-            
-            # Статистика по дням (последние 7 дней)
-            self.__cur.execute('''
-                SELECT DATE(created_at) as day, COUNT(*) as count 
-                FROM translations 
-                WHERE created_at > ? 
-                GROUP BY DATE(created_at) 
-                ORDER BY day DESC
-            ''', (week_ago,))
-            daily_stats = self.__cur.fetchall()
+            top_users = [(row[0], row[1]) for row in self.get_top_users(10)]
             
             # Популярные слова для перевода (топ 10)
             self.__cur.execute('''
-                SELECT informal_text, COUNT(*) as usage_count 
-                FROM translations 
-                GROUP BY informal_text 
-                ORDER BY usage_count DESC 
+                SELECT informal_text, count
+                FROM phrase_stats
+                WHERE count > 0
+                ORDER BY count DESC
                 LIMIT 10
             ''')
             popular_words = self.__cur.fetchall()
             
             return {
-                'total_translations': total_translations,
-                'unique_users': unique_users,
+                'total_translations': counters.get('total', 0),
+                'unique_users': counters.get('users', 0),
                 'total_admins': total_admins,
-                'to_formal_count': to_formal_count,
-                'to_informal_count': to_informal_count,
+                'to_formal_count': counters.get('to_formal', 0),
+                'to_informal_count': counters.get('to_informal', 0),
                 'last_week_activity': last_week_activity,
                 'top_users': top_users,
                 'daily_stats': daily_stats,
                 'popular_words': popular_words
             }
         except sqlite3.Error as e:
-            print(f"❌ Ошибка получения детальной статистики: {e}")
+            logger.error("Ошибка получения детальной статистики: %s", e)
             return {}
     
+    def get_user_summary(self, user_id) -> Dict:
+        """Счётчики пользователя одной строкой user_stats (ведут триггеры на translations)"""
+        try:
+            self.__cur.execute(
+                'SELECT total, to_formal, to_informal, last_activity FROM user_stats WHERE user_id = ?',
+                (user_id,)
+            )
+            row = self.__cur.fetchone() or (0, 0, 0, None)
+            return {
+                'total_translations': row[0],
+                'to_formal_count': row[1],
+                'to_informal_count': row[2],
+                'last_activity': row[3]
+            }
+        except sqlite3.Error as e:
+            logger.error("Ошибка получения счётчиков пользователя: %s", e)
+            return {}
+
     def get_user_stats(self, user_id: int) -> Dict:
         """Статистика конкретного пользователя"""
         try:
-            self.__cur.execute('SELECT COUNT(*) FROM translations WHERE user_id = ?', (user_id,))
-            user_translations = self.__cur.fetchone()[0]
-            
-            self.__cur.execute('SELECT COUNT(*) FROM translations WHERE user_id = ? AND direction = "to_formal"', (user_id,))
-            user_to_formal = self.__cur.fetchone()[0]
-            
-            self.__cur.execute('SELECT COUNT(*) FROM translations WHERE user_id = ? AND direction = "to_informal"', (user_id,))
-            user_to_informal = self.__cur.fetchone()[0]
+            summary = self.get_user_summary(user_id)
             
-            # Последняя активность
-            self.__cur.execute('SELECT MAX(created_at) FROM translations WHERE user_id = ?', (user_id,))
-            last_activity = self.__cur.fetchone()[0]
-            
-            # Популярные слова пользователя
-            self.__cur.execute('''
-                SELECT informal_text, COUNT(*) as usage_count 
-                FROM translations 
-                WHERE user_id = ? 
-                GROUP BY informal_text 
-                ORDER BY usage_count DESC 
-                LIMIT 5
-            ''', (user_id,))
-            user_popular_words = self.__cur.fetchall()
+            # Популярные слова пользователя (только его строки по индексу user_id)
+            user_popular_words = []
+            if summary.get('total_translations'):
+                self.__cur.execute('''
+                    SELECT informal_text, COUNT(*) as usage_count 
+                    FROM translations 
+                    WHERE user_id = ? 
+                    GROUP BY informal_text 
+                    ORDER BY usage_count DESC 
+                    LIMIT 5
+                ''', (user_id,))
+                user_popular_words = self.__cur.fetchall()
             
             return {
-                'user_translations': user_translations,
-                'user_to_formal': user_to_formal,
-                'user_to_informal': user_to_informal,
-                'last_activity': last_activity,
+                'user_translations': summary.get('total_translations', 0),
+                'user_to_formal': summary.get('to_formal_count', 0),
+                'user_to_informal': summary.get('to_informal_count', 0),
+                'last_activity': summary.get('last_activity'),
                 'user_popular_words': user_popular_words
             }
         except sqlite3.Error as e:
-            print(f"❌ Ошибка получения статистики пользователя: {e}")
+            logger.error("Ошибка получения статистики пользователя: %s", e)
             return {}
     
+    def get_activity_since(self, since: datetime, after_id: int = 0) -> List[Tuple[int, str, Optional[int]]]:
+        """id, время и пользователь переводов начиная с since и с id больше after_id"""
+        try:
+            self.__cur.execute(
+                'SELECT id, created_at, user_id FROM translations WHERE id > ? AND created_at >= ? ORDER BY id',
+                (after_id, format_timestamp(since))
+            )
+            return self.__cur.fetchall()
+        except sqlite3.Error as e:
+            logger.error("Ошибка получения недавней активности: %s", e)
+            return []
+
     def get_realtime_stats(self) -> Dict:
+        """Активность по базе; бот берёт эти цифры из памяти (ActivityTracker)"""
         try:
-            # Получаем текущее время в UTC (как в базе данных)
-            now_utc = datetime.utcnow()
+            now_utc = utc_now()
             
-            # Переводы за сегодня (используем UTC дату)
+            # Переводы за сегодня (UTC) - из сводной таблицы по дням
             today_utc = now_utc.strftime('%Y-%m-%d')
-            self.__cur.execute('SELECT COUNT(*) FROM translations WHERE DATE(created_at) = ?', (today_utc,))
+            self.__cur.execute('SELECT coalesce(SUM(count), 0) FROM daily_stats WHERE day = ?', (today_utc,))
             today_translations = self.__cur.fetchone()[0]
             
-            # Переводы за последний час (используем UTC время)
-            hour_ago_utc = (now_utc - timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S')
+            # Дальше - диапазоны по индексу created_at, а не DATE(created_at)
+            hour_ago_utc = format_timestamp(now_utc - timedelta(hours=1))
             self.__cur.execute('SELECT COUNT(*) FROM translations WHERE created_at > ?', (hour_ago_utc,))
             last_hour_activity = self.__cur.fetchone()[0]
             
-            # Переводы за последние 15 минут
-            fifteen_min_ago_utc = (now_utc - timedelta(minutes=15)).strftime('%Y-%m-%d %H:%M:%S')
+            fifteen_min_ago_utc = format_timestamp(now_utc - timedelta(minutes=15))
             self.__cur.execute('SELECT COUNT(*) FROM translations WHERE created_at > ?', (fifteen_min_ago_utc,))
             last_15min_activity = self.__cur.fetchone()[0]
             
             # Активные пользователи сегодня
-            self.__cur.execute('SELECT COUNT(DISTINCT user_id) FROM translations WHERE DATE(created_at) = ?', (today_utc,))
+            self.__cur.execute('SELECT COUNT(DISTINCT user_id) FROM translations WHERE created_at >= ?',
+                               (f"{today_utc} 00:00:00",))
             active_users_today = self.__cur.fetchone()[0]
             
             return {
@@ -278,5 +578,5 @@ class FDataBase:
                 'active_users_today': active_users_today
             }
         except sqlite3.Error as e:
-            print(f"❌ Ошибка получения реальной статистики: {e}")
-            return {}
\ No newline at end of file
+            logger.error("Ошибка получения реальной статистики: %s", e)
+            return {}
@@ -0,0 +1,95 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import List, Optional
+from database import connect_db
+from config import API_DB_POOL_SIZE, API_DB_POOL_TIMEOUT
+
+class PoolError(Exception):
+    """Нет доступного соединения: пул закрыт или все соединения заняты дольше timeout"""
+
+class ConnectionPool:
+    """Пул соединений SQLite одного процесса (воркера API).
+
+    Соединения создаются по мере надобности (не больше size), уже
+    настроены (WAL, PRAGMA) и после запроса возвращаются в пул, а не
+    закрываются. Пул потокобезопасен: соединение в каждый момент
+    используется одним потоком. Соединения открываются лениво, уже
+    в процессе воркера, поэтому после fork они не разделяются.
+    """
+
+    def __init__(self, path: str = 'translations.db', size: int = API_DB_POOL_SIZE,
+                 timeout: float = API_DB_POOL_TIMEOUT, row_factory=None):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self.row_factory = row_factory
+        # LIFO: чаще используются одни и те же "тёплые" соединения
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _create(self) -> Optional[sqlite3.Connection]:
+        with self._lock:
+            if len(self._all) >= self.size:
+                return None
+            # Соединение переходит между потоками пула, но не используется одновременно
+            connection = connect_db(self.path, check_same_thread=False)
+            if self.row_factory is not None:
+                connection.row_factory = self.row_factory
+            self._all.append(connection)
+            return connection
+
+    def acquire(self) -> sqlite3.Connection:
+        if self._closed:
+            raise PoolError("Пул соединений закрыт")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        connection = self._create()
+        if connection is not None:
+            return connection
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolError(f"Нет свободного соединения за {self.timeout} сек") from None
+
+    def release(self, connection: sqlite3.Connection):
+        # Незавершённая транзакция (ошибка в обработчике) не должна достаться следующему запросу
+        if connection.in_transaction:
+            connection.rollback()
+        if self._closed:
+            connection.close()
+        else:
+            self._idle.put(connection)
+
+    @contextmanager
+    def connection(self):
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def warm_up(self, count: int = 1):
+        """Заранее открывает соединения, чтобы первые запросы не ждали их создания"""
+        for _ in range(count):
+            connection = self._create()
+            if connection is None:
+                break
+            self._idle.put(connection)
+
+    def stats(self):
+        return {'size': self.size, 'open': len(self._all), 'idle': self._idle.qsize()}
+
+    def close(self):
+        """Закрывает свободные соединения; занятые закроются при возврате"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,49 @@
+# Настройки gunicorn для API: gunicorn -c gunicorn.conf.py wsgi:application
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = os.environ.get('API_BIND', '0.0.0.0:5000')
+
+# Пре-форк воркеры с потоками: запросы к GigaChat ждут сеть,
+# поэтому потоков больше, чем ядер; пул соединений БД - на воркер
+worker_class = 'gthread'
+workers = int(os.environ.get('API_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+threads = int(os.environ.get('API_THREADS', '8'))
+# Каждому потоку воркера - своё соединение из пула (config.API_DB_POOL_SIZE)
+os.environ.setdefault('API_DB_POOL_SIZE', str(threads))
+# Синхронно ждать GigaChat может только половина потоков (config.TRANSLATE_SYNC_WAITERS),
+# чтобы медленные переводы не занимали потоки истории, статистики и /api/health
+os.environ.setdefault('TRANSLATE_SYNC_WAITERS', str(max(threads // 2, 1)))
+# Метрики воркеров складываются через общий каталог (config.METRICS_MULTIPROC_DIR),
+# поэтому /metrics любого воркера отдаёт значения всего сервера
+os.environ.setdefault('METRICS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'slanglit-api-metrics'))
+
+# Приложение импортируется в каждом воркере: поток записи истории и
+# соединения SQLite не должны создаваться до fork
+preload_app = False
+
+# Перевод через GigaChat может идти дольше стандартных 30 секунд
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+# Логи приложения пишет utils.log (JSON в stdout)
+accesslog = None
+errorlog = '-'
+
+def on_starting(server):
+    """Запуск сервера: счётчики прошлого запуска не должны попасть в новые"""
+    shutil.rmtree(os.environ['METRICS_MULTIPROC_DIR'], ignore_errors=True)
+    os.makedirs(os.environ['METRICS_MULTIPROC_DIR'], exist_ok=True)
+
+def post_worker_init(worker):
+    """Воркер готов: заранее открываем соединения с БД"""
+    from wsgi import startup
+    startup()
+
+def worker_exit(server, worker):
+    """Остановка воркера: дописываем очередь истории и закрываем соединения"""
+    from wsgi import shutdown
+    shutdown()
@@ -3,6 +3,7 @@ from .translation_handlers import router as translation_router
 from .admin_handlers import router as admin_router
 from .history_handlers import router as history_router
 from .search_handlers import router as search_router
+from .dictionary_handlers import router as dictionary_router
 from .universal_handler import router as universal_router
 
 __all__ = [
@@ -11,5 +12,6 @@ __all__ = [
     'admin_router', 
     'history_router', 
     'search_router',
+    'dictionary_router',
     'universal_router'
 ]
\ No newline at end of file
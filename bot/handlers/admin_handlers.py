@@ -4,6 +4,7 @@ from aiogram.types import Message
 from utils.keyboards import get_admin_keyboard, cancel_keyboard, role_selection_keyboard, get_main_keyboard, get_stats_keyboard, get_user_stats_keyboard
 from utils.states import AdminStates, StatsStates
 from services.admin_service import AdminService
+from services.translation_service import TranslationService
 from datetime import datetime
 
 router = Router()
@@ -40,7 +41,7 @@ async def show_admins(message: Message, admin_service: AdminService):
         await message.answer("❌ У вас нет прав доступа")
         return
         
-    admins = admin_service.get_admins_list()
+    admins = await admin_service.get_admins_list()
     
     if not admins:
         await message.answer("📭 Список админов пуст")
@@ -110,7 +111,7 @@ async def add_admin_role(message: Message, state: FSMContext, admin_service: Adm
     data = await state.get_data()
     admin_login = data['admin_login']
     
-    success = admin_service.add_admin(admin_login, role_map[message.text])
+    success = await admin_service.add_admin(admin_login, role_map[message.text])
     
     if success:
         admin_role = admin_service.get_admin_role(message.from_user.id)
@@ -148,7 +149,7 @@ async def remove_admin_execute(message: Message, state: FSMContext, admin_servic
     
     try:
         admin_id = int(message.text)
-        success = admin_service.remove_admin(admin_id)
+        success = await admin_service.remove_admin(admin_id)
         
         if success:
             admin_role = admin_service.get_admin_role(message.from_user.id)
@@ -163,18 +164,30 @@ async def remove_admin_execute(message: Message, state: FSMContext, admin_servic
     await state.clear()
 
 @router.message(lambda message: message.text == "📊 Базовая статистика")
-async def show_basic_stats(message: Message, admin_service: AdminService):
+async def show_basic_stats(message: Message, admin_service: AdminService, translation_service: TranslationService):
     if not admin_service.is_user_admin(message.from_user.id):
         await message.answer("❌ У вас нет прав доступа")
         return
         
-    stats = admin_service.get_stats()
+    stats = await admin_service.get_stats()
+    cache_stats = translation_service.get_cache_stats()
+    dictionary_stats = translation_service.get_dictionary_stats()
     
     text = (
         "📊 Базовая статистика системы:\n\n"
         f"• 📖 Всего переводов: {stats.get('total_translations', 0)}\n"
         f"• 👥 Уникальных пользователей: {stats.get('unique_users', 0)}\n"
         f"• 👮 Администраторов: {stats.get('total_admins', 0)}\n\n"
+        "🗄 Кэш переводов:\n"
+        f"• ✅ Попаданий: {cache_stats['memory_hits'] + cache_stats['disk_hits']} "
+        f"({cache_stats['hit_rate']:.0%})\n"
+        f"• ❌ Промахов: {cache_stats['misses']}\n"
+        f"• 🔗 Объединено одинаковых запросов: {cache_stats['coalesced']}\n"
+        f"• ⏱ Сэкономлено: ~{cache_stats['saved_latency_seconds']:.0f} сек\n\n"
+        "📚 Словарь:\n"
+        f"• 🔤 Слов в словаре: {dictionary_stats['words']}\n"
+        f"• ⚡ Переведено без нейросети: {dictionary_stats['hits']} "
+        f"({dictionary_stats['hit_rate']:.0%})\n\n"
         "🤖 Переводчик: GigaChat Neural Network"
     )
     
@@ -186,7 +199,7 @@ async def show_detailed_stats(message: Message, admin_service: AdminService):
         await message.answer("❌ У вас нет прав доступа")
         return
         
-    stats = admin_service.get_detailed_stats()
+    stats = await admin_service.get_detailed_stats()
     
     text = "📈 Детальная статистика системы:\n\n"
     text += f"• 📊 Всего переводов: {stats.get('total_translations', 0)}\n"
@@ -225,23 +238,21 @@ async def show_top_users(message: Message, admin_service: AdminService):
         await message.answer("❌ У вас нет прав доступа")
         return
         
-    stats = admin_service.get_detailed_stats()
-    top_users = stats.get('top_users', [])
+    top_users = await admin_service.get_top_users(10)
     
     if not top_users:
         await message.answer("📭 Нет данных о пользователях")
         return
     
     text = "🏆 Топ самых активных пользователей:\n\n"
-    for i, (user_id, count) in enumerate(top_users, 1):
-        user_stats = admin_service.get_user_stats(user_id)
+    for i, (user_id, count, to_formal, to_informal, last_activity) in enumerate(top_users, 1):
         text += f"{i}. 👤 ID: {user_id}\n"
         text += f"   📊 Переводов: {count}\n"
-        text += f"   💼 → Формальных: {user_stats.get('user_to_formal', 0)}\n"
-        text += f"   🔥 → Неформальных: {user_stats.get('user_to_informal', 0)}\n"
+        text += f"   💼 → Формальных: {to_formal}\n"
+        text += f"   🔥 → Неформальных: {to_informal}\n"
         
-        if user_stats.get('last_activity'):
-            text += f"   🕐 Последняя активность: {user_stats['last_activity'][:16]}\n"
+        if last_activity:
+            text += f"   🕐 Последняя активность: {last_activity[:16]}\n"
         
         text += "\n"
     
@@ -272,9 +283,9 @@ async def show_user_stats(message: Message, state: FSMContext, admin_service: Ad
         return
     
     user_id = int(message.text)
-    user_stats = admin_service.get_user_stats(user_id)
+    user_stats = await admin_service.get_user_stats(user_id)
     
-    if user_stats['user_translations'] == 0:
+    if not user_stats.get('user_translations'):
         await message.answer(f"❌ Пользователь с ID {user_id} не найден или не имеет переводов")
         return
     
@@ -302,17 +313,19 @@ async def show_realtime_stats(message: Message, admin_service: AdminService):
         await message.answer("❌ У вас нет прав доступа")
         return
         
-    stats = admin_service.get_realtime_stats()
-    detailed_stats = admin_service.get_detailed_stats()
+    stats = await admin_service.get_realtime_stats()
+    daily_stats = await admin_service.get_daily_stats(7)
     
     text = "🕐 Активность в реальном времени:\n\n"
     text += f"• 📊 Переводов сегодня: {stats.get('today_translations', 0)}\n"
     text += f"• ⏰ Переводов за последний час: {stats.get('last_hour_activity', 0)}\n"
     text += f"• ⚡ Переводов за последние 15 минут: {stats.get('last_15min_activity', 0)}\n"
-    text += f"• 👥 Активных пользователей сегодня: {stats.get('active_users_today', 0)}\n\n"
+    text += f"• 👥 Активных пользователей сегодня: {stats.get('active_users_today', 0)}\n"
+    if 'active_users_last_hour' in stats:
+        text += f"• 🙋 Активных пользователей за час: {stats['active_users_last_hour']}\n"
+    text += "\n"
     
     # Активность по дням
-    daily_stats = detailed_stats.get('daily_stats', [])
     if daily_stats:
         text += "📅 Активность по дням:\n"
         for day, count in daily_stats[:7]:  # Последние 7 дней
@@ -1,11 +1,15 @@
+import logging
 from aiogram import Router, types
 from aiogram.fsm.context import FSMContext
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 from utils.keyboards import (get_main_keyboard, cancel_keyboard, dictionary_management_keyboard, 
                            confirm_keyboard, get_dictionary_main_keyboard, get_alphabet_keyboard,
-                           get_letter_navigation_keyboard)
+                           get_letter_navigation_keyboard, page_cursor_data, parse_page_cursor)
 from utils.states import AddWordStates, DeleteWordStates, SearchStates
 from services.dictionary_service import DictionaryService
+from services.admin_service import AdminService
+
+logger = logging.getLogger(__name__)
 
 router = Router()
 
@@ -36,7 +40,7 @@ async def search_dictionary_button(message: types.Message, state: FSMContext):
 # Алфавитный просмотр
 @router.message(lambda message: message.text == "🔤 По алфавиту")
 async def show_alphabet(message: types.Message, dictionary_service: DictionaryService):
-    alphabet_stats = dictionary_service.get_alphabet_stats()
+    alphabet_stats = await dictionary_service.get_alphabet_stats()
     
     text = "🔤 Выберите букву для просмотра слов:\n\n"
     
@@ -64,9 +68,18 @@ async def show_alphabet(message: types.Message, dictionary_service: DictionarySe
 async def show_all_words(message: types.Message, dictionary_service: DictionaryService):
     await show_dictionary_page(message, dictionary_service)
 
-async def show_dictionary_page(message: types.Message, dictionary_service: DictionaryService, offset: int = 0):
-    words = dictionary_service.get_dictionary_page(limit=10, offset=offset)
-    total_words = dictionary_service.get_dictionary_count()
+def _page_cursor(action: str = None, cursor: tuple = None) -> dict:
+    """Параметры пагинации по ключу из callback-данных"""
+    if action == 'next':
+        return {'after': cursor}
+    if action == 'prev':
+        return {'before': cursor}
+    return {}
+
+async def show_dictionary_page(message: types.Message, dictionary_service: DictionaryService, offset: int = 0,
+                               action: str = None, cursor: tuple = None):
+    words = await dictionary_service.get_dictionary_page(limit=10, **_page_cursor(action, cursor))
+    total_words = await dictionary_service.get_dictionary_count()
     
     if not words:
         await message.answer("📭 Словарь пуст")
@@ -87,9 +100,9 @@ async def show_dictionary_page(message: types.Message, dictionary_service: Dicti
     
     nav_buttons = []
     if offset > 0:
-        nav_buttons.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"dict_prev_{offset-10}"))
+        nav_buttons.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=page_cursor_data('dict', 'prev', offset-10, words[0])))
     if offset + 10 < total_words:
-        nav_buttons.append(InlineKeyboardButton(text="Вперед ➡️", callback_data=f"dict_next_{offset+10}"))
+        nav_buttons.append(InlineKeyboardButton(text="Вперед ➡️", callback_data=page_cursor_data('dict', 'next', offset+10, words[-1])))
     
     if nav_buttons:
         keyboard_buttons.append(nav_buttons)
@@ -116,16 +129,11 @@ async def show_words_by_letter(message: types.Message, dictionary_service: Dicti
     
     await show_letter_words(message, dictionary_service, letter_text, 0)
 
-async def show_letter_words(message: types.Message, dictionary_service: DictionaryService, letter: str, offset: int = 0):
-    if letter == '0-9':
-        # Для цифр и символов используем специальную логику
-        words = dictionary_service.get_words_by_letter('0-9', 1000)  # Большой лимит для цифр
-        total_words = dictionary_service.get_words_count_by_letter('0-9')
-        page_words = words[offset:offset+10]
-    else:
-        words = dictionary_service.get_words_by_letter(letter, 10, offset)
-        total_words = dictionary_service.get_words_count_by_letter(letter)
-        page_words = words
+async def show_letter_words(message: types.Message, dictionary_service: DictionaryService, letter: str, offset: int = 0,
+                            action: str = None, cursor: tuple = None):
+    # Цифры и символы хранятся под буквой '0-9', поэтому выборка одинаковая для всех букв
+    page_words = await dictionary_service.get_words_by_letter(letter, 10, **_page_cursor(action, cursor))
+    total_words = await dictionary_service.get_words_count_by_letter(letter)
     
     if not page_words:
         await message.answer(f"📭 На букву '{letter}' слов не найдено")
@@ -144,7 +152,7 @@ async def show_letter_words(message: types.Message, dictionary_service: Dictiona
         else:
             text += "\n\n"
     
-    reply_markup = get_letter_navigation_keyboard(letter, offset, total_words)
+    reply_markup = get_letter_navigation_keyboard(letter, offset, total_words, page_words[0], page_words[-1])
     
     if isinstance(message, CallbackQuery):
         await message.message.edit_text(text, reply_markup=reply_markup, parse_mode='Markdown')
@@ -155,17 +163,15 @@ async def show_letter_words(message: types.Message, dictionary_service: Dictiona
 @router.callback_query(lambda c: c.data.startswith('letter_'))
 async def handle_letter_pagination(callback: CallbackQuery, dictionary_service: DictionaryService):
     try:
-        # Формат: letter_{letter}_{action}_{offset}
-        parts = callback.data.split('_')
-        letter = parts[1]
-        action = parts[2]
-        offset = int(parts[3])
+        # Формат: letter_{letter}_{action}_{offset}_{id}_{ключ слова}
+        letter = callback.data.split('_')[1]
+        action, offset, cursor = parse_page_cursor(callback.data, f"letter_{letter}")
         
-        await show_letter_words(callback, dictionary_service, letter, offset)
+        await show_letter_words(callback, dictionary_service, letter, offset, action, cursor)
         await callback.answer()
     except Exception as e:
         await callback.answer("❌ Ошибка при загрузке")
-        print(f"❌ Ошибка в handle_letter_pagination: {e}")
+        logger.error("Ошибка в handle_letter_pagination: %s", e)
 
 @router.callback_query(lambda c: c.data == "back_to_alphabet")
 async def back_to_alphabet(callback: CallbackQuery, dictionary_service: DictionaryService):
@@ -181,13 +187,12 @@ async def show_alphabet_callback(callback: CallbackQuery, dictionary_service: Di
 @router.callback_query(lambda c: c.data.startswith('dict_'))
 async def handle_dictionary_pagination(callback: CallbackQuery, dictionary_service: DictionaryService):
     try:
-        action, offset = callback.data.split('_')[1:]
-        offset = int(offset)
-        await show_dictionary_page(callback, dictionary_service, offset)
+        action, offset, cursor = parse_page_cursor(callback.data, 'dict')
+        await show_dictionary_page(callback, dictionary_service, offset, action, cursor)
         await callback.answer()
     except Exception as e:
         await callback.answer("❌ Ошибка при загрузке")
-        print(f"❌ Ошибка в handle_dictionary_pagination: {e}")
+        logger.error("Ошибка в handle_dictionary_pagination: %s", e)
 
 # Поиск в словаре (из инлайн кнопки)
 @router.callback_query(lambda c: c.data == "search_dictionary")
@@ -202,8 +207,20 @@ async def start_search_dictionary_callback(callback: CallbackQuery, state: FSMCo
     await callback.answer()
 
 # Админские функции (добавление/удаление слов)
+@router.message(lambda message: message.text == "📚 Управление словарём")
+async def dictionary_management_menu(message: types.Message, admin_service: AdminService):
+    if not admin_service.is_user_admin(message.from_user.id):
+        await message.answer("❌ У вас нет прав доступа")
+        return
+    
+    await message.answer("📚 Управление словарём\n\nВыберите действие:", reply_markup=dictionary_management_keyboard)
+
 @router.message(lambda message: message.text == "➕ Добавить слово")
-async def add_word_start(message: types.Message, state: FSMContext):
+async def add_word_start(message: types.Message, state: FSMContext, admin_service: AdminService):
+    if not admin_service.is_user_admin(message.from_user.id):
+        await message.answer("❌ У вас нет прав доступа")
+        return
+    
     await state.set_state(AddWordStates.waiting_for_informal)
     await message.answer(
         "Введите неформальное слово/фразу:\n"
@@ -255,7 +272,7 @@ async def add_word_explanation(message: types.Message, state: FSMContext, dictio
     formal = data['formal']
     explanation = message.text if message.text != '-' else ''
     
-    if dictionary_service.add_word(informal, formal, explanation):
+    if await dictionary_service.add_word(informal, formal, explanation):
         response = f"✅ Слово добавлено в словарь:\n🔥 `{informal}` → 💼 `{formal}`"
         if explanation:
             response += f"\n📚 {explanation}"
@@ -266,7 +283,11 @@ async def add_word_explanation(message: types.Message, state: FSMContext, dictio
     await state.clear()
 
 @router.message(lambda message: message.text == "➖ Удалить слово")
-async def delete_word_start(message: types.Message, state: FSMContext):
+async def delete_word_start(message: types.Message, state: FSMContext, admin_service: AdminService):
+    if not admin_service.is_user_admin(message.from_user.id):
+        await message.answer("❌ У вас нет прав доступа")
+        return
+    
     await state.set_state(DeleteWordStates.waiting_for_word_input)
     await message.answer(
         "Введите неформальное слово для удаления:\n"
@@ -283,7 +304,7 @@ async def delete_word_input(message: types.Message, state: FSMContext, dictionar
         return
     
     word_text = message.text.strip()
-    word = dictionary_service.get_word_by_informal(word_text)
+    word = await dictionary_service.get_word_by_informal(word_text)
     
     if not word:
         await message.answer(f"❌ Слово `{word_text}` не найдено в словаре")
@@ -310,7 +331,7 @@ async def delete_word_confirmation(message: types.Message, state: FSMContext, di
         data = await state.get_data()
         word_text = data['word_to_delete']
         
-        if dictionary_service.delete_word(word_text):
+        if await dictionary_service.delete_word(word_text):
             await message.answer(f"✅ Слово `{word_text}` удалено из словаря", reply_markup=dictionary_management_keyboard)
         else:
             await message.answer(f"❌ Ошибка при удалении слова `{word_text}`", reply_markup=dictionary_management_keyboard)
@@ -1,30 +1,53 @@
+import logging
 from aiogram import Router, types
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 from services.history_service import HistoryService
 
+logger = logging.getLogger(__name__)
+
 router = Router()
 
 @router.message(lambda message: message.text == "📖 История")
 async def history_button(message: types.Message, history_service: HistoryService):
     await show_history(message, history_service)
 
-async def show_history(message: types.Message, history_service: HistoryService, offset: int = 0):
-    translations = history_service.get_user_history(message.from_user.id, 1000)
-    
-    if not translations:
-        await message.answer("📭 Ваша история переводов пуста")
-        return
-    
-    if offset >= len(translations):
-        offset = 0
-    
-    page_translations = translations[offset:offset+10]
-    
+HISTORY_PAGE_SIZE = 10
+
+async def show_history(message: types.Message, history_service: HistoryService, offset: int = 0,
+                       action: str = None, cursor: int = None):
+    user_id = message.from_user.id
+    # Курсор - id крайней записи на текущей странице: "next" читает записи старше
+    # последней, "prev" - новее первой
+    page = await history_service.get_history_page(
+        user_id, HISTORY_PAGE_SIZE,
+        older_than_id=cursor if action == 'next' else None,
+        newer_than_id=cursor if action == 'prev' else None
+    )
+    page_translations = page['items']
+    total = page['total']
+
+    if not page_translations and action == 'prev':
+        # Предыдущих записей не осталось (например, удалены) - показываем первую страницу
+        offset, action = 0, None
+        page = await history_service.get_history_page(user_id, HISTORY_PAGE_SIZE)
+        page_translations = page['items']
+
     if not page_translations:
-        await message.answer("📭 На этой странице нет переводов")
+        if total:
+            await message.answer("📭 На этой странице нет переводов")
+        else:
+            await message.answer("📭 Ваша история переводов пуста")
         return
-    
-    text = f"📖 Ваша история переводов (стр. {offset//10 + 1} из {(len(translations)-1)//10 + 1}):\n\n"
+
+    # Для "prev" has_more означает наличие более новых записей, для остальных - более старых
+    if action == 'prev':
+        has_newer, has_older = page['has_more'], True
+        if not has_newer:
+            offset = 0
+    else:
+        has_newer, has_older = offset > 0, page['has_more']
+
+    text = f"📖 Ваша история переводов (стр. {offset//HISTORY_PAGE_SIZE + 1} из {max(total - 1, 0)//HISTORY_PAGE_SIZE + 1}):\n\n"
     for i, trans in enumerate(page_translations, offset + 1):
         direction = trans.get('direction', 'to_formal')
         if direction == 'to_formal':
@@ -45,10 +68,16 @@ async def show_history(message: types.Message, history_service: HistoryService,
     keyboard_buttons.append([InlineKeyboardButton(text="🔍 Поиск в истории", callback_data="search_history")])
     
     nav_buttons = []
-    if offset > 0:
-        nav_buttons.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"history_prev_{offset-10}"))
-    if offset + 10 < len(translations):
-        nav_buttons.append(InlineKeyboardButton(text="Вперед ➡️", callback_data=f"history_next_{offset+10}"))
+    if has_newer:
+        nav_buttons.append(InlineKeyboardButton(
+            text="⬅️ Назад",
+            callback_data=f"history_prev_{page_translations[0]['id']}_{max(offset - HISTORY_PAGE_SIZE, 0)}"
+        ))
+    if has_older:
+        nav_buttons.append(InlineKeyboardButton(
+            text="Вперед ➡️",
+            callback_data=f"history_next_{page_translations[-1]['id']}_{offset + HISTORY_PAGE_SIZE}"
+        ))
     
     if nav_buttons:
         keyboard_buttons.append(nav_buttons)
@@ -63,10 +92,9 @@ async def show_history(message: types.Message, history_service: HistoryService,
 @router.callback_query(lambda c: c.data.startswith('history_'))
 async def handle_history_pagination(callback: CallbackQuery, history_service: HistoryService):
     try:
-        action, offset = callback.data.split('_')[1:]
-        offset = int(offset)
-        await show_history(callback, history_service, offset)
+        action, cursor, offset = callback.data.split('_')[1:]
+        await show_history(callback, history_service, int(offset), action, int(cursor))
         await callback.answer()
     except Exception as e:
         await callback.answer("❌ Ошибка при загрузке")
-        print(f"❌ Ошибка в handle_history_pagination: {e}")
\ No newline at end of file
+        logger.error("Ошибка в handle_history_pagination: %s", e)
\ No newline at end of file
@@ -2,11 +2,12 @@ from aiogram import Router, types
 from aiogram.filters import Command, CommandStart
 from aiogram.fsm.context import FSMContext
 from utils.keyboards import get_main_keyboard
+from services.admin_service import AdminService
 
 router = Router()
 
 @router.message(CommandStart())
-async def start_command(message: types.Message):
+async def start_command(message: types.Message, admin_service: AdminService):
     user_id = message.from_user.id
     await message.answer(
         f"👋 Привет! Я бот для перевода между формальным и неформальным стилем.\n\n"
@@ -14,14 +15,14 @@ async def start_command(message: types.Message):
         f"🤖 Переводчик: GigaChat Neural Network\n"
         f"🌐 Для веб-версии используйте этот ID\n"
         f"📝 Используй кнопки для навигации!",
-        reply_markup=get_main_keyboard(message.from_user.id),
+        reply_markup=get_main_keyboard(admin_service.is_user_admin(message.from_user.id)),
         parse_mode='Markdown'
     )
 
 @router.message(lambda message: message.text == "⬅️ Назад в меню")
-async def go_back_to_main_menu(message: types.Message, state: FSMContext):
+async def go_back_to_main_menu(message: types.Message, state: FSMContext, admin_service: AdminService):
     await state.clear()
     await message.answer(
         "Главное меню:",
-        reply_markup=get_main_keyboard(message.from_user.id)
+        reply_markup=get_main_keyboard(admin_service.is_user_admin(message.from_user.id))
     )
\ No newline at end of file
@@ -1,3 +1,4 @@
+import logging
 from aiogram import Router, types
 from aiogram.fsm.context import FSMContext
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
@@ -5,6 +6,10 @@ from utils.keyboards import cancel_keyboard, get_main_keyboard
 from utils.states import SearchStates
 from services.history_service import HistoryService
 from services.search_service import SearchService
+from services.dictionary_service import DictionaryService
+from services.admin_service import AdminService
+
+logger = logging.getLogger(__name__)
 
 router = Router()
 
@@ -22,60 +27,62 @@ async def start_search_history(callback: CallbackQuery, state: FSMContext):
 @router.message(SearchStates.waiting_for_search)
 async def handle_search(message: types.Message, state: FSMContext, 
                        history_service: HistoryService, 
-                       search_service: SearchService):
+                       search_service: SearchService,
+                       dictionary_service: DictionaryService, admin_service: AdminService):
     if message.text == "❌ Отменить":
         await state.clear()
-        await message.answer("✅ Поиск отменен", reply_markup=get_main_keyboard(message.from_user.id))
+        await message.answer("✅ Поиск отменен", reply_markup=get_main_keyboard(admin_service.is_user_admin(message.from_user.id)))
         return
     
     search_text = message.text
     data = await state.get_data()
     search_type = data.get('search_type', 'history')
     
-    results = history_service.search_user_history(search_text, message.from_user.id)
+    if search_type == 'dictionary':
+        result_ids = await dictionary_service.search_word_ids(search_text)
+    else:
+        result_ids = await history_service.search_user_history_ids(search_text, message.from_user.id)
     
-    if not results:
+    if not result_ids:
         await message.answer(f"🔍 По запросу '{search_text}' ничего не найдено")
         await state.clear()
-        await message.answer("Возврат в главное меню", reply_markup=get_main_keyboard(message.from_user.id))
+        await message.answer("Возврат в главное меню", reply_markup=get_main_keyboard(admin_service.is_user_admin(message.from_user.id)))
         return
     
-    await state.update_data(
-        search_results=results,
-        search_type=search_type,
-        search_text=search_text,
-        current_offset=0
-    )
-    
-    await show_search_results(message, state, search_service, 0)
+    # В FSM ничего не сохраняем: id результатов лежат в сессии, токен - в кнопках
+    token = await search_service.start_session(message.from_user.id, search_type, search_text, result_ids)
+    await show_search_results(message, search_service, token, 0)
 
-async def show_search_results(message: types.Message, state: FSMContext, search_service: SearchService, offset: int = 0):
-    data = await state.get_data()
-    results = data.get('search_results', [])
-    search_type = data.get('search_type', 'history')
-    search_text = data.get('search_text', '')
+async def show_search_results(message: types.Message, search_service: SearchService, token: str, offset: int = 0):
+    session = await search_service.get_session(token, message.from_user.id)
+    
+    if not session:
+        await message.answer("⌛ Результаты поиска устарели, повторите поиск")
+        return
     
-    if not results:
+    total = len(session.ids)
+    if offset >= total or offset < 0:
+        offset = 0
+    
+    page_results = await search_service.get_page(session, offset)
+    if not page_results:
         await message.answer("❌ Результаты поиска не найдены")
         return
     
-    text = search_service.format_search_results(results, offset, search_type, search_text)
-    reply_markup = search_service.create_search_results_keyboard(results, offset, search_type)
+    text = search_service.format_search_results(page_results, total, offset, session.search_type, session.search_text)
+    reply_markup = search_service.create_search_results_keyboard(token, total, offset)
     
     if isinstance(message, CallbackQuery):
         await message.message.edit_text(text, reply_markup=reply_markup, parse_mode='Markdown')
     else:
         await message.answer(text, reply_markup=reply_markup, parse_mode='Markdown')
-    
-    await state.update_data(current_offset=offset)
 
-@router.callback_query(lambda c: c.data.startswith('search_'))
-async def handle_search_pagination(callback: CallbackQuery, state: FSMContext, search_service: SearchService):
+@router.callback_query(lambda c: c.data.startswith(('search_prev_', 'search_next_')))
+async def handle_search_pagination(callback: CallbackQuery, search_service: SearchService):
     try:
-        action, offset = callback.data.split('_')[1:]
-        offset = int(offset)
-        await show_search_results(callback, state, search_service, offset)
+        action, token, offset = callback.data.split('_')[1:]
+        await show_search_results(callback, search_service, token, int(offset))
         await callback.answer()
     except Exception as e:
         await callback.answer("❌ Ошибка при загрузке")
-        print(f"❌ Ошибка в handle_search_pagination: {e}")
\ No newline at end of file
+        logger.error("Ошибка в handle_search_pagination: %s", e)
\ No newline at end of file
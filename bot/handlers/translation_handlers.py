@@ -3,9 +3,44 @@ from aiogram.fsm.context import FSMContext
 from utils.keyboards import translation_keyboard, translation_mode_keyboard, get_main_keyboard
 from utils.states import TranslationStates
 from services.translation_service import TranslationService
+from services.admin_service import AdminService
+from config import TRANSLATE_BATCH_MAX_ITEMS
 
 router = Router()
 
+# Ограничение Telegram на длину одного сообщения
+MESSAGE_LIMIT = 4096
+
+async def send_batch_translation(message: types.Message, translation_service: TranslationService,
+                                 lines: list, direction: str):
+    """Сообщение из нескольких фраз (TranslationService.batch_lines): перевод одним пакетом"""
+    if len(lines) > TRANSLATE_BATCH_MAX_ITEMS:
+        await message.answer(
+            f"❌ За один раз можно перевести не больше {TRANSLATE_BATCH_MAX_ITEMS} строк",
+            reply_markup=translation_mode_keyboard
+        )
+        return
+
+    results = await translation_service.translate_batch(lines, direction, message.from_user.id)
+
+    if direction == "to_formal":
+        header = f"💼 Формальные варианты ({len(lines)}):\n\n"
+    else:
+        header = f"🔥 Неформальные варианты ({len(lines)}):\n\n"
+    footer = "\n📚 Объяснения сохранены в 📖 История"
+
+    # Длинный список отправляем несколькими сообщениями, не разрывая пункты
+    chunks = [header]
+    for i, (text, (translation, _)) in enumerate(zip(lines, results), 1):
+        item = f"{i}. `{text}`\n   → `{translation}`\n"
+        if len(chunks[-1]) + len(item) > MESSAGE_LIMIT - len(footer):
+            chunks.append("")
+        chunks[-1] += item
+    chunks[-1] += footer
+
+    for chunk in chunks:
+        await message.answer(chunk, parse_mode='Markdown', reply_markup=translation_mode_keyboard)
+
 @router.message(lambda message: message.text == "🔄 Перевод")
 async def show_translation_options(message: types.Message):
     await message.answer(
@@ -37,26 +72,31 @@ async def start_informal_translation(message: types.Message, state: FSMContext):
     )
 
 @router.message(lambda message: message.text == "❌ Выйти из режима перевода")
-async def exit_translation_mode(message: types.Message, state: FSMContext):
+async def exit_translation_mode(message: types.Message, state: FSMContext, admin_service: AdminService):
     await state.clear()
     await message.answer(
         "✅ Вышел из режима перевода",
-        reply_markup=get_main_keyboard(message.from_user.id)
+        reply_markup=get_main_keyboard(admin_service.is_user_admin(message.from_user.id))
     )
 
 @router.message(TranslationStates.waiting_for_informal)
-async def handle_informal_text(message: types.Message, state: FSMContext, translation_service: TranslationService):
+async def handle_informal_text(message: types.Message, state: FSMContext, translation_service: TranslationService, admin_service: AdminService):
     if message.text == "❌ Выйти из режима перевода":
         await state.clear()
-        await message.answer("✅ Вышел из режима перевода", reply_markup=get_main_keyboard(message.from_user.id))
+        await message.answer("✅ Вышел из режима перевода", reply_markup=get_main_keyboard(admin_service.is_user_admin(message.from_user.id)))
         return
     
     if message.content_type != 'text':
         await message.answer("❌ В режиме перевода поддерживаются только текстовые сообщения")
         return
     
+    lines = translation_service.batch_lines(message.text, "to_formal")
+    if lines:
+        await send_batch_translation(message, translation_service, lines, "to_formal")
+        return
+    
     user_text = message.text
-    formal_text, explanation = translation_service.translate_to_formal(user_text, message.from_user.id)
+    formal_text, explanation = await translation_service.translate_to_formal(user_text, message.from_user.id)
     
     response = f"💼 Формальный вариант:\n`{formal_text}`"
     if explanation:
@@ -65,18 +105,23 @@ async def handle_informal_text(message: types.Message, state: FSMContext, transl
     await message.answer(response, parse_mode='Markdown', reply_markup=translation_mode_keyboard)
 
 @router.message(TranslationStates.waiting_for_formal)
-async def handle_formal_text(message: types.Message, state: FSMContext, translation_service: TranslationService):
+async def handle_formal_text(message: types.Message, state: FSMContext, translation_service: TranslationService, admin_service: AdminService):
     if message.text == "❌ Выйти из режима перевода":
         await state.clear()
-        await message.answer("✅ Вышел из режима перевода", reply_markup=get_main_keyboard(message.from_user.id))
+        await message.answer("✅ Вышел из режима перевода", reply_markup=get_main_keyboard(admin_service.is_user_admin(message.from_user.id)))
         return
     
     if message.content_type != 'text':
         await message.answer("❌ В режиме перевода поддерживаются только текстовые сообщения")
         return
     
+    lines = translation_service.batch_lines(message.text, "to_informal")
+    if lines:
+        await send_batch_translation(message, translation_service, lines, "to_informal")
+        return
+    
     user_text = message.text
-    informal_text, explanation = translation_service.translate_to_informal(user_text, message.from_user.id)
+    informal_text, explanation = await translation_service.translate_to_informal(user_text, message.from_user.id)
     
     response = f"🔥 Неформальный вариант:\n`{informal_text}`"
     if explanation:
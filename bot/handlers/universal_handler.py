@@ -1,3 +1,4 @@
+import logging
 from aiogram import Router, types
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message
@@ -5,6 +6,9 @@ from utils.keyboards import get_main_keyboard, translation_mode_keyboard
 from utils.states import TranslationStates, SearchStates, AdminStates
 from services.translation_service import TranslationService
 from services.admin_service import AdminService
+from handlers.translation_handlers import send_batch_translation
+
+logger = logging.getLogger(__name__)
 
 router = Router()
 
@@ -41,12 +45,13 @@ async def handle_any_message(message: Message, state: FSMContext, translation_se
         )
         
         # Добавляем админ-панель только если пользователь админ
-        if admin_service.is_user_admin(message.from_user.id):
+        is_admin = admin_service.is_user_admin(message.from_user.id)
+        if is_admin:
             response_text += "• ⚙️ Админ-панель - для управления\n"
         
         await message.answer(
             response_text,
-            reply_markup=get_main_keyboard(message.from_user.id)
+            reply_markup=get_main_keyboard(is_admin)
         )
         return
     
@@ -75,9 +80,17 @@ async def handle_any_message(message: Message, state: FSMContext, translation_se
             return
         
         try:
-            if current_state == TranslationStates.waiting_for_informal.state:
+            direction = {
+                TranslationStates.waiting_for_informal.state: "to_formal",
+                TranslationStates.waiting_for_formal.state: "to_informal",
+            }.get(current_state)
+            lines = translation_service.batch_lines(message.text, direction) if direction else []
+            if lines:
+                await send_batch_translation(message, translation_service, lines, direction)
+                
+            elif current_state == TranslationStates.waiting_for_informal.state:
                 user_text = message.text
-                formal_text, explanation = translation_service.translate_to_formal(user_text, message.from_user.id)
+                formal_text, explanation = await translation_service.translate_to_formal(user_text, message.from_user.id)
                 
                 response = f"💼 Формальный вариант:\n`{formal_text}`"
                 if explanation:
@@ -87,7 +100,7 @@ async def handle_any_message(message: Message, state: FSMContext, translation_se
                 
             elif current_state == TranslationStates.waiting_for_formal.state:
                 user_text = message.text
-                informal_text, explanation = translation_service.translate_to_informal(user_text, message.from_user.id)
+                informal_text, explanation = await translation_service.translate_to_informal(user_text, message.from_user.id)
                 
                 response = f"🔥 Неформальный вариант:\n`{informal_text}`"
                 if explanation:
@@ -101,7 +114,7 @@ async def handle_any_message(message: Message, state: FSMContext, translation_se
                 
         except Exception as e:
             await message.answer("❌ Произошла ошибка при обработке сообщения")
-            print(f"❌ Ошибка в handle_any_message: {e}")
+            logger.error("Ошибка в handle_any_message: %s", e)
     
     else:
         # Если не в состоянии и не системная кнопка - показываем сообщение о выборе режима и возвращаем в главное меню
@@ -113,10 +126,11 @@ async def handle_any_message(message: Message, state: FSMContext, translation_se
         )
         
         # Добавляем админ-панель только если пользователь админ
-        if admin_service.is_user_admin(message.from_user.id):
+        is_admin = admin_service.is_user_admin(message.from_user.id)
+        if is_admin:
             response_text += "• ⚙️ Админ-панель - для управления\n"
         
         await message.answer(
             response_text,
-            reply_markup=get_main_keyboard(message.from_user.id)
+            reply_markup=get_main_keyboard(is_admin)
         )
\ No newline at end of file
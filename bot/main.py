@@ -1,62 +1,124 @@
+import asyncio
+import logging
 from aiogram import Bot, Dispatcher
 from aiogram.fsm.storage.memory import MemoryStorage
-import sqlite3
-from database import FDataBase
+from async_database import AsyncFDataBase
+from migrations import ensure_schema
 
-from config import BOT_TOKEN
+from config import BOT_TOKEN, FSM_STORAGE_URL, METRICS_HOST, METRICS_PORT, EVENT_LOOP_LAG_INTERVAL
+from storage import create_storage
 from handlers.main_handlers import router as main_router
 from handlers.translation_handlers import router as translation_router
 from handlers.admin_handlers import router as admin_router
 from handlers.history_handlers import router as history_router
 from handlers.search_handlers import router as search_router
+from handlers.dictionary_handlers import router as dictionary_router
 from handlers.universal_handler import router as universal_router
 
 from services.translation_service import TranslationService
 from services.admin_service import AdminService
 from services.history_service import HistoryService
 from services.search_service import SearchService
+from services.search_sessions import SearchSessionStore, FSMSearchSessionStore
+from services.dictionary_service import DictionaryService
+from services.translation_cache import TranslationCache
+from services.dictionary_index import DictionaryIndex
+from services.history_writer import HistoryWriter
+from services.activity_tracker import ActivityTracker
+from utils.log import setup_logging, LogContextMiddleware
+from utils.metrics import track_services, instrument_router, monitor_event_loop, start_metrics_server
 
-def connect_db():
-    return sqlite3.connect('translations.db')
+logger = logging.getLogger(__name__)
+
+# Порядок важен: более общие фильтры (universal_router) - последними
+ROUTERS = {
+    'main_router': main_router,
+    'translation_router': translation_router,
+    'admin_router': admin_router,
+    'history_router': history_router,
+    'search_router': search_router,
+    'dictionary_router': dictionary_router,
+    'universal_router': universal_router,
+}
+
+def include_routers(dp: Dispatcher):
+    """Регистрация роутеров (с замером времени обработчиков каждого роутера)"""
+    for name, router in ROUTERS.items():
+        instrument_router(router, name)
+        dp.include_router(router)
 
 async def main():
+    # Логи пишутся в stdout из отдельного потока (JSON по умолчанию, см. LOG_* в config.py)
+    setup_logging()
+    
     # Инициализация базы данных
-    db_connection = connect_db()
-    db = FDataBase(db_connection)
+    ensure_schema('translations.db')
+    # Запросы к базе выполняются в отдельных потоках: один писатель и пул читателей
+    db = AsyncFDataBase('translations.db')
     
     # Инициализация сервисов
-    translation_service = TranslationService(db)
-    admin_service = AdminService(db)
+    translation_cache = TranslationCache('translations.db')
+    dictionary_index = DictionaryIndex()
+    dictionary_service = DictionaryService(db, dictionary_index)
+    loaded_words = await dictionary_service.load_index()
+    history_writer = HistoryWriter('translations.db')
+    # Активность за последние сутки восстанавливается из базы и дальше дочитывается из неё
+    # (переводы бота, API и сайта), счётчики для админ-панели считаются в памяти
+    activity_tracker = ActivityTracker()
+    await activity_tracker.load(db)
+    translation_service = TranslationService(translation_cache, dictionary_index, history_writer)
+    admin_service = AdminService(db, activity=activity_tracker)
+    await admin_service.registry.load()
     history_service = HistoryService(db)
-    search_service = SearchService()
     
     # Инициализация бота
     bot = Bot(token=BOT_TOKEN)
-    storage = MemoryStorage()
+    # Состояния FSM переживают перезапуск и доступны нескольким процессам бота;
+    # при остановке диспетчер сам вызывает storage.close(), сбрасывая буфер записи
+    storage = create_storage(FSM_STORAGE_URL)
     dp = Dispatcher(storage=storage)
+    # Результаты поиска лежат там же, где состояния: кнопки листания работают
+    # после перезапуска; в памяти - отдельное хранилище с лимитом числа сессий
+    if isinstance(storage, MemoryStorage):
+        search_sessions = SearchSessionStore()
+    else:
+        search_sessions = FSMSearchSessionStore(storage)
+    search_service = SearchService(db, search_sessions)
+    # Каждой строке лога - идентификатор обновления и пользователя
+    dp.update.outer_middleware(LogContextMiddleware())
     
     # Регистрация сервисов в диспетчере
     dp['translation_service'] = translation_service
     dp['admin_service'] = admin_service
     dp['history_service'] = history_service
     dp['search_service'] = search_service
+    dp['dictionary_service'] = dictionary_service
     dp['db'] = db
     
-    # Регистрация роутеров
-    dp.include_router(main_router)
-    dp.include_router(translation_router)
-    dp.include_router(admin_router)
-    dp.include_router(history_router)
-    dp.include_router(search_router)
-    dp.include_router(universal_router)
+    include_routers(dp)
+    
+    # Метрики: счётчики сервисов, задержка event loop и локальный HTTP-сервер
+    track_services(translation_cache, dictionary_index, history_writer)
+    loop_monitor = asyncio.create_task(monitor_event_loop(EVENT_LOOP_LAG_INTERVAL))
+    activity_sync = asyncio.create_task(activity_tracker.run(db))
+    metrics_server = await start_metrics_server(METRICS_HOST, METRICS_PORT) if METRICS_PORT else None
     
-    print("✅ Бот запущен с нейросетью GigaChat!")
-    print("✅ База данных: translations.db")
-    print("🤖 Переводчик: GigaChat API")
-    print("📝 Просто пишите сообщения - они автоматически сохранятся в историю!")
+    logger.info("Бот запущен с нейросетью GigaChat",
+                extra={'database': 'translations.db', 'dictionary_words': loaded_words,
+                       'admins': len(admin_service.registry), 'fsm_storage': FSM_STORAGE_URL.split(':', 1)[0]})
     
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        loop_monitor.cancel()
+        activity_sync.cancel()
+        if metrics_server is not None:
+            metrics_server.close()
+        translation_service.close()
+        # Дописываем накопленную историю до закрытия соединений
+        history_writer.close()
+        translation_cache.close()
+        db.close()
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,305 @@
+import logging
+import sqlite3
+import sys
+import threading
+from typing import Callable, List, Set, Tuple, Union
+from database import connect_db
+
+logger = logging.getLogger(__name__)
+
+# Базовые таблицы (раньше - additional_scripts/sq_db.sql)
+BASE_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS admins (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        login TEXT NOT NULL,
+        role TEXT NOT NULL
+    )''',
+    '''CREATE TABLE IF NOT EXISTS translations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        informal_text TEXT NOT NULL,
+        formal_text TEXT NOT NULL,
+        explanation TEXT,
+        usage_count INTEGER DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        user_id INTEGER,
+        direction TEXT DEFAULT 'to_formal'
+    )''',
+]
+
+# Словарь сленга: уникальный нормализованный ключ, предвычисленная буква
+# алфавитного указателя и счётчики слов по буквам, которые ведут триггеры
+DICTIONARY_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS dictionary (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        informal_text TEXT NOT NULL,
+        formal_text TEXT NOT NULL,
+        explanation TEXT,
+        normalized_informal TEXT NOT NULL UNIQUE,
+        first_letter TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''',
+    'CREATE INDEX IF NOT EXISTS idx_dictionary_letter ON dictionary(first_letter, normalized_informal)',
+    '''CREATE TABLE IF NOT EXISTS dictionary_letter_counts (
+        letter TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    )''',
+    '''CREATE TRIGGER IF NOT EXISTS dictionary_count_insert AFTER INSERT ON dictionary BEGIN
+        INSERT INTO dictionary_letter_counts (letter, count) VALUES (new.first_letter, 1)
+        ON CONFLICT(letter) DO UPDATE SET count = count + 1;
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS dictionary_count_delete AFTER DELETE ON dictionary BEGIN
+        UPDATE dictionary_letter_counts SET count = count - 1 WHERE letter = old.first_letter;
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS dictionary_count_update AFTER UPDATE OF first_letter ON dictionary
+    WHEN old.first_letter <> new.first_letter BEGIN
+        UPDATE dictionary_letter_counts SET count = count - 1 WHERE letter = old.first_letter;
+        INSERT INTO dictionary_letter_counts (letter, count) VALUES (new.first_letter, 1)
+        ON CONFLICT(letter) DO UPDATE SET count = count + 1;
+    END''',
+]
+
+# Индексы под запросы истории, статистики и проверки админов
+INDEX_SCHEMA = [
+    'CREATE INDEX IF NOT EXISTS idx_translations_user_created ON translations(user_id, created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_translations_created ON translations(created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_translations_direction ON translations(direction)',
+    'CREATE INDEX IF NOT EXISTS idx_admins_login ON admins(login)',
+]
+
+TRANSLATION_CACHE_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS translation_cache (
+        normalized_text TEXT NOT NULL,
+        direction TEXT NOT NULL,
+        translation TEXT NOT NULL,
+        explanation TEXT,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (normalized_text, direction)
+    ) WITHOUT ROWID''',
+]
+
+def _fold(column: str) -> str:
+    """SQL-выражение, заменяющее ё на е (unicode61 не считает её диакритикой)"""
+    return f"replace(replace({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+def _fts_values(prefix: str) -> str:
+    return (f"{prefix}id, {_fold(prefix + 'informal_text')}, {_fold(prefix + 'formal_text')}, "
+            f"{_fold(prefix + 'explanation')}, 'u' || {prefix}user_id")
+
+# Полнотекстовый поиск по истории. Колонка user_tag ('u<user_id>') позволяет
+# отбирать записи пользователя прямо в MATCH, не фильтруя чужие совпадения
+HISTORY_SEARCH_SCHEMA = [
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS translations_fts USING fts5(
+        informal_text, formal_text, explanation, user_tag,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )''',
+    f'''CREATE TRIGGER IF NOT EXISTS translations_fts_insert AFTER INSERT ON translations BEGIN
+        INSERT INTO translations_fts (rowid, informal_text, formal_text, explanation, user_tag)
+        VALUES ({_fts_values('new.')});
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS translations_fts_delete AFTER DELETE ON translations BEGIN
+        DELETE FROM translations_fts WHERE rowid = old.id;
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS translations_fts_update
+    AFTER UPDATE OF informal_text, formal_text, explanation, user_id ON translations BEGIN
+        DELETE FROM translations_fts WHERE rowid = old.id;
+        INSERT INTO translations_fts (rowid, informal_text, formal_text, explanation, user_tag)
+        VALUES ({_fts_values('new.')});
+    END''',
+    f'''INSERT INTO translations_fts (rowid, informal_text, formal_text, explanation, user_tag)
+        SELECT {_fts_values('')} FROM translations''',
+]
+
+# Счётчики переводов по пользователям, которые ведут триггеры. WITHOUT ROWID,
+# чтобы user_id мог быть и числом из Telegram, и строковым id веб-версии
+USER_STATS_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS user_stats (
+        user_id INTEGER NOT NULL PRIMARY KEY,
+        total INTEGER NOT NULL DEFAULT 0,
+        to_formal INTEGER NOT NULL DEFAULT 0,
+        to_informal INTEGER NOT NULL DEFAULT 0,
+        last_activity TIMESTAMP
+    ) WITHOUT ROWID''',
+    '''CREATE TRIGGER IF NOT EXISTS user_stats_insert AFTER INSERT ON translations
+    WHEN new.user_id IS NOT NULL BEGIN
+        INSERT INTO user_stats (user_id, total, to_formal, to_informal, last_activity)
+        VALUES (new.user_id, 1, new.direction = 'to_formal', new.direction = 'to_informal', new.created_at)
+        ON CONFLICT(user_id) DO UPDATE SET
+            total = total + 1,
+            to_formal = to_formal + excluded.to_formal,
+            to_informal = to_informal + excluded.to_informal,
+            last_activity = max(coalesce(last_activity, ''), excluded.last_activity);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS user_stats_delete AFTER DELETE ON translations
+    WHEN old.user_id IS NOT NULL BEGIN
+        UPDATE user_stats SET
+            total = total - 1,
+            to_formal = to_formal - (old.direction = 'to_formal'),
+            to_informal = to_informal - (old.direction = 'to_informal')
+        WHERE user_id = old.user_id;
+    END''',
+    '''INSERT OR REPLACE INTO user_stats (user_id, total, to_formal, to_informal, last_activity)
+        SELECT user_id, COUNT(*), SUM(direction = 'to_formal'), SUM(direction = 'to_informal'), MAX(created_at)
+        FROM translations WHERE user_id IS NOT NULL GROUP BY user_id''',
+]
+
+# Номера версий редко меняющихся данных. Процессы бота и API сравнивают
+# номер со своим и перечитывают данные только после изменения
+DATA_VERSIONS_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS data_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID''',
+    "INSERT OR IGNORE INTO data_versions (name, version) VALUES ('admins', 1)",
+] + [
+    f'''CREATE TRIGGER IF NOT EXISTS admins_version_{event.lower()} AFTER {event} ON admins BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE name = 'admins';
+    END'''
+    for event in ('INSERT', 'UPDATE', 'DELETE')
+]
+
+# Сводная статистика для админ-панели: общие счётчики, переводы по дням
+# и направлениям, популярные фразы. Триггеры обновляют их при каждой
+# вставке и удалении, поэтому панель не сканирует таблицу translations
+STATS_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS stats_counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID''',
+    '''CREATE TABLE IF NOT EXISTS daily_stats (
+        day TEXT NOT NULL,
+        direction TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, direction)
+    ) WITHOUT ROWID''',
+    '''CREATE TABLE IF NOT EXISTS phrase_stats (
+        informal_text TEXT NOT NULL PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID''',
+    'CREATE INDEX IF NOT EXISTS idx_phrase_stats_count ON phrase_stats(count)',
+    'CREATE INDEX IF NOT EXISTS idx_user_stats_total ON user_stats(total)',
+    # Заполнение по уже накопленной истории
+    '''INSERT OR REPLACE INTO stats_counters (name, value)
+        SELECT 'total', COUNT(*) FROM translations
+        UNION ALL SELECT 'users', COUNT(*) FROM user_stats WHERE total > 0''',
+    '''INSERT OR REPLACE INTO stats_counters (name, value)
+        SELECT direction, COUNT(*) FROM translations WHERE direction IS NOT NULL GROUP BY direction''',
+    '''INSERT OR REPLACE INTO daily_stats (day, direction, count)
+        SELECT date(created_at), coalesce(direction, ''), COUNT(*) FROM translations
+        GROUP BY date(created_at), coalesce(direction, '')''',
+    '''INSERT OR REPLACE INTO phrase_stats (informal_text, count)
+        SELECT informal_text, COUNT(*) FROM translations GROUP BY informal_text''',
+    '''CREATE TRIGGER IF NOT EXISTS stats_insert AFTER INSERT ON translations BEGIN
+        INSERT INTO stats_counters (name, value) VALUES ('total', 1)
+            ON CONFLICT(name) DO UPDATE SET value = value + 1;
+        INSERT INTO stats_counters (name, value) SELECT new.direction, 1 WHERE new.direction IS NOT NULL
+            ON CONFLICT(name) DO UPDATE SET value = value + 1;
+        INSERT INTO daily_stats (day, direction, count) VALUES (date(new.created_at), coalesce(new.direction, ''), 1)
+            ON CONFLICT(day, direction) DO UPDATE SET count = count + 1;
+        INSERT INTO phrase_stats (informal_text, count) VALUES (new.informal_text, 1)
+            ON CONFLICT(informal_text) DO UPDATE SET count = count + 1;
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS stats_delete AFTER DELETE ON translations BEGIN
+        UPDATE stats_counters SET value = value - 1 WHERE name IN ('total', old.direction);
+        UPDATE daily_stats SET count = count - 1
+            WHERE day = date(old.created_at) AND direction = coalesce(old.direction, '');
+        UPDATE phrase_stats SET count = count - 1 WHERE informal_text = old.informal_text;
+    END''',
+    # Число пользователей меняется, когда счётчик пользователя становится
+    # ненулевым или обнуляется (первый перевод, удаление последнего)
+    '''CREATE TRIGGER IF NOT EXISTS stats_users_insert AFTER INSERT ON user_stats
+    WHEN new.total > 0 BEGIN
+        INSERT INTO stats_counters (name, value) VALUES ('users', 1)
+            ON CONFLICT(name) DO UPDATE SET value = value + 1;
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS stats_users_update AFTER UPDATE OF total ON user_stats
+    WHEN (old.total > 0) != (new.total > 0) BEGIN
+        INSERT INTO stats_counters (name, value) VALUES ('users', new.total > 0)
+            ON CONFLICT(name) DO UPDATE SET value = value + (new.total > 0) - (old.total > 0);
+    END''',
+]
+
+# Фоновые переводы API: задание создаёт один воркер, а опросить его
+# можно через любой, поэтому состояние хранится в общей базе
+TRANSLATION_JOBS_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS translation_jobs (
+        id TEXT PRIMARY KEY,
+        status TEXT NOT NULL DEFAULT 'pending',
+        result TEXT,
+        error TEXT,
+        created_at REAL NOT NULL,
+        finished_at REAL
+    ) WITHOUT ROWID''',
+    'CREATE INDEX IF NOT EXISTS idx_translation_jobs_finished ON translation_jobs(finished_at)',
+]
+
+def _add_explanation_column(db: sqlite3.Connection):
+    """Колонка explanation в старых базах, созданных до её появления"""
+    columns = [col[1] for col in db.execute('PRAGMA table_info(translations)')]
+    if 'explanation' not in columns:
+        db.execute('ALTER TABLE translations ADD COLUMN explanation TEXT')
+
+MigrationStep = Union[str, Callable[[sqlite3.Connection], None]]
+
+# (версия, описание, шаги). Версия 1 совпадает со схемой, которую раньше
+# создавал FDataBase._init_tables, поэтому такие базы не мигрируются повторно
+MIGRATIONS: List[Tuple[int, str, List[MigrationStep]]] = [
+    (1, "Базовые таблицы, словарь и индексы",
+     BASE_SCHEMA + [_add_explanation_column] + DICTIONARY_SCHEMA + INDEX_SCHEMA),
+    (2, "Кэш переводов", TRANSLATION_CACHE_SCHEMA),
+    (3, "Полнотекстовый поиск по истории (FTS5)", HISTORY_SEARCH_SCHEMA),
+    (4, "Счётчики переводов пользователей", USER_STATS_SCHEMA),
+    (5, "Версия списка админов", DATA_VERSIONS_SCHEMA),
+    (6, "Сводная статистика", STATS_SCHEMA),
+    (7, "Фоновые переводы API", TRANSLATION_JOBS_SCHEMA),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def get_version(db: sqlite3.Connection) -> int:
+    return db.execute('PRAGMA user_version').fetchone()[0]
+
+def migrate(db: sqlite3.Connection) -> int:
+    """Применение недостающих миграций; каждая версия - отдельная транзакция"""
+    for version, description, steps in MIGRATIONS:
+        if get_version(db) >= version:
+            continue
+
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            # Другой процесс мог применить миграцию, пока мы ждали блокировку
+            if get_version(db) >= version:
+                db.rollback()
+                continue
+            for step in steps:
+                if callable(step):
+                    step(db)
+                else:
+                    db.execute(step)
+            db.execute(f'PRAGMA user_version = {version}')
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        logger.info("Миграция %s: %s", version, description)
+
+    return get_version(db)
+
+_migrated: Set[str] = set()
+_migrate_lock = threading.Lock()
+
+def ensure_schema(path: str = 'translations.db') -> int:
+    """Миграции один раз на процесс; повторные вызовы ничего не делают"""
+    with _migrate_lock:
+        if path in _migrated:
+            return SCHEMA_VERSION
+        db = connect_db(path)
+        try:
+            version = migrate(db)
+        finally:
+            db.close()
+        _migrated.add(path)
+        return version
+
+if __name__ == '__main__':
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'translations.db'
+    print(f"✅ Версия схемы {db_path}: {ensure_schema(db_path)}")
@@ -3,5 +3,6 @@ from .admin_service import AdminService
 from .history_service import HistoryService
 from .search_service import SearchService
 from .gigachat_service import GigaChatService
+from .dictionary_service import DictionaryService
 
-__all__ = ['TranslationService', 'AdminService', 'HistoryService', 'SearchService', 'GigaChatService']
\ No newline at end of file
+__all__ = ['TranslationService', 'AdminService', 'HistoryService', 'SearchService', 'GigaChatService', 'DictionaryService']
\ No newline at end of file
@@ -0,0 +1,196 @@
+# services/activity_tracker.py
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional
+from async_database import AsyncFDataBase
+from database import parse_timestamp, utc_now
+from config import ACTIVITY_SYNC_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+WINDOW_MINUTES = 24 * 60
+
+# 2^-r для всех возможных значений регистра
+_INVERSE_POWERS = [2.0 ** -rank for rank in range(65)]
+
+class HyperLogLog:
+    """Оценка числа различных пользователей в фиксированной памяти (2^precision байт).
+
+    Погрешность около 1.04 / sqrt(2^precision): ~3% при precision=10.
+    Пока заполнено мало регистров, они хранятся словарём (поминутные скетчи
+    обычно почти пустые), поэтому объединение стоит столько, сколько в
+    скетче пользователей, а не 2^precision.
+    """
+
+    def __init__(self, precision: int = 10):
+        self.precision = precision
+        self.size = 1 << precision
+        self._sparse: Optional[Dict[int, int]] = {}
+        self._dense: Optional[bytearray] = None
+
+    def _densify(self):
+        self._dense = bytearray(self.size)
+        for index, rank in self._sparse.items():
+            self._dense[index] = rank
+        self._sparse = None
+
+    def _update(self, index: int, rank: int):
+        if self._dense is not None:
+            if rank > self._dense[index]:
+                self._dense[index] = rank
+        elif rank > self._sparse.get(index, 0):
+            self._sparse[index] = rank
+            if len(self._sparse) > self.size // 4:
+                self._densify()
+
+    def add(self, value):
+        digest = hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest()
+        hashed = int.from_bytes(digest, 'big')
+        rest_bits = 64 - self.precision
+        rest = hashed & ((1 << rest_bits) - 1)
+        self._update(hashed >> rest_bits, rest_bits - rest.bit_length() + 1)
+
+    def merge(self, other: 'HyperLogLog'):
+        if other._dense is None:
+            for index, rank in other._sparse.items():
+                self._update(index, rank)
+            return
+        if self._dense is None:
+            self._densify()
+        self._dense = bytearray(map(max, self._dense, other._dense))
+
+    def count(self) -> int:
+        size = self.size
+        if self._dense is None:
+            zeros = size - len(self._sparse)
+            total = zeros + sum(_INVERSE_POWERS[rank] for rank in self._sparse.values())
+        else:
+            zeros = self._dense.count(0)
+            total = sum(map(_INVERSE_POWERS.__getitem__, self._dense))
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / total
+        # Малые значения точнее считаются по доле пустых регистров
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)
+        return round(estimate)
+
+class ActivityTracker:
+    """Активность за последние сутки в памяти процесса бота.
+
+    Кольцевой буфер из 1440 поминутных ячеек: число переводов и скетч
+    пользователей за минуту, плюс скетч пользователей текущих суток (UTC).
+    Источник - таблица translations: sync() дочитывает строки с id больше
+    последнего учтённого, поэтому переводы бота, API и сайта учитываются
+    одинаково и ровно один раз. При запуске буфер заполняется за сутки
+    (load), дальше sync вызывается раз в ACTIVITY_SYNC_INTERVAL секунд (run)
+    и перед показом статистики.
+    """
+
+    def __init__(self, precision: int = 10):
+        self.precision = precision
+        self._lock = threading.Lock()
+        # Номер минуты (от эпохи), которую сейчас хранит ячейка
+        self._minutes: List[int] = [-1] * WINDOW_MINUTES
+        self._counts: List[int] = [0] * WINDOW_MINUTES
+        self._users: List[Optional[HyperLogLog]] = [None] * WINDOW_MINUTES
+        self._day = -1
+        self._day_users = HyperLogLog(precision)
+        # Последний учтённый id перевода; синхронизации не должны пересекаться
+        self._last_id = 0
+        self._sync_lock = asyncio.Lock()
+
+    def _slot(self, minute: int) -> int:
+        slot = minute % WINDOW_MINUTES
+        if self._minutes[slot] != minute:
+            self._minutes[slot] = minute
+            self._counts[slot] = 0
+            self._users[slot] = None
+        return slot
+
+    def _roll_day(self, day: int):
+        if day != self._day:
+            self._day = day
+            self._day_users = HyperLogLog(self.precision)
+
+    def record(self, user_id=None, timestamp: float = None):
+        """Учёт одного перевода (timestamp - секунды от эпохи, по умолчанию сейчас)"""
+        now = time.time()
+        timestamp = now if timestamp is None else timestamp
+        minute = int(timestamp // 60)
+        day = int(timestamp // 86400)
+        with self._lock:
+            # Устаревшие события (старше суток) не должны затирать свежие ячейки
+            if minute <= int(now // 60) - WINDOW_MINUTES:
+                return
+            slot = self._slot(minute)
+            self._counts[slot] += 1
+            if user_id is not None:
+                if self._users[slot] is None:
+                    self._users[slot] = HyperLogLog(self.precision)
+                self._users[slot].add(user_id)
+                if day >= self._day:
+                    self._roll_day(day)
+                    self._day_users.add(user_id)
+
+    def _recent_slots(self, minutes: int) -> Iterable[int]:
+        now_minute = int(time.time() // 60)
+        for minute in range(now_minute - minutes + 1, now_minute + 1):
+            slot = minute % WINDOW_MINUTES
+            if self._minutes[slot] == minute:
+                yield slot
+
+    def count(self, minutes: int) -> int:
+        """Число переводов за последние minutes минут (включая текущую)"""
+        with self._lock:
+            return sum(self._counts[slot] for slot in self._recent_slots(minutes))
+
+    def distinct_users(self, minutes: int) -> int:
+        """Оценка числа пользователей за последние minutes минут"""
+        merged = HyperLogLog(self.precision)
+        with self._lock:
+            for slot in self._recent_slots(minutes):
+                if self._users[slot] is not None:
+                    merged.merge(self._users[slot])
+        return merged.count()
+
+    def snapshot(self) -> Dict[str, int]:
+        """Те же поля, что у FDataBase.get_realtime_stats"""
+        now = time.time()
+        minutes_today = int(now % 86400 // 60) + 1
+        with self._lock:
+            self._roll_day(int(now // 86400))
+            day_users = self._day_users.count()
+        return {
+            'today_translations': self.count(minutes_today),
+            'last_hour_activity': self.count(60),
+            'last_15min_activity': self.count(15),
+            'active_users_today': day_users,
+            'active_users_last_hour': self.distinct_users(60)
+        }
+
+    async def sync(self, db: AsyncFDataBase) -> int:
+        """Учёт переводов, появившихся в базе после прошлой синхронизации"""
+        async with self._sync_lock:
+            rows = await db.get_activity_since(utc_now() - timedelta(minutes=WINDOW_MINUTES), self._last_id)
+            for translation_id, created_at, user_id in rows:
+                self.record(user_id, parse_timestamp(created_at).timestamp())
+                self._last_id = translation_id
+            return len(rows)
+
+    async def load(self, db: AsyncFDataBase) -> int:
+        """Восстановление последних суток из базы при запуске"""
+        return await self.sync(db)
+
+    async def run(self, db: AsyncFDataBase, interval: float = ACTIVITY_SYNC_INTERVAL):
+        """Фоновая задача: периодическая синхронизация с базой"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sync(db)
+            except Exception as e:
+                logger.error("Ошибка синхронизации активности: %s", e)
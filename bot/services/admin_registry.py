@@ -0,0 +1,57 @@
+# services/admin_registry.py
+import asyncio
+import time
+from typing import Dict, Optional
+from async_database import AsyncFDataBase
+from config import ADMIN_REGISTRY_CHECK_INTERVAL
+
+ADMIN_ROLES = ("GreatAdmin", "Admin")
+
+class AdminRegistry:
+    """Роли админов в памяти: проверка прав - поиск в словаре.
+
+    Список загружается при запуске. Изменения из этого процесса применяются
+    сразу, изменения из других процессов (API, другие экземпляры бота)
+    замечаются по номеру версии в data_versions, который проверяется
+    в фоне не чаще раза в check_interval секунд.
+    """
+
+    def __init__(self, db: AsyncFDataBase, check_interval: float = ADMIN_REGISTRY_CHECK_INTERVAL):
+        self.db = db
+        self.check_interval = check_interval
+        self._roles: Dict[str, str] = {}
+        self.version = 0
+        self._checked_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return len(self._roles)
+
+    async def load(self) -> int:
+        """Перечитывание списка админов из базы"""
+        # Версию читаем до списка: изменение между запросами вызовет ещё одну загрузку
+        version = await self.db.get_data_version('admins')
+        self._roles = await self.db.get_admin_roles()
+        self.version = version
+        self._checked_at = time.monotonic()
+        return len(self._roles)
+
+    async def _refresh(self):
+        if await self.db.get_data_version('admins') != self.version:
+            await self.load()
+
+    def _refresh_if_stale(self):
+        # Проверка версии уходит в фон: ответ даётся сразу по текущему списку
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._checked_at = time.monotonic()
+        self._refresh_task = asyncio.ensure_future(self._refresh())
+
+    def get_role(self, user_id: int) -> Optional[str]:
+        self._refresh_if_stale()
+        return self._roles.get(str(user_id))
+
+    def is_admin(self, user_id: int) -> bool:
+        return self.get_role(user_id) in ADMIN_ROLES
@@ -1,63 +1,86 @@
+import logging
 import sqlite3
-from database import FDataBase
+from async_database import AsyncFDataBase
+from services.admin_registry import AdminRegistry
+from services.activity_tracker import ActivityTracker
 from typing import Dict, List
 
+logger = logging.getLogger(__name__)
+
 def connect_db():
     return sqlite3.connect('translations.db')
 
 class AdminService:
-    def __init__(self, db: FDataBase):
+    def __init__(self, db: AsyncFDataBase, registry: AdminRegistry = None,
+                 activity: ActivityTracker = None):
         self.db = db
+        # Роли читаются из памяти; список загружается при запуске (await registry.load())
+        self.registry = registry if registry is not None else AdminRegistry(db)
+        # Активность за сутки - из памяти; без трекера считается по базе
+        self.activity = activity
 
     def is_user_admin(self, user_id: int) -> bool:
-        admin_role = self.db.getAdminByLogin(str(user_id))
-        return admin_role in ["GreatAdmin", "Admin"]
+        return self.registry.is_admin(user_id)
 
     def get_admin_role(self, user_id: int) -> str:
-        return self.db.getAdminByLogin(str(user_id))
+        return self.registry.get_role(user_id)
 
-    def get_admins_list(self):
-        return self.db.getAdmin()
+    async def get_admins_list(self):
+        return await self.db.getAdmin()
 
-    def add_admin(self, login: str, role: str) -> bool:
+    async def add_admin(self, login: str, role: str) -> bool:
         try:
-            self.db.addAdmin(login, role)
+            await self.db.addAdmin(login, role)
+            await self.registry.load()
             return True
         except Exception as e:
-            print(f"Error adding admin: {e}")
+            logger.error("Error adding admin: %s", e)
             return False
 
-    def remove_admin(self, admin_id: int) -> bool:
+    async def remove_admin(self, admin_id: int) -> bool:
         try:
-            self.db.removeAdminByID(admin_id)
+            await self.db.removeAdminByID(admin_id)
+            await self.registry.load()
             return True
         except Exception as e:
-            print(f"Error removing admin: {e}")
+            logger.error("Error removing admin: %s", e)
             return False
 
-    def get_stats(self):
-        return self.db.get_stats()
+    async def get_stats(self):
+        return await self.db.get_stats()
     
     # Новые методы для расширенной статистики
-    def get_detailed_stats(self) -> Dict:
+    async def get_detailed_stats(self) -> Dict:
         """Расширенная статистика системы"""
-        return self.db.get_detailed_stats()
+        return await self.db.get_detailed_stats()
     
-    def get_user_stats(self, user_id: int) -> Dict:
+    async def get_user_stats(self, user_id: int) -> Dict:
         """Статистика конкретного пользователя"""
-        return self.db.get_user_stats(user_id)
+        return await self.db.get_user_stats(user_id)
+    
+    async def get_top_users(self, limit: int = 10) -> List:
+        """Самые активные пользователи со счётчиками по направлениям"""
+        return await self.db.get_top_users(limit)
+    
+    async def get_daily_stats(self, days: int = 7) -> List:
+        """Переводы по дням за последние days дней"""
+        return await self.db.get_daily_stats(days)
     
-    def get_realtime_stats(self) -> Dict:
+    async def get_realtime_stats(self) -> Dict:
         """Статистика в реальном времени"""
-        return self.db.get_realtime_stats()
+        if self.activity is not None:
+            # Дочитываем переводы, сделанные после последней фоновой синхронизации
+            await self.activity.sync(self.db)
+            return self.activity.snapshot()
+        return await self.db.get_realtime_stats()
     
-    def search_users(self, search_query: str = "") -> List:
+    async def search_users(self, search_query: str = "") -> List:
         """Поиск пользователей по активности"""
         try:
             # Здесь можно добавить логику поиска пользователей
             # Пока возвращаем топ пользователей
-            stats = self.db.get_detailed_stats()
+            stats = await self.db.get_detailed_stats()
             return stats.get('top_users', [])
         except Exception as e:
-            print(f"Error searching users: {e}")
+            logger.error("Error searching users: %s", e)
             return []
\ No newline at end of file
@@ -0,0 +1,83 @@
+# services/dictionary_index.py
+import threading
+from typing import Dict, Optional, Tuple
+from utils.text import normalize_text
+
+def dictionary_key(text: str) -> str:
+    """Ключ индекса: нормализованный текст без знаков препинания по краям"""
+    return normalize_text(text).strip(' .,!?…;:"\'«»')
+
+class DictionaryIndex:
+    """Хэш-индекс словаря сленга в памяти для перевода без обращения к нейросети.
+
+    Ищутся только точные совпадения всего сообщения (слово или фраза),
+    остальное уходит в GigaChat.
+    """
+
+    def __init__(self):
+        self._by_informal: Dict[str, Tuple[str, str, Optional[str]]] = {}
+        self._by_formal: Dict[str, Tuple[str, str, Optional[str]]] = {}
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+
+    def __len__(self):
+        return len(self._by_informal)
+
+    def add(self, informal: str, formal: str, explanation: Optional[str] = None):
+        entry = (informal, formal, explanation)
+        informal_key = dictionary_key(informal)
+        with self._lock:
+            previous = self._by_informal.get(informal_key)
+            if previous and self._by_formal.get(dictionary_key(previous[1])) is previous:
+                del self._by_formal[dictionary_key(previous[1])]
+            self._by_informal[informal_key] = entry
+            # Для обратного направления оставляем первое найденное сленговое слово
+            self._by_formal.setdefault(dictionary_key(formal), entry)
+
+    def remove(self, informal: str):
+        with self._lock:
+            entry = self._by_informal.pop(dictionary_key(informal), None)
+            if entry:
+                formal_key = dictionary_key(entry[1])
+                if self._by_formal.get(formal_key) is entry:
+                    del self._by_formal[formal_key]
+
+    def contains(self, text: str, direction: str) -> bool:
+        """Есть ли точное совпадение; в статистике обращений не учитывается"""
+        index = self._by_informal if direction == "to_formal" else self._by_formal
+        return dictionary_key(text) in index
+
+    def lookup(self, text: str, direction: str) -> Optional[Tuple[str, str]]:
+        """Перевод и объяснение из словаря или None, если точного совпадения нет"""
+        key = dictionary_key(text)
+        index = self._by_informal if direction == "to_formal" else self._by_formal
+        entry = index.get(key)
+
+        with self._lock:
+            self.lookups += 1
+            if entry:
+                self.hits += 1
+
+        if not entry:
+            return None
+
+        informal, formal, explanation = entry
+        if direction == "to_formal":
+            source, translation = informal, formal
+        else:
+            source, translation = formal, informal
+
+        description = f"{source} → {translation}"
+        if explanation:
+            description += f": {explanation}"
+        return translation, description
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'words': len(self._by_informal),
+                'lookups': self.lookups,
+                'hits': self.hits,
+                'hit_rate': self.hits / self.lookups if self.lookups else 0.0
+            }
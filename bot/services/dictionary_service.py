@@ -0,0 +1,74 @@
+# services/dictionary_service.py
+import time
+from typing import Dict, List, Optional, Tuple
+from async_database import AsyncFDataBase
+from services.dictionary_index import DictionaryIndex
+from config import SEARCH_RESULTS_LIMIT
+
+# Как часто перечитывать счётчики по буквам (слова могут добавить импортом)
+LETTER_COUNTS_TTL = 300
+
+class DictionaryService:
+    def __init__(self, db: AsyncFDataBase, index: DictionaryIndex = None):
+        self.db = db
+        self.index = index
+        self._letter_counts: Dict[str, int] = {}
+        self._letter_counts_loaded_at = 0.0
+
+    async def load_index(self) -> int:
+        """Заполнение индекса для быстрого перевода словами из базы"""
+        if self.index is None:
+            return 0
+        words = await self.db.get_all_dictionary_words()
+        for informal, formal, explanation in words:
+            self.index.add(informal, formal, explanation)
+        return len(words)
+
+    async def _refresh_letter_counts(self):
+        self._letter_counts = await self.db.get_dictionary_letter_counts()
+        self._letter_counts_loaded_at = time.monotonic()
+
+    async def get_alphabet_stats(self) -> Dict[str, int]:
+        """Количество слов по буквам (кэш в памяти, без COUNT по таблице)"""
+        if time.monotonic() - self._letter_counts_loaded_at > LETTER_COUNTS_TTL:
+            await self._refresh_letter_counts()
+        return self._letter_counts
+
+    async def get_dictionary_count(self) -> int:
+        return sum((await self.get_alphabet_stats()).values())
+
+    async def get_words_count_by_letter(self, letter: str) -> int:
+        return (await self.get_alphabet_stats()).get(letter, 0)
+
+    async def get_dictionary_page(self, limit: int = 10, after: Tuple[str, int] = None,
+                                  before: Tuple[str, int] = None) -> List[Dict]:
+        return await self.db.get_dictionary_words(None, limit, after, before)
+
+    async def get_words_by_letter(self, letter: str, limit: int = 10,
+                                  after: Tuple[str, int] = None, before: Tuple[str, int] = None) -> List[Dict]:
+        return await self.db.get_dictionary_words(letter, limit, after, before)
+
+    async def search_words(self, search_text: str) -> List[Dict]:
+        return await self.db.search_dictionary_words(search_text)
+
+    async def search_word_ids(self, search_text: str, limit: int = SEARCH_RESULTS_LIMIT) -> List[int]:
+        return await self.db.search_dictionary_word_ids(search_text, limit)
+
+    async def get_word_by_informal(self, informal: str) -> Optional[Dict]:
+        return await self.db.get_dictionary_word(informal)
+
+    async def add_word(self, informal: str, formal: str, explanation: str = None) -> bool:
+        if not await self.db.add_dictionary_word(informal, formal, explanation or None):
+            return False
+        if self.index is not None:
+            self.index.add(informal, formal, explanation or None)
+        await self._refresh_letter_counts()
+        return True
+
+    async def delete_word(self, informal: str) -> bool:
+        if not await self.db.delete_dictionary_word(informal):
+            return False
+        if self.index is not None:
+            self.index.remove(informal)
+        await self._refresh_letter_counts()
+        return True
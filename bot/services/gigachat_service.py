@@ -2,13 +2,49 @@
 import gigachat
 from gigachat.models import Chat, Messages, MessagesRole
 import json
+import logging
 import re
+import threading
+import time
+from typing import Dict, List, NamedTuple
 from config import GIGACHAT_API_KEY
+from utils.metrics import GIGACHAT_REQUEST_SECONDS, GIGACHAT_TOKENS, GIGACHAT_ERRORS, GIGACHAT_BATCH_ITEMS
+
+logger = logging.getLogger(__name__)
+
+# Пакетный перевод: задача для каждого направления и общий формат ответа
+BATCH_TASKS = {
+    "to_formal": """Ты эксперт по русскому языку и сленгу. Твоя задача для КАЖДОЙ фразы из списка:
+1. Перевести неформальный текст в формальный деловой стиль
+2. Кратко объяснить значение неформальных слов и выражений""",
+    "to_informal": """Ты эксперт по русскому языку. Твоя задача для КАЖДОЙ фразы из списка:
+1. Перевести формальный текст в неформальный разговорный стиль
+2. Кратко объяснить формальные выражения и предложить сленговые аналоги""",
+}
+
+BATCH_FORMAT = """
+
+Фразы приходят JSON-массивом объектов {"id": номер, "text": "фраза"}.
+ВАЖНО: Ответь ТОЛЬКО JSON-массивом без каких-либо дополнительных текстов,
+по одному объекту на каждую фразу с тем же id:
+[
+  {"id": 1, "translation": "переведенный текст", "explanation": "объяснение"}
+]"""
+
+class Translation(NamedTuple):
+    """Ответ нейросети. failed - перевод не выполнен, в explanation описание ошибки"""
+    translation: str
+    explanation: str
+    failed: bool = False
 
 class GigaChatService:
+    ERROR_PREFIX = "Ошибка"
+
     def __init__(self):
         self.api_key = GIGACHAT_API_KEY
         self.client = None
+        # Клиент используется из нескольких потоков пула переводов
+        self._connect_lock = threading.Lock()
         self._connect()
         
     def _connect(self):
@@ -20,17 +56,54 @@ class GigaChatService:
             )
             # Получаем токен
             self.client.get_models()
-            print("✅ Успешное подключение к GigaChat")
+            logger.info("Успешное подключение к GigaChat")
             return True
         except Exception as e:
-            print(f"❌ Ошибка подключения к GigaChat: {e}")
+            GIGACHAT_ERRORS.labels('connect').inc()
+            logger.error("Ошибка подключения к GigaChat: %s", e)
             return False
     
-    def translate_text(self, text: str, direction: str = "to_formal") -> tuple[str, str]:
-        """Перевод текста с помощью GigaChat"""
+    @classmethod
+    def _failure(cls, text: str, reason: str) -> Translation:
+        return Translation(text, f"{cls.ERROR_PREFIX} {reason}", failed=True)
+
+    @staticmethod
+    def _count_tokens(response):
+        usage = getattr(response, 'usage', None)
+        if usage is None:
+            return
+        GIGACHAT_TOKENS.labels('prompt').inc(usage.prompt_tokens or 0)
+        GIGACHAT_TOKENS.labels('completion').inc(usage.completion_tokens or 0)
+
+    def _ensure_client(self) -> bool:
         if not self.client:
-            if not self._connect():
-                return text, "Ошибка подключения к нейросети"
+            with self._connect_lock:
+                if not self.client and not self._connect():
+                    return False
+        return True
+
+    def _chat(self, system_prompt: str, content: str, direction: str) -> str:
+        """Один запрос к нейросети с учётом времени и токенов; возвращает текст ответа"""
+        messages = [
+            Messages(role=MessagesRole.SYSTEM, content=system_prompt),
+            Messages(role=MessagesRole.USER, content=content)
+        ]
+
+        started = time.perf_counter()
+        try:
+            response = self.client.chat(Chat(messages=messages))
+        except Exception:
+            GIGACHAT_REQUEST_SECONDS.labels(direction, 'error').observe(time.perf_counter() - started)
+            GIGACHAT_ERRORS.labels('request').inc()
+            raise
+        GIGACHAT_REQUEST_SECONDS.labels(direction, 'ok').observe(time.perf_counter() - started)
+        self._count_tokens(response)
+        return response.choices[0].message.content
+
+    def translate_text(self, text: str, direction: str = "to_formal") -> Translation:
+        """Перевод текста с помощью GigaChat"""
+        if not self._ensure_client():
+            return self._failure(text, "подключения к нейросети")
         
         try:
             # Формируем промпт в зависимости от направления
@@ -69,15 +142,9 @@ class GigaChatService:
   "explanation": "• 'вызывает чувство дискомфорта' - формальное выражение, означает неловкость, стыд\\n• Можно заменить на сленг: 'кринж', 'стремно', 'неловка'"
 }"""
             
-            messages = [
-                Messages(role=MessagesRole.SYSTEM, content=system_prompt),
-                Messages(role=MessagesRole.USER, content=text)
-            ]
-            
-            response = self.client.chat(Chat(messages=messages))
-            content = response.choices[0].message.content
+            content = self._chat(system_prompt, text, direction)
             
-            print(f"🔍 Ответ от GigaChat: {content}")  # Для отладки
+            logger.debug("Ответ от GigaChat: %s", content)
             
             # Парсим JSON ответ
             try:
@@ -106,7 +173,8 @@ class GigaChatService:
                 explanation = explanation.replace('\\n', '\n')
                 
             except Exception as e:
-                print(f"❌ Ошибка парсинга JSON: {e}")
+                GIGACHAT_ERRORS.labels('parse').inc()
+                logger.error("Ошибка парсинга JSON: %s", e)
                 # Альтернативный метод парсинга через регулярные выражения
                 try:
                     translation_match = re.search(r'"translation"\s*:\s*"([^"]*)"', content, re.DOTALL)
@@ -130,12 +198,68 @@ class GigaChatService:
                             explanation = "Перевод выполнен нейросетью GigaChat"
                             
                 except Exception as e2:
-                    print(f"❌ Ошибка альтернативного парсинга: {e2}")
+                    logger.error("Ошибка альтернативного парсинга: %s", e2)
                     translation = content
                     explanation = "Перевод выполнен нейросетью GigaChat"
             
-            return translation, explanation
+            return Translation(translation, explanation)
             
         except Exception as e:
-            print(f"❌ Ошибка перевода: {e}")
-            return text, f"Ошибка перевода: {str(e)}"
\ No newline at end of file
+            logger.error("Ошибка перевода: %s", e)
+            return self._failure(text, f"перевода: {str(e)}")
+
+    @staticmethod
+    def _parse_batch(content: str, count: int) -> Dict[int, Translation]:
+        """Переводы из ответа на пакет по номерам фраз (с нуля); нераспознанные пропускаются"""
+        start, end = content.find('['), content.rfind(']')
+        if start == -1 or end < start:
+            raise ValueError("в ответе нет JSON-массива")
+        # strict=False допускает переносы строк внутри значений
+        items = json.loads(content[start:end + 1], strict=False)
+
+        results = {}
+        for item in items:
+            if not isinstance(item, dict) or not isinstance(item.get("translation"), str):
+                continue
+            try:
+                index = int(item.get("id")) - 1
+            except (TypeError, ValueError):
+                continue
+            if 0 <= index < count:
+                explanation = str(item.get("explanation") or "Объяснение не предоставлено")
+                results[index] = Translation(item["translation"], explanation.replace('\\n', '\n'))
+        return results
+
+    def translate_batch(self, texts: List[str], direction: str = "to_formal") -> List[Translation]:
+        """Перевод нескольких фраз одним запросом: системный промпт передаётся один раз.
+
+        Результаты в порядке texts. Фразы, которых нет в ответе (или ответ не
+        разобран), переводятся по одной через translate_text.
+        """
+        if len(texts) == 1:
+            return [self.translate_text(texts[0], direction)]
+        if not self._ensure_client():
+            return [self._failure(text, "подключения к нейросети") for text in texts]
+
+        GIGACHAT_BATCH_ITEMS.observe(len(texts))
+        payload = json.dumps([{"id": number, "text": text} for number, text in enumerate(texts, 1)],
+                             ensure_ascii=False)
+        try:
+            content = self._chat(BATCH_TASKS[direction] + BATCH_FORMAT, payload, direction)
+        except Exception as e:
+            logger.error("Ошибка пакетного перевода: %s", e)
+            return [self._failure(text, f"перевода: {str(e)}") for text in texts]
+
+        logger.debug("Ответ от GigaChat на пакет: %s", content)
+        try:
+            results = self._parse_batch(content, len(texts))
+        except Exception as e:
+            GIGACHAT_ERRORS.labels('parse').inc()
+            logger.error("Ошибка парсинга ответа на пакет: %s", e)
+            results = {}
+
+        missing = len(texts) - len(results)
+        if missing:
+            logger.warning("В ответе на пакет нет %s из %s фраз, переводим их по одной", missing, len(texts))
+        return [results[index] if index in results else self.translate_text(text, direction)
+                for index, text in enumerate(texts)]
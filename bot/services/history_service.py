@@ -1,15 +1,30 @@
 import sqlite3
-from database import FDataBase
+from typing import Dict, List
+from async_database import AsyncFDataBase
+from config import SEARCH_RESULTS_LIMIT
 
 def connect_db():
     return sqlite3.connect('translations.db')
 
 class HistoryService:
-    def __init__(self, db: FDataBase):
+    def __init__(self, db: AsyncFDataBase):
         self.db = db
 
-    def get_user_history(self, user_id: int, limit: int = 1000):
-        return self.db.get_user_translations(user_id, limit)
+    async def get_user_history(self, user_id: int, limit: int = 1000):
+        return await self.db.get_user_translations(user_id, limit)
 
-    def search_user_history(self, search_text: str, user_id: int):
-        return self.db.search_user_translations(search_text, user_id)
\ No newline at end of file
+    async def get_history_page(self, user_id: int, limit: int = 10, older_than_id: int = None,
+                               newer_than_id: int = None) -> Dict:
+        """Страница истории без чтения предыдущих страниц"""
+        items, has_more = await self.db.get_user_translations_page(user_id, limit, older_than_id, newer_than_id)
+        return {
+            'items': items,
+            'has_more': has_more,
+            'total': await self.db.get_user_translation_count(user_id)
+        }
+
+    async def search_user_history(self, search_text: str, user_id: int):
+        return await self.db.search_user_translations(search_text, user_id)
+
+    async def search_user_history_ids(self, search_text: str, user_id: int, limit: int = SEARCH_RESULTS_LIMIT) -> List[int]:
+        return await self.db.search_user_translation_ids(search_text, user_id, limit)
\ No newline at end of file
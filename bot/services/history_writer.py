@@ -0,0 +1,160 @@
+# services/history_writer.py
+import asyncio
+import logging
+import queue
+import threading
+import time
+from typing import List, Optional, Tuple
+from database import FDataBase, connect_db, format_timestamp, utc_now
+from config import HISTORY_BATCH_SIZE, HISTORY_FLUSH_INTERVAL_MS, HISTORY_QUEUE_SIZE, HISTORY_PUT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+class _Flush:
+    """Метка в очереди: писатель сбрасывает всё, что было до неё, и отмечает событие"""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+_STOP = object()
+
+class HistoryWriter:
+    """Отложенная запись истории переводов.
+
+    Переводы складываются в ограниченную очередь, фоновый поток пишет их
+    пакетами (executemany, один коммит) каждые batch_size строк или
+    flush_interval_ms миллисекунд. При заполненной очереди добавление ждёт
+    освобождения места (не дольше put_timeout), а затем строка отбрасывается
+    с предупреждением. close() дописывает всё накопленное.
+    Используется и ботом, и Flask API.
+    """
+
+    def __init__(self, db_path: str = 'translations.db', batch_size: int = HISTORY_BATCH_SIZE,
+                 flush_interval_ms: int = HISTORY_FLUSH_INTERVAL_MS, max_queue: int = HISTORY_QUEUE_SIZE,
+                 put_timeout: float = HISTORY_PUT_TIMEOUT):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.put_timeout = put_timeout
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _row(informal: str, formal: str, explanation: Optional[str],
+             user_id, direction: str) -> Tuple:
+        # Время фиксируем при добавлении, а не при записи пакета (UTC, как CURRENT_TIMESTAMP)
+        created_at = format_timestamp(utc_now())
+        return informal, formal, explanation, user_id, direction, created_at
+
+    def add(self, informal: str, formal: str, explanation: str = None,
+            user_id=None, direction: str = "to_formal") -> bool:
+        """Добавление из обычного потока (Flask); при заполненной очереди ждёт"""
+        if self._closed:
+            return False
+        try:
+            self._queue.put(self._row(informal, formal, explanation, user_id, direction),
+                            timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Очередь записи истории переполнена, перевод не сохранён")
+            return False
+
+    async def add_async(self, informal: str, formal: str, explanation: str = None,
+                        user_id=None, direction: str = "to_formal") -> bool:
+        """Добавление из event loop: ожидание места в очереди не блокирует цикл"""
+        if self._closed:
+            return False
+        row = self._row(informal, formal, explanation, user_id, direction)
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            pass
+        try:
+            await asyncio.to_thread(self._queue.put, row, True, self.put_timeout)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Очередь записи истории переполнена, перевод не сохранён")
+            return False
+
+    def flush(self, timeout: float = None) -> bool:
+        """Ожидание записи всего, что добавлено до вызова"""
+        if not self._thread.is_alive():
+            return self._queue.empty()
+        marker = _Flush()
+        self._queue.put(marker)
+        return marker.done.wait(timeout)
+
+    def close(self, timeout: float = 30):
+        """Запись оставшихся строк и остановка потока (при завершении процесса)"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self):
+        return {
+            'written': self.written,
+            'batches': self.batches,
+            'pending': self.pending(),
+            'dropped': self.dropped,
+            'failed': self.failed
+        }
+
+    def _write(self, db: FDataBase, rows: List[Tuple]):
+        if not rows:
+            return
+        if db.add_translations(rows):
+            self.written += len(rows)
+            self.batches += 1
+        else:
+            self.failed += len(rows)
+        rows.clear()
+
+    def _run(self):
+        connection = connect_db(self.db_path)
+        db = FDataBase(connection)
+        rows: List[Tuple] = []
+        deadline = None
+        try:
+            while True:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    # Истёк интервал с момента первой строки пакета
+                    self._write(db, rows)
+                    deadline = None
+                    continue
+
+                if item is _STOP:
+                    self._write(db, rows)
+                    return
+                if isinstance(item, _Flush):
+                    self._write(db, rows)
+                    deadline = None
+                    item.done.set()
+                    continue
+
+                rows.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(rows) >= self.batch_size:
+                    self._write(db, rows)
+                    deadline = None
+        finally:
+            connection.close()
@@ -1,31 +1,56 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from typing import List, Dict
+from typing import List, Dict, Optional
+from async_database import AsyncFDataBase
+from services.search_sessions import SearchSession, SearchSessionStore, FSMSearchSessionStore
+
+SEARCH_PAGE_SIZE = 10
 
 class SearchService:
+    def __init__(self, db: AsyncFDataBase = None, sessions: SearchSessionStore | FSMSearchSessionStore = None):
+        self.db = db
+        self.sessions = sessions if sessions is not None else SearchSessionStore()
+
+    async def start_session(self, user_id: int, search_type: str, search_text: str, ids: List[int]) -> str:
+        """Сохранение найденных id; возвращает токен для кнопок пагинации"""
+        return await self.sessions.create(user_id, search_type, search_text, ids)
+
+    async def get_session(self, token: str, user_id: int) -> Optional[SearchSession]:
+        return await self.sessions.get(token, user_id)
+
+    async def get_page(self, session: SearchSession, offset: int) -> List[Dict]:
+        """Чтение из базы только строк текущей страницы"""
+        page_ids = session.ids[offset:offset + SEARCH_PAGE_SIZE]
+        if session.search_type == 'dictionary':
+            return await self.db.get_dictionary_words_by_ids(page_ids)
+        return await self.db.get_translations_by_ids(page_ids)
+
     @staticmethod
-    def create_search_results_keyboard(results: List[Dict], offset: int, search_type: str):
+    def create_search_results_keyboard(token: str, total: int, offset: int):
         keyboard_buttons = []
         nav_buttons = []
-        
+
         if offset > 0:
-            nav_buttons.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"search_prev_{offset-10}"))
-        
-        if offset + 10 < len(results):
-            nav_buttons.append(InlineKeyboardButton(text="Вперед ➡️", callback_data=f"search_next_{offset+10}"))
-        
+            nav_buttons.append(InlineKeyboardButton(
+                text="⬅️ Назад", callback_data=f"search_prev_{token}_{offset - SEARCH_PAGE_SIZE}"
+            ))
+
+        if offset + SEARCH_PAGE_SIZE < total:
+            nav_buttons.append(InlineKeyboardButton(
+                text="Вперед ➡️", callback_data=f"search_next_{token}_{offset + SEARCH_PAGE_SIZE}"
+            ))
+
         if nav_buttons:
             keyboard_buttons.append(nav_buttons)
-        
+
         return InlineKeyboardMarkup(inline_keyboard=keyboard_buttons)
 
     @staticmethod
-    def format_search_results(results: List[Dict], offset: int, search_type: str, search_text: str):
-        page_results = results[offset:offset + 10]
-        total_pages = (len(results) + 9) // 10
-        
-        text = f"🔍 Найдено {len(results)} переводов по запросу '{search_text}'\n"
-        text += f"Страница {offset//10 + 1} из {total_pages}:\n\n"
-        
+    def format_search_results(page_results: List[Dict], total: int, offset: int, search_type: str, search_text: str):
+        total_pages = (total + SEARCH_PAGE_SIZE - 1) // SEARCH_PAGE_SIZE
+
+        text = f"🔍 Найдено {total} переводов по запросу '{search_text}'\n"
+        text += f"Страница {offset//SEARCH_PAGE_SIZE + 1} из {total_pages}:\n\n"
+
         for i, trans in enumerate(page_results, offset + 1):
             direction = trans.get('direction', 'to_formal')
             if direction == 'to_formal':
@@ -36,10 +61,10 @@ class SearchService:
                 text += f"{i}. 🔥 Формальный → Неформальный\n"
                 text += f"   💼 `{trans['informal_text']}`\n"
                 text += f"   → 🔥 `{trans['formal_text']}`\n"
-            
+
             if trans.get('explanation'):
                 text += f"   📖 {trans['explanation']}\n"
-            
+
             text += f"   📅 {trans['created_at']}\n\n"
-        
+
         return text
\ No newline at end of file
@@ -0,0 +1,122 @@
+# services/search_sessions.py
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional
+from aiogram.fsm.storage.base import BaseStorage, StorageKey
+from config import SEARCH_MAX_SESSIONS, SEARCH_SESSION_TTL
+
+def new_token() -> str:
+    # 8 hex-символов без "_", чтобы токен не ломал разбор callback_data
+    return secrets.token_hex(4)
+
+class SearchSession(NamedTuple):
+    user_id: int
+    search_type: str
+    search_text: str
+    ids: List[int]
+    expires_at: float
+
+class SearchSessionStore:
+    """Результаты поиска в памяти процесса: короткий токен → список id строк.
+
+    Токен передаётся в callback_data кнопок. Число сессий ограничено, старые
+    вытесняются по LRU и TTL. Сессии теряются при перезапуске и не видны другим
+    процессам бота - это хранилище для FSM_STORAGE_URL = memory://, в остальных
+    случаях используется FSMSearchSessionStore.
+    """
+
+    def __init__(self, max_sessions: int = SEARCH_MAX_SESSIONS, ttl: int = SEARCH_SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    async def create(self, user_id: int, search_type: str, search_text: str, ids: List[int]) -> str:
+        token = new_token()
+        session = SearchSession(user_id, search_type, search_text, list(ids), time.monotonic() + self.ttl)
+        with self._lock:
+            while token in self._sessions:
+                token = new_token()
+            self._sessions[token] = session
+            self._evict()
+        return token
+
+    async def get(self, token: str, user_id: int) -> Optional[SearchSession]:
+        """Сессия по токену; чужие и просроченные сессии не возвращаются"""
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                return None
+            if session.expires_at <= time.monotonic():
+                del self._sessions[token]
+                return None
+            if session.user_id != user_id:
+                return None
+            # Листание продлевает жизнь сессии
+            session = session._replace(expires_at=time.monotonic() + self.ttl)
+            self._sessions[token] = session
+            self._sessions.move_to_end(token)
+            return session
+
+    def _evict(self):
+        now = time.monotonic()
+        # Сессии упорядочены по последнему обращению, просроченные - в начале
+        while self._sessions:
+            token, session = next(iter(self._sessions.items()))
+            if session.expires_at > now and len(self._sessions) <= self.max_sessions:
+                break
+            del self._sessions[token]
+
+class FSMSearchSessionStore:
+    """Результаты поиска в хранилище FSM (storage.create_storage): SQLite или сервер Redis.
+
+    Сессия - данные отдельного ключа FSM пользователя с destiny 'search_<токен>',
+    поэтому листание работает после перезапуска бота и в любом его процессе,
+    а чужой токен просто не находится. Срок жизни (ttl) хранится в самих данных
+    и продлевается листанием; брошенные сессии удаляет само хранилище
+    через FSM_STATE_TTL, как и прочие состояния.
+    """
+
+    # Сессии не зависят от бота: в ключе вместо его id - 0
+    BOT_ID = 0
+
+    def __init__(self, storage: BaseStorage, ttl: int = SEARCH_SESSION_TTL):
+        self.storage = storage
+        self.ttl = ttl
+
+    def _key(self, token: str, user_id: int) -> StorageKey:
+        return StorageKey(bot_id=self.BOT_ID, chat_id=user_id, user_id=user_id, destiny=f'search_{token}')
+
+    async def _save(self, token: str, session: SearchSession):
+        await self.storage.set_data(self._key(token, session.user_id), {
+            'search_type': session.search_type,
+            'search_text': session.search_text,
+            'ids': session.ids,
+            'expires_at': session.expires_at,
+        })
+
+    async def create(self, user_id: int, search_type: str, search_text: str, ids: List[int]) -> str:
+        token = new_token()
+        await self._save(token, SearchSession(user_id, search_type, search_text, list(ids), time.time() + self.ttl))
+        return token
+
+    async def get(self, token: str, user_id: int) -> Optional[SearchSession]:
+        """Сессия по токену; чужие и просроченные сессии не возвращаются"""
+        key = self._key(token, user_id)
+        data = await self.storage.get_data(key)
+        if not data:
+            return None
+        if data['expires_at'] <= time.time():
+            # Пустые данные хранилища удаляют ключ
+            await self.storage.set_data(key, {})
+            return None
+        # Листание продлевает жизнь сессии
+        session = SearchSession(user_id, data['search_type'], data['search_text'], data['ids'],
+                                time.time() + self.ttl)
+        await self._save(token, session)
+        return session
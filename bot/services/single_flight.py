@@ -0,0 +1,95 @@
+# services/single_flight.py
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+class SingleFlight:
+    """Объединение одинаковых одновременных вызовов (для потоков Flask).
+
+    Первый вызов с данным ключом выполняет функцию, остальные ждут его
+    результат и получают тот же ответ (или то же исключение).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        # Сколько запросов получили результат чужого вызова
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable, *args) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+            else:
+                self.shared += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+class AsyncSingleFlight:
+    """Объединение одинаковых одновременных вызовов внутри event loop бота"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.shared = 0
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable]) -> Any:
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.shared += 1
+
+        # shield: отмена одного ожидающего не должна отменять общий запрос
+        return await asyncio.shield(future)
+
+    async def do_batch(self, keys: List[Hashable], factory: Callable[[List[Hashable]], Awaitable[List]]) -> List:
+        """do для нескольких ключей: ключи, которых сейчас никто не вычисляет,
+        передаются одним списком в factory (результаты - в том же порядке),
+        остальные ждут уже идущие вызовы. Результаты - в порядке keys."""
+        futures: Dict[Hashable, asyncio.Future] = {}
+        leading = []
+        for key in keys:
+            if key in futures:
+                continue
+            future = self._calls.get(key)
+            if future is None:
+                leading.append(key)
+                continue
+            self.shared += 1
+            futures[key] = future
+
+        if leading:
+            batch = asyncio.ensure_future(factory(leading))
+            for index, key in enumerate(leading):
+                future = asyncio.ensure_future(self._item(batch, index))
+                self._calls[key] = future
+                future.add_done_callback(lambda done, key=key: self._forget(key, done))
+                futures[key] = future
+
+        return await asyncio.shield(asyncio.gather(*(futures[key] for key in keys)))
+
+    @staticmethod
+    async def _item(batch: asyncio.Future, index: int) -> Any:
+        return (await batch)[index]
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
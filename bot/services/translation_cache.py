@@ -0,0 +1,187 @@
+# services/translation_cache.py
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from database import connect_db
+from utils.text import normalize_text
+from services.gigachat_service import Translation
+from config import TRANSLATION_CACHE_SIZE, TRANSLATION_CACHE_TTL, TRANSLATE_BATCH_CHUNK
+
+logger = logging.getLogger(__name__)
+
+class TranslationCache:
+    """Двухуровневый кэш переводов: LRU в памяти + таблица SQLite.
+
+    Ключ - нормализованный текст и направление перевода. Таблица в базе
+    общая для бота и API, поэтому результаты переживают перезапуск.
+    """
+
+    def __init__(self, db_path: str = 'translations.db',
+                 max_size: int = TRANSLATION_CACHE_SIZE, ttl: int = TRANSLATION_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = connect_db(db_path, check_same_thread=False)
+        self._db_lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        # Суммарное время запросов к нейросети - для оценки сэкономленной задержки
+        self._upstream_time = 0.0
+        self._upstream_calls = 0
+
+    @staticmethod
+    def make_key(text: str, direction: str) -> Tuple[str, str]:
+        return normalize_text(text), direction
+
+    def get(self, text: str, direction: str, memory_only: bool = False) -> Optional[Tuple[str, str]]:
+        """Поиск перевода в кэше. При memory_only промах не учитывается в счётчиках"""
+        key = self.make_key(text, direction)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                translation, explanation, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return translation, explanation
+                del self._memory[key]
+
+        if memory_only:
+            return None
+
+        row = None
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    'SELECT translation, explanation, created_at FROM translation_cache '
+                    'WHERE normalized_text = ? AND direction = ?',
+                    key
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.error("Ошибка чтения кэша переводов: %s", e)
+
+        if row and row[2] + self.ttl > now:
+            self._remember(key, row[0], row[1], row[2] + self.ttl)
+            with self._lock:
+                self.disk_hits += 1
+            return row[0], row[1]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def peek(self, text: str, direction: str) -> bool:
+        """Есть ли живой перевод в памяти; счётчики и порядок LRU не меняются"""
+        key = self.make_key(text, direction)
+        with self._lock:
+            entry = self._memory.get(key)
+        return entry is not None and entry[2] > time.time()
+
+    def set(self, text: str, direction: str, translation: str, explanation: str):
+        key = self.make_key(text, direction)
+        now = time.time()
+        self._remember(key, translation, explanation, now + self.ttl)
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO translation_cache '
+                    '(normalized_text, direction, translation, explanation, created_at) VALUES (?, ?, ?, ?, ?)',
+                    (key[0], key[1], translation, explanation, now)
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.error("Ошибка записи в кэш переводов: %s", e)
+
+    def _remember(self, key: Tuple[str, str], translation: str, explanation: str, expires_at: float):
+        with self._lock:
+            self._memory[key] = (translation, explanation, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_size:
+                self._memory.popitem(last=False)
+
+    def get_or_translate(self, text: str, direction: str,
+                         translate: Callable[[str, str], Translation]) -> Tuple[str, str]:
+        """Перевод из кэша, а при промахе - через translate с сохранением результата"""
+        cached = self.get(text, direction)
+        if cached:
+            return cached
+
+        started = time.monotonic()
+        result = translate(text, direction)
+        elapsed = time.monotonic() - started
+
+        with self._lock:
+            self._upstream_time += elapsed
+            self._upstream_calls += 1
+
+        # Ошибки нейросети не кэшируем, иначе они будут возвращаться до истечения TTL
+        if not result.failed:
+            self.set(text, direction, result.translation, result.explanation)
+
+        return result.translation, result.explanation
+
+    def get_or_translate_batch(self, texts: List[str], direction: str,
+                               translate_batch: Callable[[List[str], str], List[Translation]],
+                               chunk_size: int = TRANSLATE_BATCH_CHUNK) -> List[Tuple[str, str]]:
+        """Пакетный вариант get_or_translate: результаты в порядке texts.
+
+        Найденное в кэше отдаётся сразу, повторы внутри пакета переводятся
+        один раз, остальное уходит в translate_batch частями по chunk_size фраз.
+        """
+        results: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        misses: Dict[Tuple[str, str], str] = {}
+        for text in texts:
+            key = self.make_key(text, direction)
+            if key in results or key in misses:
+                continue
+            cached = self.get(text, direction)
+            if cached:
+                results[key] = cached
+            else:
+                misses[key] = text
+
+        pending = list(misses.items())
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            started = time.monotonic()
+            translated = translate_batch([text for _, text in chunk], direction)
+            elapsed = time.monotonic() - started
+
+            with self._lock:
+                self._upstream_time += elapsed
+                self._upstream_calls += 1
+
+            for (key, text), result in zip(chunk, translated):
+                results[key] = result.translation, result.explanation
+                if not result.failed:
+                    self.set(text, direction, result.translation, result.explanation)
+
+        return [results[self.make_key(text, direction)] for text in texts]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            avg_upstream = self._upstream_time / self._upstream_calls if self._upstream_calls else 0.0
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': hits / total if total else 0.0,
+                'memory_size': len(self._memory),
+                'avg_upstream_latency': avg_upstream,
+                'saved_api_calls': hits,
+                'saved_latency_seconds': hits * avg_upstream
+            }
+
+    def close(self):
+        with self._db_lock:
+            self._db.close()
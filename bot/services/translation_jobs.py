@@ -0,0 +1,165 @@
+# services/translation_jobs.py
+import contextvars
+import json
+import logging
+import secrets
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from database import connect_db
+from config import (TRANSLATE_JOB_WORKERS, TRANSLATE_JOB_QUEUE, TRANSLATE_JOB_TTL, TRANSLATE_JOB_TIMEOUT,
+                    TRANSLATE_SYNC_WAITERS)
+
+logger = logging.getLogger(__name__)
+
+# Как часто удалять устаревшие задания (секунды)
+CLEANUP_INTERVAL = 60
+
+class JobQueueFull(Exception):
+    """Слишком много переводов в работе, новое задание не принято"""
+
+class SyncWaitersBusy(Exception):
+    """Все разрешённые потоки сервера уже ждут синхронный перевод"""
+
+class TranslationJobs:
+    """Переводы API в ограниченном пуле потоков.
+
+    Медленные обращения к нейросети выполняются не более чем в max_workers
+    потоках, а всего в работе и в очереди - не больше max_pending заданий,
+    поэтому они не занимают все потоки сервера и быстрые запросы (история,
+    статистика) обслуживаются без ожидания. submit() сразу возвращает номер
+    задания, результат хранится в таблице translation_jobs и доступен
+    любому воркеру через get(). Синхронно (run_now) ждать результат могут
+    не больше waiters потоков сервера одновременно; семафор можно разделить
+    между несколькими пулами одного воркера.
+    """
+
+    def __init__(self, db_path: str, run: Callable[..., Dict[str, Any]],
+                 max_workers: int = TRANSLATE_JOB_WORKERS, max_pending: int = TRANSLATE_JOB_QUEUE,
+                 ttl: float = TRANSLATE_JOB_TTL, timeout: float = TRANSLATE_JOB_TIMEOUT,
+                 waiters: threading.Semaphore = None):
+        self.run = run
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="translate-job")
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._waiters = waiters or threading.BoundedSemaphore(TRANSLATE_SYNC_WAITERS)
+        self._db = connect_db(db_path, check_same_thread=False)
+        self._db_lock = threading.Lock()
+        self._cleaned_at = 0.0
+
+    def _reserve(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(f"В работе уже {self._pending} переводов")
+            self._pending += 1
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    def _execute(self, *args):
+        try:
+            return self.run(*args)
+        finally:
+            self._release()
+
+    def run_now(self, *args) -> Dict[str, Any]:
+        """Перевод в пуле с ожиданием результата (синхронный режим API).
+
+        Поток сервера блокируется на всё время перевода, поэтому при занятых
+        waiters сразу выбрасывается SyncWaitersBusy - API отвечает 503,
+        и клиент повторяет запрос позже.
+        """
+        if not self._waiters.acquire(blocking=False):
+            raise SyncWaitersBusy("Все потоки для синхронных переводов заняты")
+        try:
+            self._reserve()
+            # Контекст логов (request_id, user_id) переходит в поток пула
+            context = contextvars.copy_context()
+            return self._executor.submit(context.run, self._execute, *args).result()
+        finally:
+            self._waiters.release()
+
+    def submit(self, *args) -> str:
+        """Постановка перевода в очередь; возвращает номер задания"""
+        self._reserve()
+        job_id = secrets.token_urlsafe(12)
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    'INSERT INTO translation_jobs (id, status, created_at) VALUES (?, ?, ?)',
+                    (job_id, 'pending', time.time())
+                )
+                self._db.commit()
+            context = contextvars.copy_context()
+            self._executor.submit(context.run, self._run_job, job_id, *args)
+        except Exception:
+            self._release()
+            raise
+        return job_id
+
+    def _run_job(self, job_id: str, *args):
+        try:
+            result, error = self._execute(*args), None
+        except Exception as e:
+            logger.error("Ошибка фонового перевода %s: %s", job_id, e)
+            result, error = None, str(e)
+
+        now = time.time()
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    'UPDATE translation_jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?',
+                    ('error' if error else 'done',
+                     json.dumps(result, ensure_ascii=False) if result is not None else None,
+                     error, now, job_id)
+                )
+                if now - self._cleaned_at > CLEANUP_INTERVAL:
+                    self._cleaned_at = now
+                    # Готовые результаты хранятся ttl секунд, потерянные задания - столько же после timeout
+                    self._db.execute(
+                        'DELETE FROM translation_jobs WHERE finished_at < ? OR created_at < ?',
+                        (now - self.ttl, now - self.timeout - self.ttl)
+                    )
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.error("Ошибка сохранения результата перевода %s: %s", job_id, e)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Состояние задания: status (pending, done, error) и результат; None - нет такого"""
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    'SELECT status, result, error, created_at FROM translation_jobs WHERE id = ?',
+                    (job_id,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.error("Ошибка чтения задания перевода %s: %s", job_id, e)
+            raise
+        if row is None:
+            return None
+
+        status, result, error, created_at = row
+        if status == 'pending' and time.time() - created_at > self.timeout:
+            # Воркер, принявший задание, завершился, не успев его выполнить
+            return {'status': 'error', 'error': "Задание не выполнено, повторите запрос"}
+        job = {'status': status}
+        if result is not None:
+            job['result'] = json.loads(result)
+        if error is not None:
+            job['error'] = error
+        return job
+
+    def pending(self) -> int:
+        return self._pending
+
+    def close(self):
+        """Дожидается начатых переводов, отменяет ожидающие и закрывает соединение"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._db_lock:
+            self._db.close()
@@ -1,27 +1,125 @@
 # services/translation_service.py
-from typing import Tuple, Optional
-from database import FDataBase
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Optional
 from services.gigachat_service import GigaChatService
+from services.translation_cache import TranslationCache
+from services.single_flight import AsyncSingleFlight
+from services.dictionary_index import DictionaryIndex
+from services.history_writer import HistoryWriter
+from utils.text import list_items, split_lines
+from config import TRANSLATION_MAX_WORKERS
 
 class TranslationService:
-    def __init__(self, db: FDataBase):
-        self.db = db
+    def __init__(self, cache: TranslationCache = None, dictionary: DictionaryIndex = None,
+                 history: HistoryWriter = None, max_workers: int = TRANSLATION_MAX_WORKERS):
+        # История пишется пакетами в фоне, перевод не ждёт коммита
+        self.history = history or HistoryWriter()
         self.gigachat = GigaChatService()
+        self.cache = cache or TranslationCache()
+        self.dictionary = dictionary or DictionaryIndex()
+        # Блокирующие вызовы GigaChat выполняются в ограниченном пуле потоков,
+        # чтобы event loop продолжал обрабатывать остальных пользователей
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gigachat")
+        # Одинаковые запросы, пришедшие одновременно, ждут один вызов нейросети
+        self._flight = AsyncSingleFlight()
 
-    def translate_to_formal(self, text: str, user_id: int = None) -> Tuple[str, Optional[str]]:
+    async def _translate(self, text: str, direction: str) -> Tuple[str, Optional[str]]:
+        """Перевод: словарь, затем кэш, затем GigaChat в пуле потоков"""
+        # Известные слова и фразы переводим по словарю без обращения к нейросети
+        entry = self.dictionary.lookup(text, direction)
+        if entry:
+            return entry
+
+        # Попадание в память отдаём сразу, в пул уходят только обращения к базе и нейросети
+        cached = self.cache.get(text, direction, memory_only=True)
+        if cached:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        return await self._flight.do(
+            TranslationCache.make_key(text, direction),
+            lambda: loop.run_in_executor(
+                self._executor, self.cache.get_or_translate, text, direction, self.gigachat.translate_text
+            )
+        )
+
+    async def translate_to_formal(self, text: str, user_id: int = None) -> Tuple[str, Optional[str]]:
         """Перевод в формальный стиль через GigaChat"""
-        translation, explanation = self.gigachat.translate_text(text, "to_formal")
-        
+        translation, explanation = await self._translate(text, "to_formal")
+
         # Сохраняем в историю
-        self.db.add_translation(text, translation, explanation, user_id, "to_formal")
-        
+        await self.history.add_async(text, translation, explanation, user_id, "to_formal")
+
         return translation, explanation
 
-    def translate_to_informal(self, text: str, user_id: int = None) -> Tuple[str, Optional[str]]:
+    async def translate_to_informal(self, text: str, user_id: int = None) -> Tuple[str, Optional[str]]:
         """Перевод в неформальный стиль через GigaChat"""
-        translation, explanation = self.gigachat.translate_text(text, "to_informal")
-        
+        translation, explanation = await self._translate(text, "to_informal")
+
         # Сохраняем в историю
-        self.db.add_translation(text, translation, explanation, user_id, "to_informal")
-        
-        return translation, explanation
\ No newline at end of file
+        await self.history.add_async(text, translation, explanation, user_id, "to_informal")
+
+        return translation, explanation
+
+    def batch_lines(self, text: str, direction: str) -> List[str]:
+        """Фразы для пакетного перевода многострочного сообщения; [] - переводить целиком.
+
+        Переносы строк обычно часть одного текста, поэтому сообщение делится,
+        только если оно оформлено списком или каждая строка - отдельная
+        запись словаря либо кэша в памяти.
+        """
+        items = list_items(text)
+        if items:
+            return items
+        lines = split_lines(text)
+        if len(lines) > 1 and all(self.dictionary.contains(line, direction) or self.cache.peek(line, direction)
+                                  for line in lines):
+            return lines
+        return []
+
+    async def translate_batch(self, texts: List[str], direction: str,
+                              user_id: int = None) -> List[Tuple[str, Optional[str]]]:
+        """Перевод нескольких фраз: словарь и кэш по каждой, остальное - пакетами в GigaChat.
+
+        Промахи идут под теми же ключами single-flight, что и _translate:
+        фразу, которую уже переводят, пакет ждёт, а не запрашивает повторно.
+        """
+        results: List[Optional[Tuple[str, Optional[str]]]] = []
+        misses: List[str] = []
+        for text in texts:
+            found = self.dictionary.lookup(text, direction) or self.cache.get(text, direction, memory_only=True)
+            results.append(found)
+            if not found:
+                misses.append(text)
+
+        if misses:
+            loop = asyncio.get_running_loop()
+            by_key = {TranslationCache.make_key(text, direction): text for text in misses}
+            translated = iter(await self._flight.do_batch(
+                [TranslationCache.make_key(text, direction) for text in misses],
+                lambda keys: loop.run_in_executor(
+                    self._executor, self.cache.get_or_translate_batch,
+                    [by_key[key] for key in keys], direction, self.gigachat.translate_batch
+                )
+            ))
+            results = [found or next(translated) for found in results]
+
+        for text, (translation, explanation) in zip(texts, results):
+            await self.history.add_async(text, translation, explanation, user_id, direction)
+
+        return results
+
+    def get_cache_stats(self) -> Dict:
+        """Счётчики попаданий в кэш переводов"""
+        stats = self.cache.stats()
+        stats['coalesced'] = self._flight.shared
+        return stats
+
+    def get_dictionary_stats(self) -> Dict:
+        """Доля переводов, выполненных по словарю"""
+        return self.dictionary.stats()
+
+    def close(self):
+        """Остановка пула потоков при завершении бота"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -371,7 +371,8 @@ class SlanglitApp {
             body: JSON.stringify({
                 text: text,
                 direction: this.currentDirection,
-                user_id: userIdToSend
+                user_id: userIdToSend,
+                async: true
             })
         });
 
@@ -405,6 +406,11 @@ class SlanglitApp {
             throw new Error('Сервер вернул невалидный JSON');
         }
         
+        // Перевод выполняется в фоне: опрашиваем задание до готовности
+        if (response.status === 202) {
+            data = await this.waitForTranslation(data.job_id);
+        }
+        
         console.log('✅ Перевод получен:', data);
         return data;
         
@@ -414,6 +420,29 @@ class SlanglitApp {
     }
 }
 
+    async waitForTranslation(jobId, timeoutMs = 120000) {
+        const deadline = Date.now() + timeoutMs;
+        let delay = 300;
+        
+        while (Date.now() < deadline) {
+            await new Promise(resolve => setTimeout(resolve, delay));
+            delay = Math.min(delay * 1.5, 2000);
+            
+            const response = await fetch(`${this.apiBaseUrl}/translate/${jobId}`, {
+                headers: { 'Accept': 'application/json' }
+            });
+            const data = await response.json();
+            
+            if (!response.ok || data.status === 'error') {
+                throw new Error(data.error || `Ошибка ${response.status}`);
+            }
+            if (data.status === 'done') {
+                return data;
+            }
+        }
+        throw new Error('Перевод занял слишком много времени');
+    }
+
     switchLanguage() {
         const slangInput = document.getElementById('slangInput');
         const russianText = document.getElementById('russianText');
@@ -0,0 +1,120 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+from typing import Dict, NamedTuple, Optional
+from flask import Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен: без него отдаётся gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Страницы - точки входа: адрес не меняется, браузер проверяет их при каждом заходе
+PAGES = ('index.html', 'site.html')
+# Ресурсы с хэшем в имени хранятся в кэше браузера год и не перепроверяются
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+# Сжатие оставляем, только если оно экономит хотя бы 10%
+MIN_COMPRESSION_RATIO = 0.9
+
+class Asset(NamedTuple):
+    body: bytes
+    gzip: Optional[bytes]
+    brotli: Optional[bytes]
+    etag: str
+    mimetype: str
+    cache_control: str
+
+def _compress(data: bytes):
+    gzipped = gzip.compress(data, compresslevel=9, mtime=0)
+    compressed_brotli = brotli.compress(data, quality=11) if brotli is not None else None
+    limit = len(data) * MIN_COMPRESSION_RATIO
+    return (gzipped if len(gzipped) < limit else None,
+            compressed_brotli if compressed_brotli is not None and len(compressed_brotli) < limit else None)
+
+def _fingerprinted(path: str, digest: str) -> str:
+    base, ext = os.path.splitext(path)
+    return f"{base}.{digest[:10]}{ext}"
+
+class StaticAssets:
+    """Статика сайта из памяти процесса.
+
+    При запуске все файлы каталога читаются один раз, получают хэш
+    содержимого (сильный ETag) и заранее сжимаются gzip и brotli.
+    CSS, JS и шрифты дополнительно доступны по адресу с хэшем в имени
+    (style.<хэш>.css) с Cache-Control: immutable; ссылки на них в
+    страницах переписываются, поэтому повторный заход не скачивает их
+    снова, а сами страницы отвечают 304, пока не изменились.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._assets: Dict[str, Asset] = {}
+        self.urls: Dict[str, str] = {}
+        self._build()
+
+    def _add(self, path: str, body: bytes, cache_control: str) -> str:
+        digest = hashlib.sha256(body).hexdigest()
+        compressed_gzip, compressed_brotli = _compress(body)
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self._assets[path] = Asset(body, compressed_gzip, compressed_brotli, digest[:32], mimetype, cache_control)
+        return digest
+
+    def _build(self):
+        files = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                files.append(os.path.relpath(os.path.join(directory, name), self.root).replace(os.sep, '/'))
+
+        for path in sorted(files):
+            if path in PAGES:
+                continue
+            with open(os.path.join(self.root, path), 'rb') as f:
+                body = f.read()
+            digest = self._add(path, body, REVALIDATE)
+            fingerprinted = _fingerprinted(path, digest)
+            self._assets[fingerprinted] = self._assets[path]._replace(cache_control=IMMUTABLE)
+            self.urls[path] = '/' + fingerprinted
+
+        for page in PAGES:
+            page_path = os.path.join(self.root, page)
+            if not os.path.exists(page_path):
+                continue
+            with open(page_path, 'r', encoding='utf-8') as f:
+                html = f.read()
+            self._add(page, self._rewrite(html).encode('utf-8'), REVALIDATE)
+
+        logger.info("Статика сайта подготовлена", extra={'files': len(files), 'brotli': brotli is not None})
+
+    def _rewrite(self, html: str) -> str:
+        """Ссылки страницы на ресурсы (href, src, url()) - на адреса с хэшем"""
+        for path, url in self.urls.items():
+            pattern = r'''(?<=["'(])(?:\./|/)?''' + re.escape(path) + r'''(?=["')])'''
+            html = re.sub(pattern, url, html)
+        return html
+
+    def response(self, path: str, request: Request) -> Optional[Response]:
+        """Ответ с лучшим из поддерживаемых клиентом сжатий; None - файла нет"""
+        asset = self._assets.get(path)
+        if asset is None:
+            return None
+
+        body, encoding = asset.body, None
+        if asset.brotli is not None and request.accept_encodings['br']:
+            body, encoding = asset.brotli, 'br'
+        elif asset.gzip is not None and request.accept_encodings['gzip']:
+            body, encoding = asset.gzip, 'gzip'
+
+        response = Response(body, mimetype=asset.mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        # У каждого варианта сжатия свой сильный ETag
+        response.set_etag(f"{asset.etag}-{encoding}" if encoding else asset.etag)
+        response.headers['Cache-Control'] = asset.cache_control
+        return response.make_conditional(request)
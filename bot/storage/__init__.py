@@ -0,0 +1,32 @@
+from urllib.parse import urlparse
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
+from .sqlite_storage import SQLiteStorage
+from .redis_storage import RespStorage
+from .resp_client import RespClient, RespError
+
+def create_storage(url: str) -> BaseStorage:
+    """Хранилище FSM по адресу из config.FSM_STORAGE_URL.
+
+    memory://                  - в памяти процесса (состояния теряются при перезапуске)
+    sqlite:///fsm_state.db     - файл SQLite, общий для процессов на одной машине
+    sqlite:////var/lib/fsm.db  - то же с абсолютным путём
+    redis://:пароль@host:6379/0 - сервер с протоколом Redis
+    """
+    parsed = urlparse(url)
+    if parsed.scheme == 'memory':
+        return MemoryStorage()
+    if parsed.scheme == 'sqlite':
+        # Убираем только первый слэш: после него путь относительный, после двух - абсолютный
+        return SQLiteStorage(parsed.path[1:] or 'fsm_state.db')
+    if parsed.scheme == 'redis':
+        client = RespClient(
+            host=parsed.hostname or 'localhost',
+            port=parsed.port or 6379,
+            db=int(parsed.path.lstrip('/') or 0),
+            password=parsed.password
+        )
+        return RespStorage(client)
+    raise ValueError(f"Неизвестное хранилище FSM: {url}")
+
+__all__ = ['create_storage', 'SQLiteStorage', 'RespStorage', 'RespClient', 'RespError']
@@ -0,0 +1,44 @@
+# storage/redis_storage.py
+import json
+from collections.abc import Mapping
+from typing import Any, Dict, Optional
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+from storage.resp_client import RespClient
+from config import FSM_STATE_TTL
+
+class RespStorage(BaseStorage):
+    """Хранилище FSM на сервере с протоколом Redis.
+
+    Состояние и данные - отдельные ключи со сроком жизни ttl; пустые значения
+    удаляются. Без зависимости от пакета redis: используется RespClient.
+    """
+
+    def __init__(self, client: RespClient, ttl: int = FSM_STATE_TTL, key_builder: KeyBuilder = None):
+        self.client = client
+        self.ttl = ttl
+        self.key_builder = key_builder or DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+
+    async def _set(self, key: str, value: Optional[str]):
+        if value is None:
+            await self.client.execute('DEL', key)
+        else:
+            await self.client.execute('SET', key, value, 'EX', self.ttl)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        await self._set(self.key_builder.build(key, 'state'), state.state if isinstance(state, State) else state)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        value = await self.client.execute('GET', self.key_builder.build(key, 'state'))
+        return value.decode('utf-8') if value is not None else None
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        await self._set(self.key_builder.build(key, 'data'),
+                        json.dumps(dict(data), ensure_ascii=False) if data else None)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        value = await self.client.execute('GET', self.key_builder.build(key, 'data'))
+        return json.loads(value) if value is not None else {}
+
+    async def close(self) -> None:
+        await self.client.close()
@@ -0,0 +1,114 @@
+# storage/resp_client.py
+import asyncio
+from typing import Any, List, Optional, Sequence, Union
+
+class RespError(Exception):
+    """Ошибка, которую вернул сервер (ответ вида -ERR ...)"""
+
+def encode_command(*args: Union[str, bytes, int, float]) -> bytes:
+    """Команда в формате RESP: массив bulk-строк"""
+    parts = [b'*%d\r\n' % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            value = arg
+        elif isinstance(arg, str):
+            value = arg.encode('utf-8')
+        else:
+            value = str(arg).encode('utf-8')
+        parts.append(b'$%d\r\n%s\r\n' % (len(value), value))
+    return b''.join(parts)
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    """Чтение одного ответа RESP2; ошибки сервера возвращаются как RespError"""
+    line = await reader.readline()
+    if not line.endswith(b'\r\n'):
+        raise ConnectionError("Соединение с сервером закрыто")
+    kind, payload = line[:1], line[1:-2]
+
+    if kind == b'+':
+        return payload.decode('utf-8')
+    if kind == b'-':
+        return RespError(payload.decode('utf-8'))
+    if kind == b':':
+        return int(payload)
+    if kind == b'$':
+        length = int(payload)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b'*':
+        count = int(payload)
+        if count < 0:
+            return None
+        return [await read_reply(reader) for _ in range(count)]
+    raise ConnectionError(f"Неизвестный тип ответа RESP: {line!r}")
+
+class RespClient:
+    """Минимальный асинхронный клиент протокола Redis (RESP2).
+
+    Одно соединение, команды отправляются по очереди под замком; несколько
+    команд можно отправить одним пакетом через pipeline. Подходит для Redis,
+    KeyDB, Dragonfly и локальной заглушки additional_scripts/resp_stub.py.
+    """
+
+    def __init__(self, host: str = 'localhost', port: int = 6379, db: int = 0,
+                 password: Optional[str] = None, timeout: float = 5.0):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        setup = []
+        if self.password:
+            setup.append(('AUTH', self.password))
+        if self.db:
+            setup.append(('SELECT', self.db))
+        if setup:
+            for reply in await self._roundtrip(setup):
+                if isinstance(reply, RespError):
+                    raise reply
+
+    async def _roundtrip(self, commands: Sequence[Sequence]) -> List[Any]:
+        self._writer.write(b''.join(encode_command(*command) for command in commands))
+        await self._writer.drain()
+        return [await asyncio.wait_for(read_reply(self._reader), self.timeout) for _ in commands]
+
+    async def pipeline(self, commands: Sequence[Sequence]) -> List[Any]:
+        """Отправка нескольких команд одним пакетом; ошибки возвращаются в списке"""
+        async with self._lock:
+            if self._writer is None or self._writer.is_closing():
+                await self._connect()
+            try:
+                return await self._roundtrip(commands)
+            except (ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+                # Соединение в неизвестном состоянии - следующая команда откроет новое
+                await self._disconnect()
+                raise
+
+    async def execute(self, *args) -> Any:
+        reply = (await self.pipeline([args]))[0]
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    async def _disconnect(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self._reader = self._writer = None
+
+    async def close(self):
+        async with self._lock:
+            await self._disconnect()
@@ -0,0 +1,189 @@
+# storage/sqlite_storage.py
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+from database import connect_db
+from config import FSM_STATE_TTL, FSM_FLUSH_INTERVAL, FSM_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+FSM_SCHEMA = '''CREATE TABLE IF NOT EXISTS fsm_state (
+    key TEXT PRIMARY KEY,
+    state TEXT,
+    data TEXT NOT NULL DEFAULT '{}',
+    updated_at REAL NOT NULL
+) WITHOUT ROWID'''
+
+FSM_UPDATED_INDEX = 'CREATE INDEX IF NOT EXISTS idx_fsm_state_updated ON fsm_state(updated_at)'
+
+# Как часто удалять устаревшие состояния (секунды)
+CLEANUP_INTERVAL = 60 * 60
+
+_MISSING = object()
+
+class SQLiteStorage(BaseStorage):
+    """Хранилище FSM в SQLite, общее для нескольких процессов бота.
+
+    Изменения копятся в памяти и записываются одной транзакцией (executemany)
+    раз в flush_interval секунд или по batch_size изменений. Пока запись
+    не сброшена, чтения этого процесса видят её из буфера; другие процессы
+    видят её после сброса. Соединение живёт в отдельном потоке, чтобы
+    обращения к диску не блокировали event loop.
+    """
+
+    def __init__(self, path: str = 'fsm_state.db', ttl: int = FSM_STATE_TTL,
+                 flush_interval: float = FSM_FLUSH_INTERVAL, batch_size: int = FSM_BATCH_SIZE,
+                 key_builder: KeyBuilder = None):
+        self.path = path
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.key_builder = key_builder or DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+
+        # Один поток - одно соединение; все обращения к базе идут через него
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fsm-sqlite")
+        self._db: Optional[sqlite3.Connection] = None
+
+        # Несброшенные изменения и изменения, которые сейчас пишутся в базу
+        self._pending_state: Dict[str, Optional[str]] = {}
+        self._pending_data: Dict[str, str] = {}
+        self._flushing_state: Dict[str, Optional[str]] = {}
+        self._flushing_data: Dict[str, str] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        # Первый сброс после запуска сразу удаляет устаревшие состояния
+        self._last_cleanup = float('-inf')
+        self._closed = False
+
+    # ---- работа с базой в потоке хранилища ----
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = connect_db(self.path)
+            self._db.execute(FSM_SCHEMA)
+            self._db.execute(FSM_UPDATED_INDEX)
+            self._db.commit()
+        return self._db
+
+    def _read(self, key: str) -> Optional[Tuple[Optional[str], str]]:
+        return self._connect().execute(
+            'SELECT state, data FROM fsm_state WHERE key = ? AND updated_at > ?',
+            (key, time.time() - self.ttl)
+        ).fetchone()
+
+    def _write(self, states: Dict[str, Optional[str]], data: Dict[str, str], cleanup: bool):
+        db = self._connect()
+        now = time.time()
+        with db:
+            if states:
+                db.executemany(
+                    'INSERT INTO fsm_state (key, state, updated_at) VALUES (?, ?, ?) '
+                    'ON CONFLICT(key) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at',
+                    [(key, state, now) for key, state in states.items()]
+                )
+            if data:
+                db.executemany(
+                    'INSERT INTO fsm_state (key, data, updated_at) VALUES (?, ?, ?) '
+                    'ON CONFLICT(key) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at',
+                    [(key, value, now) for key, value in data.items()]
+                )
+            # Пустые записи не храним
+            db.executemany(
+                "DELETE FROM fsm_state WHERE key = ? AND state IS NULL AND data = '{}'",
+                [(key,) for key in states.keys() | data.keys()]
+            )
+            if cleanup:
+                db.execute('DELETE FROM fsm_state WHERE updated_at <= ?', (now - self.ttl,))
+
+    def _close_db(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    # ---- пакетная запись ----
+
+    def _schedule_flush(self):
+        if len(self._pending_state) + len(self._pending_data) >= self.batch_size:
+            asyncio.ensure_future(self.flush())
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self):
+        """Запись накопленных изменений одной транзакцией"""
+        async with self._flush_lock:
+            if not self._pending_state and not self._pending_data:
+                return
+            self._flushing_state, self._pending_state = self._pending_state, {}
+            self._flushing_data, self._pending_data = self._pending_data, {}
+
+            now = time.monotonic()
+            cleanup = now - self._last_cleanup > CLEANUP_INTERVAL
+            if cleanup:
+                self._last_cleanup = now
+            try:
+                await self._run(self._write, self._flushing_state, self._flushing_data, cleanup)
+            except sqlite3.Error as e:
+                logger.error("Ошибка записи состояний FSM: %s", e)
+                # Возвращаем несохранённое в буфер, не затирая более новые изменения
+                self._pending_state = {**self._flushing_state, **self._pending_state}
+                self._pending_data = {**self._flushing_data, **self._pending_data}
+                self._schedule_flush()
+            finally:
+                self._flushing_state, self._flushing_data = {}, {}
+
+    def _buffered(self, key: str, pending: Dict, flushing: Dict) -> Any:
+        if key in pending:
+            return pending[key]
+        return flushing.get(key, _MISSING)
+
+    # ---- интерфейс BaseStorage ----
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        self._pending_state[self.key_builder.build(key)] = state.state if isinstance(state, State) else state
+        self._schedule_flush()
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        storage_key = self.key_builder.build(key)
+        state = self._buffered(storage_key, self._pending_state, self._flushing_state)
+        if state is not _MISSING:
+            return state
+        row = await self._run(self._read, storage_key)
+        return row[0] if row else None
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        self._pending_data[self.key_builder.build(key)] = json.dumps(dict(data), ensure_ascii=False)
+        self._schedule_flush()
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        storage_key = self.key_builder.build(key)
+        data = self._buffered(storage_key, self._pending_data, self._flushing_data)
+        if data is _MISSING:
+            row = await self._run(self._read, storage_key)
+            data = row[1] if row else '{}'
+        return json.loads(data)
+
+    async def close(self) -> None:
+        """Сброс буфера и закрытие соединения при остановке бота"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+        await self._run(self._close_db)
+        self._executor.shutdown(wait=True)
+
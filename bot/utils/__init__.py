@@ -1,6 +1,8 @@
 from .keyboards import *
 from .states import *
+from .text import normalize_text, dictionary_letter, fts_query
 
 __all__ = ['get_main_keyboard', 'get_admin_keyboard', 'translation_keyboard', 
            'translation_mode_keyboard', 'cancel_keyboard', 'confirm_keyboard',
-           'role_selection_keyboard', 'TranslationStates', 'SearchStates', 'AdminStates']
+           'role_selection_keyboard', 'TranslationStates', 'SearchStates', 'AdminStates',
+           'normalize_text', 'dictionary_letter', 'fts_query']
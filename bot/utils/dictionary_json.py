@@ -0,0 +1,105 @@
+import json
+from typing import Iterator, Optional, TextIO, Tuple
+
+# Возможные названия полей в JSON-словарях words/*.json
+INFORMAL_KEYS = ('informal_text', 'informal', 'word', 'slang')
+FORMAL_KEYS = ('formal_text', 'formal', 'translation', 'meaning')
+EXPLANATION_KEYS = ('explanation', 'description', 'example')
+
+DictionaryEntry = Tuple[str, str, Optional[str]]
+
+def _first_value(item: dict, keys: Tuple[str, ...]) -> Optional[str]:
+    for key in keys:
+        value = item.get(key)
+        if value:
+            return str(value).strip()
+    return None
+
+def parse_entry(item) -> Optional[DictionaryEntry]:
+    """Запись словаря (informal, formal, explanation) из элемента JSON"""
+    if not isinstance(item, dict):
+        return None
+    informal = _first_value(item, INFORMAL_KEYS)
+    formal = _first_value(item, FORMAL_KEYS)
+    if not informal or not formal:
+        return None
+    return informal, formal, _first_value(item, EXPLANATION_KEYS)
+
+def parse_pair(informal: str, value) -> Optional[DictionaryEntry]:
+    """Запись словаря из пары объекта {слово: перевод} или {слово: {...}}"""
+    if isinstance(value, dict):
+        return parse_entry({'informal_text': informal, **value})
+    return parse_entry({'informal_text': informal, 'formal_text': value})
+
+def iter_json_stream(f: TextIO, chunk_size: int = 1 << 16) -> Iterator[DictionaryEntry]:
+    """Потоковое чтение JSON-словаря без загрузки всего файла в память.
+
+    Верхний уровень файла - массив объектов или объект {слово: перевод};
+    элементы разбираются по одному из буфера, который дочитывается блоками.
+    """
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    eof = False
+
+    def read_more() -> bool:
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip(chars: str) -> str:
+        """Пропуск символов из chars; возвращает следующий символ или '' в конце файла"""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in chars:
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not read_more():
+                return ''
+
+    def decode():
+        nonlocal pos
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                # Число в конце буфера могло оборваться - дочитываем и разбираем заново
+                if end < len(buf) or eof:
+                    pos = end
+                    return value
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            read_more()
+
+    whitespace = ' \t\r\n\ufeff'
+    opening = skip(whitespace)
+    if opening not in ('[', '{'):
+        raise ValueError("Ожидается JSON-массив или объект на верхнем уровне")
+    pos += 1
+    closing = ']' if opening == '[' else '}'
+
+    while True:
+        char = skip(whitespace + ',')
+        if char == closing:
+            return
+        if not char:
+            raise ValueError("Неожиданный конец JSON-файла")
+
+        if opening == '[':
+            entry = parse_entry(decode())
+        else:
+            informal = decode()
+            if skip(whitespace) != ':':
+                raise ValueError("Ожидается ':' после ключа JSON-объекта")
+            pos += 1
+            skip(whitespace)
+            entry = parse_pair(informal, decode())
+
+        if entry:
+            yield entry
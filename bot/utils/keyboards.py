@@ -1,41 +1,49 @@
+from functools import lru_cache
+from typing import Dict, Tuple
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
-import sqlite3
-from database import FDataBase
 
-def connect_db():
-    return sqlite3.connect('translations.db')
+# Клавиатуры не обращаются к базе: права пользователя передаёт обработчик
+# (admin_service.is_user_admin). Статичные клавиатуры создаются один раз,
+# функции без параметров возвращают закэшированный объект
+_main_buttons = [
+    [KeyboardButton(text="🔄 Перевод")],
+    [KeyboardButton(text="📖 История"), KeyboardButton(text="📚 Словарь")],
+]
 
-db = FDataBase(connect_db())
+main_keyboard = ReplyKeyboardMarkup(keyboard=_main_buttons, resize_keyboard=True)
 
-def is_user_admin(user_id: int) -> bool:
-    admin_role = db.getAdminByLogin(str(user_id))
-    return admin_role in ["GreatAdmin", "Admin"]
+main_admin_keyboard = ReplyKeyboardMarkup(
+    keyboard=_main_buttons + [[KeyboardButton(text="⚙️ Админ-панель")]],
+    resize_keyboard=True
+)
 
-def get_main_keyboard(user_id: int) -> ReplyKeyboardMarkup:
-    keyboard = [
-        [KeyboardButton(text="🔄 Перевод")],
-        [KeyboardButton(text="📖 История")],
-    ]
-    if is_user_admin(user_id):
-        keyboard.append([KeyboardButton(text="⚙️ Админ-панель")])
-    return ReplyKeyboardMarkup(keyboard=keyboard, resize_keyboard=True)
+great_admin_keyboard = ReplyKeyboardMarkup(
+    keyboard=[
+        [KeyboardButton(text="👥 Список админов")],
+        [KeyboardButton(text="➕ Добавить админа"), KeyboardButton(text="➖ Удалить админа")],
+        [KeyboardButton(text="📊 Базовая статистика"), KeyboardButton(text="📈 Детальная статистика")],
+        [KeyboardButton(text="👤 Статистика пользователей"), KeyboardButton(text="🕐 Активность в реальном времени")],
+        [KeyboardButton(text="📚 Управление словарём")],
+        [KeyboardButton(text="⬅️ Назад в меню")]
+    ],
+    resize_keyboard=True
+)
+
+admin_keyboard = ReplyKeyboardMarkup(
+    keyboard=[
+        [KeyboardButton(text="📊 Базовая статистика"), KeyboardButton(text="📈 Детальная статистика")],
+        [KeyboardButton(text="⬅️ Назад в меню")]
+    ],
+    resize_keyboard=True
+)
+
+def get_main_keyboard(is_admin: bool = False) -> ReplyKeyboardMarkup:
+    return main_admin_keyboard if is_admin else main_keyboard
 
 def get_admin_keyboard(admin_role: str) -> ReplyKeyboardMarkup:
-    if admin_role == "GreatAdmin":
-        keyboard = [
-            [KeyboardButton(text="👥 Список админов")],
-            [KeyboardButton(text="➕ Добавить админа"), KeyboardButton(text="➖ Удалить админа")],
-            [KeyboardButton(text="📊 Базовая статистика"), KeyboardButton(text="📈 Детальная статистика")],
-            [KeyboardButton(text="👤 Статистика пользователей"), KeyboardButton(text="🕐 Активность в реальном времени")],
-            [KeyboardButton(text="⬅️ Назад в меню")]
-        ]
-    else:
-        keyboard = [
-            [KeyboardButton(text="📊 Базовая статистика"), KeyboardButton(text="📈 Детальная статистика")],
-            [KeyboardButton(text="⬅️ Назад в меню")]
-        ]
-    return ReplyKeyboardMarkup(keyboard=keyboard, resize_keyboard=True)
+    return great_admin_keyboard if admin_role == "GreatAdmin" else admin_keyboard
 
+@lru_cache(maxsize=None)
 def get_stats_keyboard() -> ReplyKeyboardMarkup:
     """Клавиатура для выбора типа статистики"""
     keyboard = [
@@ -47,6 +55,7 @@ def get_stats_keyboard() -> ReplyKeyboardMarkup:
     ]
     return ReplyKeyboardMarkup(keyboard=keyboard, resize_keyboard=True)
 
+@lru_cache(maxsize=None)
 def get_user_stats_keyboard() -> ReplyKeyboardMarkup:
     """Клавиатура для статистики пользователей"""
     keyboard = [
@@ -88,4 +97,73 @@ role_selection_keyboard = ReplyKeyboardMarkup(
         [KeyboardButton(text="❌ Отменить")]
     ],
     resize_keyboard=True
-)
\ No newline at end of file
+)
+
+@lru_cache(maxsize=None)
+def get_dictionary_main_keyboard() -> ReplyKeyboardMarkup:
+    """Клавиатура главного меню словаря"""
+    keyboard = [
+        [KeyboardButton(text="🔤 По алфавиту"), KeyboardButton(text="📄 Все слова")],
+        [KeyboardButton(text="🔍 Поиск в словаре")],
+        [KeyboardButton(text="⬅️ Назад в меню")]
+    ]
+    return ReplyKeyboardMarkup(keyboard=keyboard, resize_keyboard=True)
+
+@lru_cache(maxsize=None)
+def get_alphabet_keyboard() -> ReplyKeyboardMarkup:
+    """Клавиатура выбора буквы словаря"""
+    letters = list("АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ") + ['0-9']
+    keyboard = [
+        [KeyboardButton(text=letter) for letter in letters[i:i + 7]]
+        for i in range(0, len(letters), 7)
+    ]
+    keyboard.append([KeyboardButton(text="ALL")])
+    keyboard.append([KeyboardButton(text="⬅️ Назад в словарь")])
+    return ReplyKeyboardMarkup(keyboard=keyboard, resize_keyboard=True)
+
+# Ограничение Telegram на callback_data (байт)
+CALLBACK_DATA_LIMIT = 64
+
+def page_cursor_data(prefix: str, action: str, offset: int, word: Dict) -> str:
+    """callback_data перехода по страницам словаря: {prefix}_{action}_{offset}_{id}_{ключ слова}"""
+    data = f"{prefix}_{action}_{offset}_{word['id']}_"
+    key = word['normalized_informal']
+    budget = CALLBACK_DATA_LIMIT - len(data.encode())
+    if len(key.encode()) > budget:
+        # Длинный ключ обрезается: страница может повторить пару слов, но не пропустит.
+        # Для prev граница - после всех слов с этим началом ('\uffff' - 3 байта)
+        if action == 'prev':
+            budget -= 3
+        key = key.encode()[:budget].decode(errors='ignore')
+        if action == 'prev':
+            key += '\uffff'
+    return data + key
+
+def parse_page_cursor(data: str, prefix: str) -> Tuple[str, int, Tuple[str, int]]:
+    """Обратное к page_cursor_data: (action, offset, (ключ, id))"""
+    action, offset, word_id, key = data[len(prefix) + 1:].split('_', 3)
+    return action, int(offset), (key, int(word_id))
+
+def get_letter_navigation_keyboard(letter: str, offset: int, total_words: int,
+                                   first_word: Dict, last_word: Dict) -> InlineKeyboardMarkup:
+    """Навигация по словам на букву: курсоры - первое и последнее слово страницы"""
+    prefix = f"letter_{letter}"
+    nav_buttons = []
+    if offset > 0:
+        nav_buttons.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=page_cursor_data(prefix, 'prev', offset-10, first_word)))
+    if offset + 10 < total_words:
+        nav_buttons.append(InlineKeyboardButton(text="Вперед ➡️", callback_data=page_cursor_data(prefix, 'next', offset+10, last_word)))
+
+    keyboard_buttons = []
+    if nav_buttons:
+        keyboard_buttons.append(nav_buttons)
+    keyboard_buttons.append([InlineKeyboardButton(text="🔤 К алфавиту", callback_data="back_to_alphabet")])
+    return InlineKeyboardMarkup(inline_keyboard=keyboard_buttons)
+
+dictionary_management_keyboard = ReplyKeyboardMarkup(
+    keyboard=[
+        [KeyboardButton(text="➕ Добавить слово"), KeyboardButton(text="➖ Удалить слово")],
+        [KeyboardButton(text="⬅️ Назад в админ-панель")]
+    ],
+    resize_keyboard=True
+)
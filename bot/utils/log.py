@@ -0,0 +1,147 @@
+# utils/log.py
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+from config import LOG_LEVEL, LOG_JSON, LOG_MODULE_LEVELS
+
+# Идентификаторы запроса и пользователя для связи строк лога одного обращения
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('request_id', default=None)
+user_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('user_id', default=None)
+
+# Атрибуты LogRecord, которые не попадают в поле extra JSON-строки
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id', 'user_id'}
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+def bind_context(request_id: str = None, user_id=None):
+    """Установка идентификаторов для текущего контекста; возвращает токены для reset_context"""
+    return (request_id_var.set(request_id),
+            user_id_var.set(str(user_id) if user_id is not None else None))
+
+def reset_context(tokens):
+    request_token, user_token = tokens
+    request_id_var.reset(request_token)
+    user_id_var.reset(user_token)
+
+@contextmanager
+def log_context(request_id: str = None, user_id=None):
+    tokens = bind_context(request_id or new_request_id(), user_id)
+    try:
+        yield
+    finally:
+        reset_context(tokens)
+
+class ContextFilter(logging.Filter):
+    """Копирует идентификаторы из contextvars в запись.
+
+    Стоит на QueueHandler: запись форматируется в потоке слушателя,
+    где контекста обработчика уже нет.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.user_id = user_id_var.get()
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """Одна JSON-строка на запись"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for field in ('request_id', 'user_id'):
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        extra = {key: value for key, value in vars(record).items() if key not in _RECORD_FIELDS}
+        if extra:
+            entry['extra'] = extra
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class TextFormatter(logging.Formatter):
+    """Читаемый формат для разработки"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(name)s [%(request_id)s] %(message)s')
+
+    def format(self, record: logging.LogRecord) -> str:
+        if getattr(record, 'request_id', None) is None:
+            record.request_id = '-'
+        return super().format(record)
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Как QueueHandler, но трассировка остаётся отдельным полем, а не в тексте"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class LogContextMiddleware(BaseMiddleware):
+    """Идентификаторы обновления и пользователя для логов обработчиков бота"""
+
+    async def __call__(self, handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject, data: Dict[str, Any]) -> Any:
+        user = data.get('event_from_user')
+        request_id = f"upd-{event.update_id}" if isinstance(event, Update) else new_request_id()
+        with log_context(request_id, user.id if user else None):
+            return await handler(event, data)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def setup_logging(level: str = LOG_LEVEL, json_output: bool = LOG_JSON,
+                  module_levels: Dict[str, str] = LOG_MODULE_LEVELS):
+    """Настройка логирования процесса (бот или API); повторный вызов ничего не делает.
+
+    Обработчики пишут в очередь, а в stdout пишет отдельный поток
+    QueueListener, поэтому медленный вывод не блокирует event loop и запросы.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if json_output else TextFormatter())
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(level)
+    for name, module_level in module_levels.items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+def stop_logging():
+    """Дописывает очередь логов (при завершении процесса)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,443 @@
+# utils/metrics.py
+import asyncio
+import bisect
+import functools
+import glob
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from aiogram import BaseMiddleware, Router
+from aiogram.types import TelegramObject
+from config import METRICS_FLUSH_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+# Формат текстовой выдачи Prometheus
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Границы корзин гистограмм (секунды)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+def _escape_help(text: str) -> str:
+    # В HELP экранируются только обратный слэш и перевод строки
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+def _escape(value: str) -> str:
+    return _escape_help(value).replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+# Семейство метрик для выдачи: имя, описание, тип и строки (имя, метки, значения меток, число)
+Family = Tuple[str, str, str, List[Tuple[str, Sequence[str], Sequence[str], float]]]
+
+def _render(families: Iterable[Family]) -> str:
+    lines: List[str] = []
+    for name, documentation, kind, samples in families:
+        lines.append(f'# HELP {name} {_escape_help(documentation)}')
+        lines.append(f'# TYPE {name} {kind}')
+        for sample_name, labelnames, labelvalues, value in samples:
+            lines.append(f'{sample_name}{_format_labels(labelnames, labelvalues)} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+class Registry:
+    """Набор метрик процесса и их выдача в текстовом формате Prometheus"""
+
+    def __init__(self):
+        self._metrics: Dict[str, '_Metric'] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: '_Metric'):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+            self._metrics[metric.name] = metric
+
+    def collect(self) -> List[Family]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        families: List[Family] = []
+        for metric in metrics:
+            try:
+                samples = list(metric.samples())
+            except Exception as e:
+                # Сломанный источник не должен ломать всю выдачу
+                logger.error("Ошибка сбора метрики %s: %s", metric.name, e)
+                continue
+            families.append((metric.name, metric.documentation, metric.kind, samples))
+        return families
+
+    def render(self) -> str:
+        return _render(self.collect())
+
+REGISTRY = Registry()
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Registry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        registry.register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name}: ожидаются метки {self.labelnames}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _items(self):
+        with self._lock:
+            return list(self._children.items())
+
+    def samples(self) -> Iterable[Tuple[str, Sequence[str], Sequence[str], float]]:
+        for labelvalues, child in self._items():
+            yield self.name, self.labelnames, labelvalues, child.value
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+class Counter(_Metric):
+    """Счётчик, который только растёт"""
+    kind = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+class _HistogramValue:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        # Последняя ячейка - значения больше верхней границы (+Inf)
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+class Histogram(_Metric):
+    """Распределение значений (задержек) по корзинам"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Registry = REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def samples(self):
+        labelnames = self.labelnames + ('le',)
+        for labelvalues, child in self._items():
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield f'{self.name}_bucket', labelnames, labelvalues + (_format_value(bound),), cumulative
+            yield f'{self.name}_count', self.labelnames, labelvalues, cumulative
+            yield f'{self.name}_sum', self.labelnames, labelvalues, total
+
+class CallbackMetric(_Metric):
+    """Метрика, значения которой берутся из счётчиков сервисов в момент выдачи.
+
+    Источники добавляются при запуске процесса (add_source) и возвращают
+    словарь {значения меток: число}; на горячем пути ничего не считается.
+    """
+
+    def __init__(self, name: str, documentation: str, kind: str, labelnames: Sequence[str] = (),
+                 registry: Registry = REGISTRY):
+        self.kind = kind
+        self._sources: List[Callable[[], Dict[Tuple[str, ...], float]]] = []
+        super().__init__(name, documentation, labelnames, registry)
+
+    def add_source(self, source: Callable[[], Dict[Tuple[str, ...], float]]):
+        with self._lock:
+            self._sources.append(source)
+
+    def samples(self):
+        with self._lock:
+            sources = list(self._sources)
+        for source in sources:
+            for labelvalues, value in source().items():
+                yield self.name, self.labelnames, tuple(str(v) for v in labelvalues), value
+
+# Метрики бота и API
+GIGACHAT_REQUEST_SECONDS = Histogram(
+    'slanglit_gigachat_request_seconds', 'Время запроса к GigaChat', ('direction', 'outcome'))
+GIGACHAT_TOKENS = Counter(
+    'slanglit_gigachat_tokens_total', 'Токены, израсходованные на запросы к GigaChat', ('kind',))
+GIGACHAT_ERRORS = Counter(
+    'slanglit_gigachat_errors_total', 'Ошибки обращения к GigaChat', ('reason',))
+GIGACHAT_BATCH_ITEMS = Histogram(
+    'slanglit_gigachat_batch_items', 'Число фраз в одном пакетном запросе к GigaChat',
+    buckets=(1, 2, 5, 10, 20, 50))
+DB_QUERY_SECONDS = Histogram(
+    'slanglit_db_query_seconds', 'Время выполнения методов FDataBase', ('method',), buckets=FAST_BUCKETS)
+HANDLER_SECONDS = Histogram(
+    'slanglit_handler_seconds', 'Время обработки события ботом по роутерам', ('router', 'event', 'outcome'))
+HTTP_REQUEST_SECONDS = Histogram(
+    'slanglit_http_request_seconds', 'Время обработки HTTP-запроса API', ('endpoint', 'method', 'status'))
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    'slanglit_event_loop_lag_seconds', 'Задержка срабатывания таймера event loop бота', buckets=FAST_BUCKETS)
+CACHE_LOOKUPS = CallbackMetric(
+    'slanglit_cache_lookups_total', 'Обращения к кэшу переводов и словарю', 'counter', ('cache', 'result'))
+CACHE_HIT_RATIO = CallbackMetric(
+    'slanglit_cache_hit_ratio', 'Доля попаданий с момента запуска', 'gauge', ('cache',))
+HISTORY_ROWS = CallbackMetric(
+    'slanglit_history_rows_total', 'Строки истории, прошедшие через очередь записи', 'counter', ('result',))
+HISTORY_PENDING = CallbackMetric(
+    'slanglit_history_pending', 'Строки истории, ожидающие записи', 'gauge')
+
+def track_services(cache=None, dictionary=None, history=None):
+    """Подключение счётчиков сервисов процесса к метрикам"""
+    if cache is not None:
+        def cache_lookups():
+            stats = cache.stats()
+            return {
+                ('translation', 'memory_hit'): stats['memory_hits'],
+                ('translation', 'disk_hit'): stats['disk_hits'],
+                ('translation', 'miss'): stats['misses'],
+            }
+        CACHE_LOOKUPS.add_source(cache_lookups)
+        CACHE_HIT_RATIO.add_source(lambda: {('translation',): cache.stats()['hit_rate']})
+    if dictionary is not None:
+        def dictionary_lookups():
+            stats = dictionary.stats()
+            return {
+                ('dictionary', 'hit'): stats['hits'],
+                ('dictionary', 'miss'): stats['lookups'] - stats['hits'],
+            }
+        CACHE_LOOKUPS.add_source(dictionary_lookups)
+        CACHE_HIT_RATIO.add_source(lambda: {('dictionary',): dictionary.stats()['hit_rate']})
+    if history is not None:
+        def history_rows():
+            stats = history.stats()
+            return {(result,): stats[result] for result in ('written', 'dropped', 'failed')}
+        HISTORY_ROWS.add_source(history_rows)
+        HISTORY_PENDING.add_source(lambda: {(): history.pending()})
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class MultiprocessMetrics:
+    """Общая выдача метрик нескольких процессов (воркеров gunicorn).
+
+    У каждого воркера свой Registry, поэтому ответ /metrics одного воркера
+    не годится: при каждом опросе Prometheus попадал бы в другой процесс.
+    Воркер раз в interval секунд и при остановке сохраняет свои значения в
+    файл каталога directory, а render() любого воркера складывает файлы всех.
+    Счётчики и гистограммы суммируются, включая завершившиеся воркеры,
+    поэтому не убывают при их перезапуске. Gauge берутся только у живых
+    процессов и получают метку pid. Каталог очищается при запуске gunicorn.
+    """
+
+    def __init__(self, directory: str, registry: Registry = REGISTRY,
+                 interval: float = METRICS_FLUSH_INTERVAL):
+        self.directory = directory
+        self.registry = registry
+        self.interval = interval
+        os.makedirs(directory, exist_ok=True)
+        # Время старта в имени: новый процесс с тем же pid не затрёт файл прежнего
+        self._path = os.path.join(directory, f'{os.getpid()}-{time.time_ns()}.json')
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self):
+        """Сохранение значений этого процесса (замена файла атомарна)"""
+        temporary = self._path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(self.registry.collect(), f, ensure_ascii=False)
+        os.replace(temporary, self._path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                logger.error("Ошибка сохранения метрик процесса: %s", e)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Остановка записи; последние значения сохраняются, чтобы счётчики не потерялись"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        try:
+            self.write()
+        except OSError as e:
+            logger.error("Ошибка сохранения метрик процесса: %s", e)
+
+    def render(self) -> str:
+        self.write()
+        merged: Dict[str, Tuple[str, str, Dict[Tuple, float]]] = {}
+        for path in sorted(glob.glob(os.path.join(self.directory, '*.json'))):
+            pid = int(os.path.basename(path).split('-', 1)[0])
+            try:
+                with open(path, encoding='utf-8') as f:
+                    families = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error("Ошибка чтения метрик %s: %s", path, e)
+                continue
+            alive = None
+            for name, documentation, kind, samples in families:
+                if kind == 'gauge':
+                    if alive is None:
+                        alive = _process_alive(pid)
+                    if not alive:
+                        continue
+                    samples = [(sample_name, labelnames + ['pid'], labelvalues + [str(pid)], value)
+                               for sample_name, labelnames, labelvalues, value in samples]
+                values = merged.setdefault(name, (documentation, kind, {}))[2]
+                for sample_name, labelnames, labelvalues, value in samples:
+                    key = (sample_name, tuple(labelnames), tuple(labelvalues))
+                    values[key] = values.get(key, 0) + value
+
+        return _render(
+            (name, documentation, kind, [(*key, value) for key, value in values.items()])
+            for name, (documentation, kind, values) in merged.items()
+        )
+
+def _timed(method: Callable, child: _HistogramValue) -> Callable:
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            child.observe(time.perf_counter() - started)
+    return wrapper
+
+def instrument_methods(cls, histogram: Histogram = DB_QUERY_SECONDS):
+    """Замер времени всех публичных методов класса (метка - имя метода)"""
+    for name, method in list(vars(cls).items()):
+        if not name.startswith('_') and callable(method):
+            setattr(cls, name, _timed(method, histogram.labels(name)))
+    return cls
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Время работы обработчиков одного роутера (внутренний middleware)"""
+
+    def __init__(self, router_name: str, event: str):
+        self._ok = HANDLER_SECONDS.labels(router_name, event, 'ok')
+        self._error = HANDLER_SECONDS.labels(router_name, event, 'error')
+
+    async def __call__(self, handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject, data: Dict[str, Any]) -> Any:
+        started = time.perf_counter()
+        try:
+            result = await handler(event, data)
+        except Exception:
+            self._error.observe(time.perf_counter() - started)
+            raise
+        self._ok.observe(time.perf_counter() - started)
+        return result
+
+def instrument_router(router: Router, name: str):
+    """Замер обработчиков сообщений и нажатий кнопок роутера"""
+    router.message.middleware(HandlerMetricsMiddleware(name, 'message'))
+    router.callback_query.middleware(HandlerMetricsMiddleware(name, 'callback_query'))
+
+async def monitor_event_loop(interval: float = 0.5):
+    """Фоновая задача: насколько позже заданного просыпается таймер event loop"""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG_SECONDS.observe(max(loop.time() - started - interval, 0.0))
+
+async def start_metrics_server(host: str, port: int, registry: Registry = REGISTRY) -> Optional[asyncio.AbstractServer]:
+    """Минимальный HTTP-сервер бота: GET /metrics отдаёт метрики, остальное - 404"""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Заголовки запроса не нужны, но их надо дочитать
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b'\r\n', b'\n', b''):
+                pass
+            parts = request_line.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?', 1)[0] == '/metrics':
+                status, content_type, body = '200 OK', CONTENT_TYPE, registry.render().encode('utf-8')
+            else:
+                status, content_type, body = '404 Not Found', 'text/plain; charset=utf-8', b'Not Found\n'
+            writer.write(
+                f'HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n'
+                f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode('latin-1') + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    try:
+        server = await asyncio.start_server(handle, host, port)
+    except OSError as e:
+        # Занятый порт не должен мешать работе бота
+        logger.error("Не удалось запустить сервер метрик на %s:%s: %s", host, port, e)
+        return None
+    logger.info("Метрики бота доступны на http://%s:%s/metrics", host, port)
+    return server
@@ -13,4 +13,13 @@ class AdminStates(StatesGroup):
     waiting_for_admin_remove = State()
 
 class StatsStates(StatesGroup):
-    waiting_for_user_search = State()
\ No newline at end of file
+    waiting_for_user_search = State()
+
+class AddWordStates(StatesGroup):
+    waiting_for_informal = State()
+    waiting_for_formal = State()
+    waiting_for_explanation = State()
+
+class DeleteWordStates(StatesGroup):
+    waiting_for_word_input = State()
+    waiting_for_confirmation = State()
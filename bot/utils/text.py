@@ -0,0 +1,35 @@
+import re
+from typing import List
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_WORD_RE = re.compile(r'\w+')
+# Пункт списка: "- фраза", "• фраза", "* фраза", "1. фраза", "1) фраза"
+_LIST_MARKER_RE = re.compile(r'^(?:[-•*]|\d+[.)])\s+')
+
+def normalize_text(text: str) -> str:
+    """Нормализованная форма текста: регистр, пробелы и ё/е не различаются"""
+    text = _WHITESPACE_RE.sub(' ', text).strip().lower()
+    return text.replace('ё', 'е')
+
+def dictionary_letter(text: str) -> str:
+    """Буква алфавитного указателя словаря; цифры, латиница и символы - в группе '0-9'"""
+    letter = text.strip()[:1].upper()
+    if letter == 'Ё' or 'А' <= letter <= 'Я':
+        return letter
+    return '0-9'
+
+def fts_query(text: str) -> str:
+    """Запрос FTS5 из пользовательского текста: все слова по префиксу, ё = е"""
+    words = _WORD_RE.findall(normalize_text(text))
+    return ' '.join(f'"{word}"*' for word in words)
+
+def split_lines(text: str) -> List[str]:
+    """Непустые строки сообщения без пробелов по краям (фразы пакетного перевода)"""
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+def list_items(text: str) -> List[str]:
+    """Пункты сообщения, оформленного списком, без маркеров; [] - если это не список"""
+    lines = split_lines(text)
+    if len(lines) < 2 or not all(_LIST_MARKER_RE.match(line) for line in lines):
+        return []
+    return [_LIST_MARKER_RE.sub('', line, count=1) for line in lines]
@@ -0,0 +1,6 @@
+# Точка входа WSGI для продакшн-запуска API (сайт + /api):
+#   cd bot && gunicorn -c gunicorn.conf.py wsgi:application
+# Для разработки по-прежнему подходит python api.py
+from api import app, startup, shutdown
+
+application = app
@@ -0,0 +1,28 @@
+import os
+import sys
+import types
+
+import pytest
+
+# Код бота импортируется так же, как при запуске из каталога bot/,
+# вспомогательные скрипты - по имени модуля (import import_word)
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BOT_DIR = os.path.join(ROOT_DIR, 'bot')
+SCRIPTS_DIR = os.path.join(ROOT_DIR, 'additional_scripts')
+sys.path.insert(0, BOT_DIR)
+sys.path.insert(1, SCRIPTS_DIR)
+
+# secret.py с токенами есть только у развёрнутого бота; тестам они не нужны
+try:
+    import secret  # noqa: F401
+except ImportError:
+    sys.modules['secret'] = types.SimpleNamespace(BOT_TOKEN='42:TEST', GIGACHAT_API_KEY='')
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Пустая база translations.db с текущей схемой"""
+    from migrations import ensure_schema
+    path = str(tmp_path / 'translations.db')
+    ensure_schema(path)
+    return path
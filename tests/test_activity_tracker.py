@@ -0,0 +1,130 @@
+import asyncio
+import time
+
+import pytest
+
+from database import format_timestamp, utc_now
+from services.activity_tracker import WINDOW_MINUTES, ActivityTracker, HyperLogLog
+
+
+def sketch(users, precision=10):
+    hll = HyperLogLog(precision)
+    for user in users:
+        hll.add(user)
+    return hll
+
+
+def registers(hll):
+    if hll._dense is not None:
+        return list(hll._dense)
+    dense = [0] * hll.size
+    for index, rank in hll._sparse.items():
+        dense[index] = rank
+    return dense
+
+
+@pytest.mark.parametrize('n', [0, 1, 10, 100, 1000, 10_000, 100_000])
+def test_estimate_within_tolerance(n):
+    estimate = sketch(range(n)).count()
+    # Стандартная ошибка при precision=10 - около 3.3%, допускаем три
+    assert abs(estimate - n) <= max(0.1 * n, 1)
+
+
+def test_repeated_users_are_counted_once():
+    assert sketch([42, '42', 42] * 1000).count() == 1
+
+
+@pytest.mark.parametrize('left, right', [
+    (range(0, 100), range(100, 5000)),      # разреженный + плотный
+    (range(0, 5000), range(4000, 4100)),    # плотный + разреженный
+    (range(0, 200), range(200, 400)),       # два разреженных, в сумме - плотный
+    (range(0, 50), range(25, 75)),          # два разреженных с пересечением
+])
+def test_merge_equals_adding_directly(left, right):
+    merged = sketch(left)
+    merged.merge(sketch(right))
+    direct = sketch(list(left) + list(right))
+    assert registers(merged) == registers(direct)
+    assert merged.count() == direct.count()
+
+
+def test_merge_leaves_source_untouched():
+    source = sketch(range(10))
+    before = registers(source)
+    target = sketch(range(5000))
+    target.merge(source)
+    source.merge(sketch(range(100, 110)))
+    assert registers(target) == registers(sketch(list(range(5000))))
+    assert registers(source) != before
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Управляемое время трекера: clock.now - секунды от эпохи"""
+    class Clock:
+        now = 1_700_000_000.0
+    monkeypatch.setattr(time, 'time', lambda: Clock.now)
+    return Clock
+
+
+def test_slots_expire_after_window(clock):
+    tracker = ActivityTracker()
+    started = clock.now
+    tracker.record(1)
+    tracker.record(2)
+
+    clock.now = started + (WINDOW_MINUTES - 1) * 60
+    assert tracker.count(WINDOW_MINUTES) == 2
+    assert tracker.distinct_users(WINDOW_MINUTES) == 2
+
+    clock.now = started + WINDOW_MINUTES * 60
+    assert tracker.count(WINDOW_MINUTES) == 0
+    assert tracker.distinct_users(WINDOW_MINUTES) == 0
+    # Та же ячейка начинается заново, а не дописывается к старой минуте
+    tracker.record(3)
+    assert tracker.count(1) == 1
+    assert tracker.distinct_users(1) == 1
+
+
+def test_events_older_than_window_are_ignored(clock):
+    tracker = ActivityTracker()
+    tracker.record(1)
+    tracker.record(2, timestamp=clock.now - WINDOW_MINUTES * 60)
+    assert tracker.count(WINDOW_MINUTES) == 1
+
+
+class FakeDatabase:
+    """get_activity_since как у FDataBase: строки с id больше after_id по порядку"""
+
+    def __init__(self):
+        self.rows = []
+        self.calls = 0
+
+    def add(self, user_id):
+        self.rows.append((len(self.rows) + 1, format_timestamp(utc_now()), user_id))
+
+    async def get_activity_since(self, since, after_id=0):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return [row for row in self.rows if row[0] > after_id]
+
+
+def test_sync_does_not_double_count():
+    async def scenario():
+        db = FakeDatabase()
+        tracker = ActivityTracker()
+        for user_id in (1, 2, 2, 3):
+            db.add(user_id)
+        assert await tracker.load(db) == 4
+        # Пересекающиеся синхронизации и повторы не учитывают строки второй раз
+        await asyncio.gather(*(tracker.sync(db) for _ in range(5)))
+        assert await tracker.sync(db) == 0
+        db.add(4)
+        db.add(1)
+        assert await tracker.sync(db) == 2
+        return tracker.snapshot(), db.calls
+
+    snapshot, calls = asyncio.run(scenario())
+    assert calls == 8
+    assert snapshot['last_15min_activity'] == 6
+    assert snapshot['active_users_last_hour'] == 4
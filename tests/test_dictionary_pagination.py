@@ -0,0 +1,64 @@
+import pytest
+
+from database import FDataBase, connect_db
+from utils.keyboards import CALLBACK_DATA_LIMIT, page_cursor_data, parse_page_cursor
+
+WORDS = ['альфа', 'бета', 'вайб', 'гамма', 'дельта', 'жиза', 'зашквар', 'имба', 'кринж', 'лол']
+
+
+@pytest.fixture
+def db(db_path):
+    connection = connect_db(db_path)
+    database = FDataBase(connection)
+    for word in WORDS:
+        assert database.add_dictionary_word(word, f'{word} (формально)')
+    yield database
+    connection.close()
+
+
+def informal(rows):
+    return [row['informal_text'] for row in rows]
+
+
+def cursor(row):
+    return row['normalized_informal'], row['id']
+
+
+def test_pages_follow_each_other(db):
+    first = db.get_dictionary_words(limit=4)
+    second = db.get_dictionary_words(limit=4, after=cursor(first[-1]))
+    back = db.get_dictionary_words(limit=4, before=cursor(second[0]))
+    assert informal(first) == WORDS[:4]
+    assert informal(second) == WORDS[4:8]
+    assert back == first
+
+
+def test_cursor_survives_deleted_word(db):
+    page = db.get_dictionary_words(limit=4)
+    last = cursor(page[-1])
+    assert db.delete_dictionary_word(page[-1]['informal_text'])
+    assert informal(db.get_dictionary_words(limit=4, after=last)) == WORDS[4:8]
+    assert informal(db.get_dictionary_words(limit=4, before=last)) == WORDS[:3]
+
+
+def test_callback_cursor_round_trip(db):
+    word = db.get_dictionary_words(limit=1)[0]
+    data = page_cursor_data('letter_А', 'next', 10, word)
+    assert parse_page_cursor(data, 'letter_А') == ('next', 10, cursor(word))
+
+
+@pytest.mark.parametrize('action', ['next', 'prev'])
+def test_long_key_fits_callback_limit_without_skipping(db, action):
+    long_word = 'очень длинная фраза из словаря сленга_с подчёркиванием'
+    assert db.add_dictionary_word(long_word, 'длинный перевод')
+    rows = db.get_dictionary_words(letter='О', limit=1)
+    data = page_cursor_data('letter_О', action, 10, rows[0])
+    assert len(data.encode()) <= CALLBACK_DATA_LIMIT
+
+    _, _, key_cursor = parse_page_cursor(data, 'letter_О')
+    if action == 'next':
+        page = db.get_dictionary_words(letter='О', after=key_cursor)
+    else:
+        page = db.get_dictionary_words(letter='О', before=key_cursor)
+    # Обрезанный ключ допускает повтор слова с курсора, но не пропуск соседних
+    assert informal(page) == [long_word]
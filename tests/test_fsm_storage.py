@@ -0,0 +1,178 @@
+import asyncio
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from storage import RespClient, RespStorage, SQLiteStorage, create_storage
+
+RESP_STUB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'additional_scripts', 'resp_stub.py')
+
+KEY = StorageKey(bot_id=1, chat_id=42, user_id=42)
+STATE = 'SearchStates:waiting_for_search'
+DATA = {'search_type': 'история', 'offset': 10}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture(scope='module')
+def resp_port(tmp_path_factory):
+    """Заглушка Redis из additional_scripts в отдельном процессе"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    # config.py импортирует secret.py; настоящий (в bot/) находится раньше этого
+    secret_dir = tmp_path_factory.mktemp('secret')
+    (secret_dir / 'secret.py').write_text("BOT_TOKEN = '42:TEST'\nGIGACHAT_API_KEY = ''\n")
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [os.environ.get('PYTHONPATH'), str(secret_dir)]))}
+    process = subprocess.Popen(
+        [sys.executable, RESP_STUB, '--port', str(port)],
+        stdout=subprocess.DEVNULL, env=env
+    )
+    try:
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline or process.poll() is not None:
+                    raise
+                time.sleep(0.05)
+        yield port
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def test_resp_storage_state_and_data(resp_port):
+    async def scenario():
+        storage = RespStorage(RespClient('127.0.0.1', resp_port))
+        try:
+            await storage.set_state(KEY, STATE)
+            await storage.set_data(KEY, DATA)
+            stored = await storage.get_state(KEY), await storage.get_data(KEY)
+            await storage.set_state(KEY, None)
+            await storage.set_data(KEY, {})
+            cleared = await storage.get_state(KEY), await storage.get_data(KEY)
+            return stored, cleared
+        finally:
+            await storage.close()
+
+    assert run(scenario()) == ((STATE, DATA), (None, {}))
+
+
+def test_resp_storage_keys_expire(resp_port):
+    async def scenario():
+        storage = RespStorage(RespClient('127.0.0.1', resp_port), ttl=1)
+        key = StorageKey(bot_id=1, chat_id=7, user_id=7)
+        try:
+            await storage.set_state(key, STATE)
+            await storage.set_data(key, DATA)
+            stored = await storage.get_state(key), await storage.get_data(key)
+            await asyncio.sleep(1.2)
+            return stored, (await storage.get_state(key), await storage.get_data(key))
+        finally:
+            await storage.close()
+
+    assert run(scenario()) == ((STATE, DATA), (None, {}))
+
+
+def stored_rows(path):
+    if not os.path.exists(path):
+        return []
+    with sqlite3.connect(path) as conn:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'fsm_state'").fetchone():
+            return []
+        return conn.execute('SELECT state, data FROM fsm_state').fetchall()
+
+
+def test_sqlite_storage_flushes_buffer_on_close(tmp_path):
+    path = str(tmp_path / 'fsm.db')
+
+    async def scenario():
+        storage = SQLiteStorage(path, flush_interval=3600, batch_size=1000)
+        await storage.set_state(KEY, STATE)
+        await storage.set_data(KEY, DATA)
+        # Пока буфер не сброшен, чтения этого процесса идут из него
+        assert await storage.get_state(KEY) == STATE
+        assert stored_rows(path) == []
+        await storage.close()
+
+    run(scenario())
+    assert stored_rows(path) == [(STATE, '{"search_type": "история", "offset": 10}')]
+
+
+def test_sqlite_storage_flushes_full_batch(tmp_path):
+    path = str(tmp_path / 'fsm.db')
+
+    async def scenario():
+        storage = SQLiteStorage(path, flush_interval=3600, batch_size=2)
+        await storage.set_state(KEY, STATE)
+        await storage.set_data(KEY, DATA)
+        for _ in range(20):
+            if stored_rows(path):
+                break
+            await asyncio.sleep(0.05)
+        rows = stored_rows(path)
+        await storage.close()
+        return rows
+
+    assert run(scenario()) == [(STATE, '{"search_type": "история", "offset": 10}')]
+
+
+def test_sqlite_storage_drops_expired_states(tmp_path):
+    path = str(tmp_path / 'fsm.db')
+    old_key = StorageKey(bot_id=1, chat_id=7, user_id=7)
+
+    async def write():
+        storage = SQLiteStorage(path)
+        await storage.set_state(old_key, STATE)
+        await storage.set_state(KEY, STATE)
+        await storage.close()
+
+    run(write())
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE fsm_state SET updated_at = updated_at - 120 WHERE key LIKE '%:7:7:%'")
+
+    async def restart():
+        storage = SQLiteStorage(path, ttl=60)
+        # Устаревшее состояние не читается ещё до очистки
+        states = await storage.get_state(old_key), await storage.get_state(KEY)
+        # Первый сброс после запуска удаляет устаревшие строки
+        await storage.set_data(KEY, DATA)
+        await storage.close()
+        return states
+
+    assert run(restart()) == (None, STATE)
+    assert len(stored_rows(path)) == 1
+
+
+@pytest.mark.parametrize('url, path', [
+    ('sqlite:///fsm_state.db', 'fsm_state.db'),
+    ('sqlite:///data/fsm.db', 'data/fsm.db'),
+    ('sqlite:////var/lib/slanglit/fsm.db', '/var/lib/slanglit/fsm.db'),
+    ('sqlite://', 'fsm_state.db'),
+])
+def test_sqlite_url(url, path):
+    storage = create_storage(url)
+    assert isinstance(storage, SQLiteStorage)
+    assert storage.path == path
+
+
+def test_redis_and_memory_urls():
+    storage = create_storage('redis://:secret@cache.local:6380/2')
+    assert isinstance(storage, RespStorage)
+    client = storage.client
+    assert (client.host, client.port, client.db, client.password) == ('cache.local', 6380, 2, 'secret')
+    assert isinstance(create_storage('memory://'), MemoryStorage)
+    with pytest.raises(ValueError):
+        create_storage('mongodb://localhost')
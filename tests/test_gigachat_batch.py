@@ -0,0 +1,99 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from services import gigachat_service
+from services.gigachat_service import GigaChatService, Translation
+
+
+class FakeClient:
+    """Клиент GigaChat: на пакет отвечает batch_reply, на одиночный перевод - JSON с пометкой single"""
+
+    def __init__(self, batch_reply=None, batch_error=None):
+        self.batch_reply = batch_reply
+        self.batch_error = batch_error
+        self.requests = []
+
+    def get_models(self):
+        pass
+
+    def chat(self, chat):
+        content = chat.messages[1].content
+        self.requests.append(content)
+        if content.startswith('['):
+            if self.batch_error:
+                raise self.batch_error
+            reply = self.batch_reply
+        else:
+            reply = json.dumps({'translation': f'single: {content}', 'explanation': 'по одной'}, ensure_ascii=False)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))], usage=None)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    def make(**kwargs):
+        client = FakeClient(**kwargs)
+        monkeypatch.setattr(gigachat_service.gigachat, 'GigaChat', lambda **_: client)
+        return GigaChatService(), client
+    return make
+
+
+def test_parse_batch_reply_with_text_around_array():
+    content = (
+        'Вот переводы:\n'
+        '[{"id": 2, "translation": "неловко", "explanation": "кринж\\\\nстыд"},\n'
+        ' {"id": "1", "translation": "друг", "explanation": "строка\nс переносом"},\n'
+        ' {"id": 3, "translation": "лишний"},\n'
+        ' {"id": 1.5, "translation": null}, "мусор", {"translation": "без id"}]\n'
+        'Обращайтесь!'
+    )
+    assert GigaChatService._parse_batch(content, 2) == {
+        0: Translation('друг', 'строка\nс переносом'),
+        1: Translation('неловко', 'кринж\nстыд'),
+    }
+
+
+def test_parse_batch_without_array():
+    with pytest.raises(ValueError):
+        GigaChatService._parse_batch('{"translation": "не массив"}', 1)
+
+
+def test_complete_batch_is_one_request(service):
+    gigachat, client = service(batch_reply=json.dumps([
+        {'id': 1, 'translation': 'неловко'},
+        {'id': 2, 'translation': 'друг', 'explanation': 'обращение'},
+    ], ensure_ascii=False))
+
+    assert gigachat.translate_batch(['кринж', 'бро'], 'to_formal') == [
+        Translation('неловко', 'Объяснение не предоставлено'),
+        Translation('друг', 'обращение'),
+    ]
+    assert len(client.requests) == 1
+    assert json.loads(client.requests[0]) == [{'id': 1, 'text': 'кринж'}, {'id': 2, 'text': 'бро'}]
+
+
+def test_missing_items_are_translated_one_by_one(service):
+    gigachat, client = service(batch_reply='[{"id": 2, "translation": "друг", "explanation": "обращение"}]')
+
+    results = gigachat.translate_batch(['кринж', 'бро', 'вайб'], 'to_formal')
+    assert [result.translation for result in results] == ['single: кринж', 'друг', 'single: вайб']
+    assert client.requests[1:] == ['кринж', 'вайб']
+
+
+def test_unparsed_reply_falls_back_to_single_requests(service):
+    gigachat, client = service(batch_reply='Не могу ответить списком')
+
+    results = gigachat.translate_batch(['кринж', 'бро'], 'to_informal')
+    assert [result.translation for result in results] == ['single: кринж', 'single: бро']
+    assert not any(result.failed for result in results)
+    assert len(client.requests) == 3
+
+
+def test_request_error_fails_every_item(service):
+    gigachat, client = service(batch_error=RuntimeError('таймаут'))
+
+    results = gigachat.translate_batch(['кринж', 'бро'], 'to_formal')
+    assert [result.translation for result in results] == ['кринж', 'бро']
+    assert all(result.failed and 'таймаут' in result.explanation for result in results)
+    assert len(client.requests) == 1
@@ -0,0 +1,31 @@
+import pytest
+
+from database import FDataBase, connect_db
+
+
+@pytest.fixture
+def db(db_path):
+    connection = connect_db(db_path)
+    database = FDataBase(connection)
+    for user_id in (12, 123, 'web_abc', 'web_abc_def', 'web_"q"'):
+        assert database.add_translation(f'кринж {user_id}', 'неловкость', 'чувство стыда', user_id)
+    yield database
+    connection.close()
+
+
+def found_users(db, user_id, text='кринж'):
+    rows = db.search_user_translations(text, user_id)
+    ids = db.search_user_translation_ids(text, user_id)
+    assert [row['id'] for row in rows] == ids
+    return [row['informal_text'] for row in rows]
+
+
+@pytest.mark.parametrize('user_id', [12, '12', 123, 'web_abc', 'web_abc_def', 'web_"q"'])
+def test_search_returns_only_own_rows(db, user_id):
+    assert found_users(db, user_id) == [f'кринж {user_id}']
+
+
+def test_query_does_not_match_user_tag(db):
+    assert found_users(db, 12, 'u') == []
+    assert found_users(db, 'web_abc', 'uweb') == []
+    assert found_users(db, 12, 'стыд') == ['кринж 12']
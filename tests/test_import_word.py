@@ -0,0 +1,114 @@
+import io
+import json
+import sqlite3
+
+import pytest
+
+import import_word
+from utils.dictionary_json import iter_json_stream
+
+ENTRIES = [
+    {"informal_text": "кринж", "formal_text": "неловкость", "explanation": "чувство стыда за других"},
+    {"slang": "вайб", "meaning": "атмосфера", "rating": 4.5, "tags": ["настроение", {"x": [1, 2]}]},
+    {"word": "рофл", "translation": "шутка \"с подвохом\" \\ и\nперенос", "example": "это рофл 😂"},
+    {"informal": "без перевода"},
+    "не объект",
+    {"informal_text": "имба", "formal_text": "превосходство", "count": 1234567890},
+]
+EXPECTED = [
+    ("кринж", "неловкость", "чувство стыда за других"),
+    ("вайб", "атмосфера", None),
+    ("рофл", "шутка \"с подвохом\" \\ и\nперенос", "это рофл 😂"),
+    ("имба", "превосходство", None),
+]
+
+
+def parse(text: str, chunk_size: int):
+    return list(iter_json_stream(io.StringIO(text), chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 7, 16, 1 << 16])
+def test_array_split_at_any_chunk_boundary(chunk_size):
+    text = json.dumps(ENTRIES, ensure_ascii=False, indent=1)
+    assert parse(text, chunk_size) == EXPECTED
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 4, 1 << 16])
+def test_object_form_split_at_any_chunk_boundary(chunk_size):
+    text = json.dumps({
+        "кринж": "неловкость",
+        "вайб": {"formal": "атмосфера", "description": "настроение места"},
+        "пусто": "",
+        "чил": 12345,
+    }, ensure_ascii=False)
+    assert parse(text, chunk_size) == [
+        ("кринж", "неловкость", None),
+        ("вайб", "атмосфера", "настроение места"),
+        ("чил", "12345", None),
+    ]
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    '"строка"',
+    '[{"informal": "кринж", "formal": "неловкость"}',
+    '[{"informal": "кринж", "formal": "нелов',
+    '{"кринж" "неловкость"}',
+    '[{"informal": кринж}]',
+])
+def test_malformed_input_raises(text):
+    with pytest.raises(ValueError):
+        parse(text, 4)
+
+
+def write_words(tmp_path, name, entries):
+    path = tmp_path / name
+    path.write_text(json.dumps(entries, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+
+def dictionary(db_path):
+    with sqlite3.connect(db_path) as conn:
+        words = conn.execute(
+            'SELECT normalized_informal, informal_text, formal_text, first_letter FROM dictionary ORDER BY 1'
+        ).fetchall()
+        counts = dict(conn.execute('SELECT letter, count FROM dictionary_letter_counts WHERE count > 0'))
+        objects = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('index', 'trigger')")}
+    return words, counts, objects
+
+
+def test_duplicates_collapse_to_last_entry(tmp_path, capsys):
+    db_path = str(tmp_path / 'translations.db')
+    words_file = write_words(tmp_path, 'a.json', [
+        {"informal": "Кринж", "formal": "неловкость"},
+        {"informal": "  кринж ", "formal": "стыд"},
+        {"informal": "Ёлка", "formal": "новогоднее дерево"},
+        {"informal": "елка", "formal": "ель"},
+    ])
+    import_word.import_words([words_file], db_path, batch_size=3)
+
+    words, counts, objects = dictionary(db_path)
+    assert words == [("елка", "елка", "ель", "Е"), ("кринж", "кринж", "стыд", "К")]
+    assert counts == {"Е": 1, "К": 1}
+    assert {'idx_dictionary_letter', 'dictionary_count_insert'} <= objects
+
+    # Повторный импорт того же файла ничего не меняет
+    import_word.import_words([words_file], db_path)
+    assert "Новых слов: 0, обновлено: 0, без изменений: 4" in capsys.readouterr().out
+    assert dictionary(db_path)[0] == words
+
+
+def test_malformed_file_rolls_back_import(tmp_path):
+    db_path = str(tmp_path / 'translations.db')
+    good = write_words(tmp_path, 'good.json', [{"informal": "кринж", "formal": "неловкость"}])
+    import_word.import_words([good], db_path)
+    before = dictionary(db_path)
+
+    more = write_words(tmp_path, 'more.json', [{"informal": "вайб", "formal": "атмосфера"}])
+    broken = tmp_path / 'broken.json'
+    broken.write_text('[{"informal": "рофл", "formal": "шутка"}, {"informal": ', encoding='utf-8')
+    with pytest.raises(ValueError):
+        import_word.import_words([more, str(broken)], db_path)
+
+    # Словарь, счётчики, индекс и триггеры - как до импорта
+    assert dictionary(db_path) == before
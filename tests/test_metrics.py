@@ -0,0 +1,103 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from utils.metrics import CallbackMetric, Counter, Histogram, MultiprocessMetrics, Registry
+
+
+@pytest.fixture
+def registry():
+    return Registry()
+
+
+def test_counter_exposition(registry):
+    requests = Counter('app_requests_total', 'Запросы', ('method', 'status'), registry=registry)
+    Counter('app_jobs_total', 'Задания', registry=registry).inc(2)
+    requests.labels('GET', 200).inc()
+    requests.labels('GET', 200).inc(2.5)
+    requests.labels('POST', 503).inc()
+
+    assert registry.render() == (
+        '# HELP app_requests_total Запросы\n'
+        '# TYPE app_requests_total counter\n'
+        'app_requests_total{method="GET",status="200"} 3.5\n'
+        'app_requests_total{method="POST",status="503"} 1\n'
+        '# HELP app_jobs_total Задания\n'
+        '# TYPE app_jobs_total counter\n'
+        'app_jobs_total 2\n'
+    )
+
+
+def test_label_and_help_escaping(registry):
+    errors = Counter('app_errors_total', 'Ошибки "GigaChat" в C:\\путь\nвторая строка', ('reason',),
+                     registry=registry)
+    errors.labels('сказал "нет" \\ и\nушёл').inc()
+
+    lines = registry.render().splitlines()
+    # В HELP экранируются только \ и перевод строки, в значениях меток - ещё и кавычки
+    assert lines[0] == '# HELP app_errors_total Ошибки "GigaChat" в C:\\\\путь\\nвторая строка'
+    assert lines[2] == 'app_errors_total{reason="сказал \\"нет\\" \\\\ и\\nушёл"} 1'
+
+
+def test_histogram_buckets_sum_and_count(registry):
+    latency = Histogram('app_latency_seconds', 'Задержка', ('endpoint',), buckets=(1, 0.5, 5), registry=registry)
+    for value in (0.3, 0.5, 1, 7):
+        latency.labels('/api').observe(value)
+
+    assert registry.render().splitlines()[2:] == [
+        'app_latency_seconds_bucket{endpoint="/api",le="0.5"} 2',
+        'app_latency_seconds_bucket{endpoint="/api",le="1"} 3',
+        'app_latency_seconds_bucket{endpoint="/api",le="5"} 3',
+        'app_latency_seconds_bucket{endpoint="/api",le="+Inf"} 4',
+        'app_latency_seconds_count{endpoint="/api"} 4',
+        'app_latency_seconds_sum{endpoint="/api"} 8.8',
+    ]
+
+
+def test_broken_callback_source_is_skipped(registry):
+    pending = CallbackMetric('app_pending', 'Очередь', 'gauge', registry=registry)
+    pending.add_source(lambda: 1 / 0)
+    Counter('app_ok_total', 'Работает', registry=registry).inc()
+    assert registry.render() == '# HELP app_ok_total Работает\n# TYPE app_ok_total counter\napp_ok_total 1\n'
+
+
+def make_worker(directory, pid):
+    """Воркер с собственным реестром; файл - как у процесса pid"""
+    registry = Registry()
+    worker = MultiprocessMetrics(str(directory), registry, interval=3600)
+    worker._path = os.path.join(str(directory), f'{pid}-1.json')
+    metrics = (
+        Counter('app_requests_total', 'Запросы', ('status',), registry=registry),
+        Histogram('app_latency_seconds', 'Задержка', buckets=(1,), registry=registry),
+        CallbackMetric('app_pending', 'Очередь', 'gauge', registry=registry),
+    )
+    return worker, metrics
+
+
+def test_multiprocess_merge(tmp_path):
+    finished = subprocess.Popen([sys.executable, '-c', 'pass'])
+    finished.wait()
+
+    workers = {}
+    for pid, requests, latency, pending in [(os.getpid(), 2, 0.5, 3), (os.getppid(), 5, 2, 4), (finished.pid, 1, 0.5, 9)]:
+        worker, (counter, histogram, gauge) = make_worker(tmp_path, pid)
+        counter.labels('200').inc(requests)
+        histogram.observe(latency)
+        gauge.add_source(lambda value=pending: {(): value})
+        worker.write()
+        workers[pid] = worker
+
+    lines = workers[os.getpid()].render().splitlines()
+    # Счётчики и гистограммы - сумма всех воркеров, включая завершившиеся
+    assert 'app_requests_total{status="200"} 8' in lines
+    assert 'app_latency_seconds_bucket{le="1"} 2' in lines
+    assert 'app_latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert 'app_latency_seconds_count 3' in lines
+    assert 'app_latency_seconds_sum 3' in lines
+    # Gauge - по каждому живому воркеру отдельно
+    gauges = sorted(line for line in lines if line.startswith('app_pending'))
+    assert gauges == sorted([f'app_pending{{pid="{os.getpid()}"}} 3', f'app_pending{{pid="{os.getppid()}"}} 4'])
+    # Каждое семейство описано один раз
+    assert lines.count('# TYPE app_requests_total counter') == 1
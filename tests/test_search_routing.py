@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.methods import AnswerCallbackQuery, SendMessage
+from aiogram.types import CallbackQuery, Chat, Message, Update, User
+
+from main import include_routers
+from services.search_service import SearchService
+from utils.states import SearchStates
+
+USER_ID = 1001
+
+class RecordingSession(BaseSession):
+    """Сессия без сети: запоминает вызовы Bot API и отвечает как Telegram"""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    async def make_request(self, bot, method, timeout=None):
+        self.requests.append(method)
+        if isinstance(method, SendMessage):
+            return Message(message_id=len(self.requests), date=datetime.now(),
+                           chat=Chat(id=method.chat_id, type='private'), text=method.text)
+        return True
+
+    async def stream_content(self, *args, **kwargs):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+@pytest.fixture(scope='module')
+def dispatcher():
+    # Роутеры - объекты модулей, подключить их можно только к одному диспетчеру
+    dp = Dispatcher(storage=MemoryStorage())
+    dp['search_service'] = SearchService()
+    include_routers(dp)
+    return dp
+
+def press(dp: Dispatcher, data: str):
+    session = RecordingSession()
+    bot = Bot(token='42:TEST', session=session)
+    chat = Chat(id=USER_ID, type='private')
+    update = Update(update_id=1, callback_query=CallbackQuery(
+        id='1', chat_instance='test', data=data,
+        from_user=User(id=USER_ID, is_bot=False, first_name='Test'),
+        message=Message(message_id=1, date=datetime.now(), chat=chat, text='📖 Словарь'),
+    ))
+    asyncio.run(dp.feed_update(bot, update))
+    return bot, session.requests
+
+def test_search_dictionary_button_starts_dictionary_search(dispatcher):
+    bot, requests = press(dispatcher, 'search_dictionary')
+
+    messages = [r.text for r in requests if isinstance(r, SendMessage)]
+    answers = [r for r in requests if isinstance(r, AnswerCallbackQuery)]
+    assert messages and messages[0].startswith("🔍 Введите текст для поиска в словаре")
+    assert len(answers) == 1 and answers[0].text is None
+
+    key = StorageKey(bot_id=bot.id, chat_id=USER_ID, user_id=USER_ID)
+    assert asyncio.run(dispatcher.storage.get_state(key)) == SearchStates.waiting_for_search.state
+    assert asyncio.run(dispatcher.storage.get_data(key))['search_type'] == 'dictionary'
+
+def test_search_pagination_still_handled(dispatcher):
+    _, requests = press(dispatcher, 'search_next_deadbeef_10')
+
+    answers = [r.text for r in requests if isinstance(r, AnswerCallbackQuery)]
+    assert answers[0] == "⌛ Результаты поиска устарели, повторите поиск"
+    assert "❌ Ошибка при загрузке" not in answers
@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+import pytest
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from services.search_sessions import FSMSearchSessionStore, SearchSessionStore
+from storage import SQLiteStorage
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_sessions_survive_restart_in_sqlite_storage(tmp_path):
+    path = str(tmp_path / 'fsm.db')
+
+    async def first_process():
+        storage = SQLiteStorage(path)
+        token = await FSMSearchSessionStore(storage).create(42, 'history', 'кринж', [5, 3, 1])
+        await storage.close()
+        return token
+
+    async def second_process(token):
+        storage = SQLiteStorage(path)
+        sessions = FSMSearchSessionStore(storage)
+        try:
+            return await sessions.get(token, 42), await sessions.get(token, 43)
+        finally:
+            await storage.close()
+
+    token = run(first_process())
+    own, foreign = run(second_process(token))
+    assert (own.search_type, own.search_text, own.ids) == ('history', 'кринж', [5, 3, 1])
+    assert foreign is None
+
+
+def test_fsm_session_expires_and_is_removed(monkeypatch):
+    async def scenario():
+        storage = MemoryStorage()
+        sessions = FSMSearchSessionStore(storage, ttl=60)
+        token = await sessions.create(42, 'dictionary', 'вайб', [1])
+        key = sessions._key(token, 42)
+
+        now = time.time()
+        monkeypatch.setattr(time, 'time', lambda: now + 30)
+        assert (await sessions.get(token, 42)).ids == [1]
+        # Листание продлило сессию ещё на ttl
+        monkeypatch.setattr(time, 'time', lambda: now + 80)
+        assert await sessions.get(token, 42) is not None
+        monkeypatch.setattr(time, 'time', lambda: now + 200)
+        assert await sessions.get(token, 42) is None
+        assert await storage.get_data(key) == {}
+
+    run(scenario())
+
+
+@pytest.mark.parametrize('make_store', [SearchSessionStore, lambda: FSMSearchSessionStore(MemoryStorage())])
+def test_unknown_token(make_store):
+    assert run(make_store().get('deadbeef', 42)) is None
+
+
+def test_memory_store_evicts_oldest_session():
+    async def scenario():
+        sessions = SearchSessionStore(max_sessions=2)
+        first = await sessions.create(1, 'history', 'а', [1])
+        second = await sessions.create(1, 'history', 'б', [2])
+        await sessions.get(first, 1)
+        await sessions.create(1, 'history', 'в', [3])
+        return await sessions.get(first, 1), await sessions.get(second, 1), len(sessions)
+
+    first, second, count = run(scenario())
+    assert first is not None and second is None and count == 2
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+
+import pytest
+
+from services import gigachat_service
+from services.dictionary_index import DictionaryIndex
+from services.gigachat_service import Translation
+from services.translation_cache import TranslationCache
+from services.translation_service import TranslationService
+
+
+class FakeHistory:
+    async def add_async(self, *args):
+        pass
+
+
+class FakeGigaChat:
+    """Нейросеть, которая отвечает на одиночный перевод только после release"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.single = []
+        self.batches = []
+
+    def translate_text(self, text, direction):
+        self.single.append(text)
+        self.release.wait(5)
+        return Translation(f'{text}!', 'по одной')
+
+    def translate_batch(self, texts, direction):
+        self.batches.append(texts)
+        return [Translation(f'{text}!', 'пакетом') for text in texts]
+
+
+@pytest.fixture
+def service(db_path, monkeypatch):
+    monkeypatch.setattr(gigachat_service.gigachat, 'GigaChat', lambda **_: None)
+    dictionary = DictionaryIndex()
+    dictionary.add('кринж', 'неловкость', 'чувство стыда')
+    dictionary.add('бро', 'друг')
+    cache = TranslationCache(db_path)
+    translation_service = TranslationService(cache, dictionary, FakeHistory(), max_workers=4)
+    translation_service.gigachat = FakeGigaChat()
+    yield translation_service
+    translation_service.close()
+    cache.close()
+
+
+def test_batch_shares_flight_with_single_translation(service):
+    async def scenario():
+        single = asyncio.ensure_future(service.translate_to_formal('вайб', 1))
+        await asyncio.sleep(0)
+        batch = asyncio.ensure_future(service.translate_batch(['Вайб', 'рофл', 'кринж', 'рофл'], 'to_formal', 1))
+        await asyncio.sleep(0.1)
+        service.gigachat.release.set()
+        return await single, await batch
+
+    single, batch = asyncio.run(scenario())
+    assert single == ('вайб!', 'по одной')
+    assert batch[0] == single
+    assert batch[1] == batch[3] == ('рофл!', 'пакетом')
+    assert batch[2][0] == 'неловкость'
+    # "Вайб" дождался уже идущего перевода, в пакет ушёл только "рофл"
+    assert service.gigachat.single == ['вайб']
+    assert service.gigachat.batches == [['рофл']]
+    assert service.get_cache_stats()['coalesced'] == 1
+
+
+def test_list_is_split_into_items(service):
+    assert service.batch_lines('- это кринж\n• бро, го\n\n1. вайб норм\n2) ок', 'to_formal') == \
+        ['это кринж', 'бро, го', 'вайб норм', 'ок']
+
+
+def test_plain_lines_are_one_text(service):
+    assert service.batch_lines('Мне\nвайб норм', 'to_formal') == []
+    assert service.batch_lines('кринж', 'to_formal') == []
+    assert service.batch_lines('- кринж', 'to_formal') == []
+
+
+def test_known_lines_are_split(service):
+    service.cache.set('вайб норм', 'to_formal', 'атмосфера хорошая', 'вайб - атмосфера')
+    assert service.batch_lines('Кринж\n\nвайб норм\nбро!', 'to_formal') == ['Кринж', 'вайб норм', 'бро!']
+    assert service.batch_lines('кринж\nвайб норм', 'to_informal') == []
+    # Проверка строк не попадает в статистику словаря и кэша
+    assert service.dictionary.lookups == 0
+    assert service.cache.memory_hits == 0